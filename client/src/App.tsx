@@ -348,6 +348,8 @@ const App: React.FC = () => {
   const pendingCommitRef = useRef(false);
   const pendingImageRef = useRef<string[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
+  // Server-side id of the live session (from state snapshots); lets the report reuse per-turn scores
+  const sessionIdRef = useRef<string | null>(null);
 
   // Sync state to ref for stale closures (MediaRecorder)
   useEffect(() => {
@@ -437,6 +439,10 @@ const App: React.FC = () => {
                 });
               }
               
+              if (typeof data.payload === "object" && data.payload?.session_id) {
+                sessionIdRef.current = data.payload.session_id;
+              }
+
               if (typeof data.payload === "object" && data.payload?.section) {
                 setServerProgressData({
                   macro_completed_chunks: data.payload.macro_completed_chunks,
@@ -1259,7 +1265,8 @@ const App: React.FC = () => {
           chat_history: messages,
           resume_text: resumeParsedText || "",
           interview_type: interviewFocus || "general",
-          duration_mins: interviewTimeLimit || 5
+          duration_mins: interviewTimeLimit || 5,
+          session_id: sessionIdRef.current
         })
       })
 
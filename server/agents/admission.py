@@ -0,0 +1,213 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("Admission")
+
+class Priority(IntEnum):
+    # Lower value is served first
+    LIVE = 0
+    REPORT = 1
+    BACKGROUND = 2
+
+# Longest a request waits in the queue before it is shed
+DEFAULT_MAX_WAIT = {Priority.LIVE: 5.0, Priority.REPORT: 30.0, Priority.BACKGROUND: 2.0}
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(f"Over capacity ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def take(self, cost: float):
+        self._refill()
+        self.tokens -= cost
+
+    def time_until(self, cost: float) -> float:
+        missing = cost - self.available()
+        return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+    def drain(self):
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tenant", "cost", "future", "queued_at")
+
+    def __init__(self, priority: Priority, seq: int, tenant: str, cost: float, future: asyncio.Future, queued_at: float):
+        self.priority = priority
+        self.seq = seq
+        self.tenant = tenant
+        self.cost = cost
+        self.future = future
+        self.queued_at = queued_at
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """
+    Token-bucket admission for one upstream provider.
+
+    A call is admitted when both the provider bucket and its tenant's bucket
+    (a `tenant_share` of the provider rate) hold a token. Otherwise it waits
+    in a bounded queue ordered by priority, then arrival. A tenant over its
+    own limit does not hold up other tenants. When the queue is full, the
+    newest waiter of the lowest priority is shed to make room for a more
+    important call. Calls that wait longer than their priority's limit are
+    rejected with AdmissionRejected.
+    """
+    def __init__(self, name: str, rate_per_sec: float, burst: float, tenant_share: float = 1.0, max_queue: int = 64,
+                 max_wait: Optional[Dict[Priority, float]] = None, max_tenants: int = 1000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.bucket = TokenBucket(rate_per_sec, burst, clock)
+        self.tenant_rate = rate_per_sec * tenant_share
+        self.tenant_burst = max(1.0, burst * tenant_share)
+        self.max_queue = max_queue
+        self.max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self.max_tenants = max_tenants
+        self._tenants: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.admitted = {p.name: 0 for p in Priority}
+        self.queued = {p.name: 0 for p in Priority}
+        self.shed = {"timeout": 0, "queue_full": 0, "preempted": 0}
+        self.max_queue_depth = 0
+        self.waited = 0
+        self.wait_total_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.throttled = 0
+
+    def _tenant_bucket(self, tenant: str) -> TokenBucket:
+        bucket = self._tenants.get(tenant)
+        if bucket is None:
+            bucket = self._tenants[tenant] = TokenBucket(self.tenant_rate, self.tenant_burst, self.clock)
+            if len(self._tenants) > self.max_tenants:
+                self._tenants.popitem(last=False)
+        else:
+            self._tenants.move_to_end(tenant)
+        return bucket
+
+    def _grantable(self, tenant: str, cost: float) -> bool:
+        return self.bucket.available() >= cost and self._tenant_bucket(tenant).available() >= cost
+
+    def _grant(self, tenant: str, cost: float, priority: Priority):
+        self.bucket.take(cost)
+        self._tenant_bucket(tenant).take(cost)
+        self.admitted[priority.name] += 1
+
+    async def acquire(self, priority: Priority = Priority.LIVE, tenant: str = "default", cost: float = 1.0):
+        """Returns once admitted; raises AdmissionRejected when shed."""
+        ahead = any(w.priority <= priority for w in self._waiting)
+        if not ahead and self._grantable(tenant, cost):
+            self._grant(tenant, cost, priority)
+            return
+
+        if len(self._waiting) >= self.max_queue:
+            # The newest waiter of the lowest priority makes way for a more important call
+            victim = max(self._waiting, key=lambda w: (w.priority, w.seq))
+            if victim.priority <= priority:
+                self.shed["queue_full"] += 1
+                raise AdmissionRejected("queue_full", self._retry_after(cost))
+            self._waiting.remove(victim)
+            self.shed["preempted"] += 1
+            victim.future.set_exception(AdmissionRejected("preempted", self._retry_after(victim.cost)))
+
+        waiter = _Waiter(priority, next(self._seq), tenant, cost, asyncio.get_running_loop().create_future(), self.clock())
+        bisect.insort(self._waiting, waiter)
+        self.queued[priority.name] += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiting))
+        self._dispatch()
+
+        try:
+            done, _ = await asyncio.wait({waiter.future}, timeout=self.max_wait[priority])
+        finally:
+            if not waiter.future.done():
+                waiter.future.cancel()
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                self._dispatch()
+
+        if not done:
+            self.shed["timeout"] += 1
+            raise AdmissionRejected("timeout", self._retry_after(cost))
+        waiter.future.result()
+        waited_ms = (self.clock() - waiter.queued_at) * 1000
+        self.waited += 1
+        self.wait_total_ms += waited_ms
+        self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+
+    def _dispatch(self):
+        """Grants tokens to waiters in priority order and re-arms the refill timer."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        for waiter in list(self._waiting):
+            if self.bucket.available() < waiter.cost:
+                break
+            if self._tenant_bucket(waiter.tenant).available() < waiter.cost:
+                continue
+            self._waiting.remove(waiter)
+            self._grant(waiter.tenant, waiter.cost, waiter.priority)
+            waiter.future.set_result(None)
+
+        if self._waiting:
+            delay = min(max(self.bucket.time_until(w.cost), self._tenant_bucket(w.tenant).time_until(w.cost)) for w in self._waiting)
+            self._timer = asyncio.get_running_loop().call_later(max(delay, 0.001), self._dispatch)
+
+    def _retry_after(self, cost: float) -> float:
+        estimate = self.bucket.time_until(cost) + len(self._waiting) / max(self.bucket.rate, 1e-6)
+        return round(min(60.0, max(1.0, estimate)), 1)
+
+    def throttle(self):
+        """Upstream answered 429: spend the remaining burst so callers queue instead of retrying into it."""
+        self.throttled += 1
+        self.bucket.drain()
+
+    def get_stats(self) -> dict:
+        return {
+            "tokens_available": round(self.bucket.available(), 2),
+            "queue_depth": len(self._waiting),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": dict(self.admitted),
+            "queued": dict(self.queued),
+            "shed": dict(self.shed),
+            "upstream_throttled": self.throttled,
+            "avg_queue_wait_ms": round(self.wait_total_ms / self.waited, 1) if self.waited else 0.0,
+            "max_queue_wait_ms": round(self.max_wait_ms, 1),
+            "tenants": len(self._tenants),
+        }
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Provider SDK errors carry the HTTP status; 429 means we went over the upstream quota."""
+    return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+try:
+    import msgpack
+except ImportError:  # optional: binary framing falls back to JSON text frames
+    msgpack = None
+
+logger = logging.getLogger("ChunkCoalescer")
+
+class ChunkCoalescer:
+    """
+    Batches consecutive `response_chunk` messages into fewer, larger frames.
+
+    The first chunk of a response is forwarded immediately (time-to-first-token
+    is unchanged). After that, chunks are buffered and flushed when the buffer
+    reaches `max_bytes` or when the flush interval elapses. The interval adapts
+    between `min_interval` and `max_interval`: it follows the token arrival
+    rate (a few tokens per frame) and backs off when sending a frame is slow.
+    Any other message flushes the buffer first, so ordering is preserved.
+    """
+    def __init__(self, min_interval: float = 0.01, max_interval: float = 0.06, max_bytes: int = 512, tokens_per_frame: int = 4):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_bytes = max_bytes
+        self.tokens_per_frame = tokens_per_frame
+        self.chunks_in = 0
+        self.frames_out = 0
+
+    def _interval(self, gap_ewma: Optional[float], send_ewma: float) -> float:
+        interval = self.min_interval if gap_ewma is None else gap_ewma * self.tokens_per_frame
+        return min(self.max_interval, max(self.min_interval, interval, send_ewma))
+
+    async def stream(self, messages: AsyncIterator[dict]) -> AsyncIterator[dict]:
+        iterator = messages.__aiter__()
+        buffer = []
+        buffered_bytes = 0
+        first_sent = False
+        gap_ewma = None
+        send_ewma = 0.0
+        last_arrival = None
+        flush_deadline = None
+        pending = None
+        finished = False
+
+        try:
+            while not finished:
+                outgoing = []
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+
+                timeout = None if flush_deadline is None else max(0.0, flush_deadline - time.perf_counter())
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+                if not done:
+                    # Interval elapsed with tokens buffered: flush them
+                    outgoing.append({"type": "response_chunk", "payload": "".join(buffer)})
+                    buffer, buffered_bytes, flush_deadline = [], 0, None
+                else:
+                    task, pending = pending, None
+                    try:
+                        message = task.result()
+                    except StopAsyncIteration:
+                        message, finished = None, True
+
+                    if message is None or message.get("type") != "response_chunk":
+                        # Anything else (or the end of the stream) flushes first to keep ordering
+                        if buffer:
+                            outgoing.append({"type": "response_chunk", "payload": "".join(buffer)})
+                            buffer, buffered_bytes, flush_deadline = [], 0, None
+                        if message is not None:
+                            if message.get("type") == "state_update":
+                                # A new response starts with a fresh first-chunk fast path
+                                first_sent = False
+                                gap_ewma = last_arrival = None
+                            outgoing.append(message)
+                    else:
+                        self.chunks_in += 1
+                        now = time.perf_counter()
+                        if last_arrival is not None:
+                            gap = now - last_arrival
+                            gap_ewma = gap if gap_ewma is None else 0.7 * gap_ewma + 0.3 * gap
+                        last_arrival = now
+
+                        if not first_sent:
+                            first_sent = True
+                            outgoing.append(message)
+                        else:
+                            chunk = message.get("payload") or ""
+                            buffer.append(chunk)
+                            buffered_bytes += len(chunk.encode("utf-8"))
+                            if buffered_bytes >= self.max_bytes:
+                                outgoing.append({"type": "response_chunk", "payload": "".join(buffer)})
+                                buffer, buffered_bytes, flush_deadline = [], 0, None
+                            elif flush_deadline is None:
+                                flush_deadline = now + self._interval(gap_ewma, send_ewma)
+
+                for message in outgoing:
+                    if message["type"] == "response_chunk":
+                        self.frames_out += 1
+                    # Time spent in the consumer (the websocket send) feeds the interval
+                    started = time.perf_counter()
+                    yield message
+                    send_ewma = 0.8 * send_ewma + 0.2 * (time.perf_counter() - started)
+        finally:
+            # Interrupted: stop the source deterministically so its cleanup runs now, not at GC
+            if pending is not None:
+                if not pending.done():
+                    pending.cancel()
+                    await asyncio.wait({pending})
+                if not pending.cancelled():
+                    pending.exception()  # retrieved: the source's own error is not ours to report
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+    def get_stats(self) -> dict:
+        return {
+            "chunks_in": self.chunks_in,
+            "chunk_frames_out": self.frames_out,
+        }
+
+
+def resolve_framing(requested: str) -> str:
+    """
+    'json' (text frames), 'json_binary' (JSON bytes in binary frames) or
+    'msgpack' (only when the optional dependency is installed, else 'json').
+    """
+    requested = (requested or "json").lower()
+    if requested == "msgpack" and msgpack is None:
+        logger.warning("msgpack framing requested but msgpack is not installed; using JSON")
+        return "json"
+    return requested if requested in ("json", "json_binary", "msgpack") else "json"
+
+
+def pack_message(message: dict) -> bytes:
+    """Compact binary frame for clients that negotiated msgpack framing."""
+    return msgpack.packb(message, use_bin_type=True)
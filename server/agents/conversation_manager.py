@@ -1,68 +1,47 @@
-from enum import Enum, auto
 from typing import List, Optional, Tuple
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from agents.session_records import Turn, HUMAN, AI
+from agents.question_matcher import QuestionMatcher
+from agents.phrase_matcher import trigger_matcher
+from agents.flow_engine import CompiledFlow, StateInstruction, flow_engine
+from agents.session_clock import SessionClock
+from config import Config
 
-class ConversationState(Enum):
-    INITIAL_GREETING = auto()    # Bot says hi
-    PASSIVE_LISTENING = auto()   # User explains the project
-    EVALUATION = auto()          # Asking the 10 fixed questions
-    COMPLETED = auto()           # All questions answered
+# Declarative definition: flows/project_evaluation.json
+PROJECT_FLOW = flow_engine.get("project_evaluation")
+ConversationState = PROJECT_FLOW.State
+EVALUATION_QUESTIONS = PROJECT_FLOW.question_bank
 
-EVALUATION_QUESTIONS = [
-    {
-        "section": "Project Understanding",
-        "questions": [
-            "What problem does this project solve, and who is it for?",
-            "What exactly did you build to address that problem and what are the main features?"
-        ],
-        "screenshots_relevant": False
-    },
-    {
-        "section": "UI & User Experience",
-        "questions": [
-            "Walk me through the application from a user’s perspective.",
-            "How does the user interface facilitate the core functionality?"
-        ],
-        "screenshots_relevant": True
-    },
-    {
-        "section": "Design Decisions & Trade-offs",
-        "questions": [
-            "What were the major design decisions you made, and what trade-offs did you consider?",
-            "Why did you choose your specific tech stack over other alternatives?"
-        ],
-        "screenshots_relevant": False
-    },
-    {
-        "section": "Technical Awareness",
-        "questions": [
-            "What happens behind the scenes when a user interacts with the system?",
-            "How do you handle data consistency and system performance?"
-        ],
-        "screenshots_relevant": False
-    },
-    {
-        "section": "Limitations & Improvements",
-        "questions": [
-            "What are the current limitations of this project, including security or safety concerns?",
-            "If you had more time, what would you improve or work on next?"
-        ],
-        "screenshots_relevant": False
-    }
-]
+# Built once: paraphrase-tolerant detection of "the AI asked this core question"
+QUESTION_MATCHER = QuestionMatcher(q for s_info in EVALUATION_QUESTIONS for q in s_info["questions"])
+
+SCREENSHOT_PROMPT = PROJECT_FLOW.constants["screenshot_prompt"]
 
 class ConversationManager:
-    def __init__(self):
-        self.history: List[BaseMessage] = []
-        self.state = ConversationState.PASSIVE_LISTENING
+    def __init__(self, flow: CompiledFlow = PROJECT_FLOW):
+        self.flow = flow
+        self.State = flow.State
+        self.questions = flow.question_bank
+        self.question_matcher = QUESTION_MATCHER if flow is PROJECT_FLOW else QuestionMatcher(
+            q for s_info in flow.question_bank for q in s_info["questions"]
+        )
+        # Compact Turn records; converted to LangChain messages only when a prompt is sent
+        self.history: List[Turn] = []
+        self.state = flow.initial_state
         self.section_index = -1 # -1 means we haven't started fixed questions yet
         self.question_in_section_index = 0
         self.follow_up_count = 0 
         self.last_ai_question_was_screenshot_prompt = False
+        # Exact reply text when the state machine fully determines the turn (zero-LLM fast path),
+        # set by apply_instruction
+        self.templated_response: Optional[str] = None
         
         # Time-based depth control
         self.time_limit_mins = 15
         self.max_follow_ups = 1  # Default: 1 follow-up per question
+        # Wall-clock budget; follow-up depth shrinks as it runs out
+        self.clock = SessionClock()
+        self.follow_up_limit = self.max_follow_ups
+        self.time_expired = False
         
         # Dual-Layer Progress State
         self.global_completed_questions = 0  # Macro: 0-15 chunks
@@ -70,145 +49,137 @@ class ConversationManager:
         self.current_section_question_count = 0 # 0-3 internal tracker
 
     def setup_evaluation(self, time_limit_mins: int = 15):
-        """Configure evaluation depth based on selected time limit."""
+        """Configure evaluation depth based on selected time limit (flow time-budget tiers)."""
         self.time_limit_mins = time_limit_mins
-        if time_limit_mins <= 5:
-            self.max_follow_ups = 0   # Rush: core questions only
-        elif time_limit_mins <= 15:
-            self.max_follow_ups = 1   # Standard: 1 follow-up allowed
-        else:
-            self.max_follow_ups = 3   # Deep-dive: thorough follow-ups
+        self.max_follow_ups = self.flow.budget_tier(time_limit_mins).get("follow_ups", 1)
+        self.follow_up_limit = self.max_follow_ups
+        if Config.SESSION_TIME_LIMITS:
+            self.clock.start(time_limit_mins)
 
-    def update_history(self, user_text: str, ai_text: str):
-        self.history.append(HumanMessage(content=user_text))
-        self.history.append(AIMessage(content=ai_text))
+    def questions_left(self) -> int:
+        """Core questions not yet asked, including the current one."""
+        if self.section_index < 0:
+            return sum(len(s_info["questions"]) for s_info in self.questions)
+        left = sum(len(s_info["questions"]) for s_info in self.questions[self.section_index + 1:])
+        if self.section_index < len(self.questions):
+            left += len(self.questions[self.section_index]["questions"]) - self.question_in_section_index
+        return left
+
+    def adaptive_follow_ups(self) -> int:
+        """Follow-ups per question that still fit in the remaining time, capped by the tier."""
+        affordable = self.clock.affordable_exchanges(self.flow.seconds_per_exchange())
+        if affordable is None:
+            return self.max_follow_ups
+        # Each core question costs one exchange; whatever is left over goes to follow-ups
+        per_question = affordable // max(1, self.questions_left()) - 1
+        return max(0, min(self.max_follow_ups, per_question))
 
-    def _normalize(self, text: str) -> str:
-        import string
-        lowered = text.lower()
-        # Remove punctuation
-        no_punct = "".join(char for char in lowered if char not in string.punctuation)
-        # Normalize whitespace
-        return " ".join(no_punct.split())
+    def update_history(self, user_text: str, ai_text: str):
+        self.history.append(Turn(HUMAN, user_text))
+        self.history.append(Turn(AI, ai_text))
 
-    def get_state_instruction(self, user_input: str, has_image: bool) -> str:
+    def get_state_instruction(self, user_input: str, has_image: bool) -> StateInstruction:
         """
         Returns the System Prompt instruction AND internal reasoning hints 
-        based on the current state.
+        for the state this input leads to, with the templated reply when it
+        is fully determined. Nothing changes until `apply_instruction`.
         """
+        state = self.state
+        changes = {}
+
+        # Out of time: the next turn is the closing summary, whatever the state
+        if self.clock.expired() and state != self.State.COMPLETED:
+            state = self.State.COMPLETED
+            changes.update(section_progress=100.0, time_expired=True)
+
+        # One pass over the input for every trigger category
+        triggers = trigger_matcher.scan(user_input)
         
-        # Check for state transitions BEFORE generating instructions
-        if self.state == ConversationState.PASSIVE_LISTENING:
-            trigger_phrases = [
-                "that's it", "that is it", "that's all", "that is all",
-                "done explaining", "finished explaining", 
-                "what do you think", "ready for questions",
-                "basically it", "started"
-            ]
-            user_lower = user_input.lower()
-            if any(phrase in user_lower for phrase in trigger_phrases):
-                self.state = ConversationState.EVALUATION
-                self.section_index = 0
-                self.question_in_section_index = 0
-                self.global_completed_questions = 0
-                self.section_progress = 0.0
-        
-        base_instruction = (
-            "You are Essence, an expert Technical Interviewer and Examiner.\n"
-            "Your goal is to EVALUATE the user's knowledge of the hosted project they are showing via screenshots.\n"
-            "Do NOT act as a coding assistant. Do NOT offer to write code.\n"
-            "Act like a professor or senior engineer conducting a Viva Voce.\n\n"
-            "STRICT CONSTRAINTS:\n"
-            "1. NEVER request a live demo or a project URL/Link. Only ask for screenshots of the live, hosted project.\n"
-            "2. NEVER request to see the source code or ask questions about specific implementation code details.\n"
-            "3. FOCUS your evaluation on the live project's architecture, user flows, and high-level logic based on the screenshots.\n"
-            "4. Ask **ONLY ONE** question at a time. Never ask a second question or 'Also' in the same turn.\n"
-            "5. Keep your responses concise (under 2 sentences unless summarizing).\n"
-            "6. Once you ask a question, STOP. Wait for the user to answer.\n"
-        )
-        
-        state_specific = ""
+        # Check for state transitions BEFORE generating instructions (compiled table lookup)
+        next_state = self.flow.trigger_transition(state, triggers)
+        if next_state is not None:
+            state = next_state
+            if next_state == self.State.EVALUATION:
+                changes.update(section_index=0, question_in_section_index=0, global_completed_questions=0, section_progress=0.0)
+        changes["state"] = state
 
-        if self.state == ConversationState.PASSIVE_LISTENING:
-            state_specific = (
-                "STATE: PASSIVE_LISTENING (User is presenting)\n"
-                "- The user is explaining their project.\n"
-                "- LISTEN ACTIVELY. Do not interrupt with questions yet.\n"
-                "- Reply with short acknowledgments (e.g., 'I see', 'Okay', 'Go on').\n"
-                "- If the user indicates they are done (e.g., 'That's it', 'Ready'), "
-                "briefly acknowledge and say you will now start the evaluation.\n"
-            )
+        state_specific = ""
+        templated_response = None
 
-        elif self.state == ConversationState.EVALUATION:
-            s_info = EVALUATION_QUESTIONS[self.section_index]
+        if state == self.State.EVALUATION:
+            section_index = changes.get("section_index", self.section_index)
+            s_info = self.questions[section_index]
             section = s_info["section"]
-            questions = s_info["questions"]
-            question = questions[self.question_in_section_index]
+            question = s_info["questions"][changes.get("question_in_section_index", self.question_in_section_index)]
+            # Follow-up depth for this turn, shrunk when the session is running out of time
+            follow_up_limit = changes["follow_up_limit"] = self.adaptive_follow_ups()
             
             # Check if we should prompt for screenshots
-            if self.should_ask_for_screenshot(user_input):
-                 state_specific = (
-                     f"STATE: EVALUATION (Section: {section})\n"
-                     "The user just provided an answer that mentions visual UI, screens, or outputs.\n"
-                     "PROMPT: 'If available, please share relevant screenshots of the output or functionality to better understand the result.'\n"
-                     "Do NOT ask the next question yet. Just give this optional prompt and wait.\n"
-                 )
-            elif self.follow_up_count < self.max_follow_ups:
-                state_specific = (
-                    f"STATE: EVALUATION (Current Scope: {section})\n"
-                    f"Current Core Question: \"{question}\"\n\n"
-                    f"TIME CONTEXT: The user selected a {self.time_limit_mins}-minute session. "
-                    f"{'Move quickly through questions — avoid excessive follow-ups.' if self.time_limit_mins <= 5 else 'Balance depth with pace.' if self.time_limit_mins <= 15 else 'Take your time to explore answers thoroughly.'}\n\n"
-                    "ADAPTIVE FOLLOW-UP MODE:\n"
-                    "1. Evaluate if the answer to the previous core question or follow-up needs clarification.\n"
-                    "- Is it too high-level or vague?\n"
-                    "- Is it missing obvious details implied by the question?\n"
-                    "- Is it internally inconsistent or overly abstract?\n"
-                    "2. If clarification is needed, ASK A FOLLOW-UP. Keep it short, focused, and concrete.\n"
-                    f"3. If the answer is clear, consistent, and specific, ask the current Core Question EXHIBITING THIS EXACT TEXT: \"{question}\"\n"
-                    f"4. If you have already asked {self.follow_up_count}/{self.max_follow_ups} follow-up(s), prioritize moving to the core question.\n"
+            if self.should_ask_for_screenshot(user_input, triggers, section_index):
+                state_specific = self.flow.render("EVALUATION.screenshot", section=section)
+                templated_response = SCREENSHOT_PROMPT
+            elif self.follow_up_count < follow_up_limit:
+                state_specific = self.flow.render(
+                    "EVALUATION.follow_up",
+                    section=section,
+                    question=question,
+                    time_limit_mins=self.time_limit_mins,
+                    pace=self.flow.budget_tier(self.time_limit_mins).get("pace", ""),
+                    follow_up_count=self.follow_up_count,
+                    max_follow_ups=follow_up_limit
                 )
             else:
-                state_specific = (
-                    f"STATE: EVALUATION (Section: {section})\n"
-                    f"ASK THIS EXACT CORE QUESTION: \"{question}\"\n"
-                    "- Do NOT vary the wording significantly.\n"
-                    "- Do NOT ask any other question.\n"
-                )
+                state_specific = self.flow.render("EVALUATION.core", section=section, question=question)
+                templated_response = question
+        elif changes.get("time_expired", self.time_expired) and state == self.State.COMPLETED:
+            state_specific = self.flow.prompt("COMPLETED.time_up")
+        else:
+            state_specific = self.flow.prompt(state.name)
 
-        elif self.state == ConversationState.COMPLETED:
-            state_specific = (
-                "STATE: COMPLETED\n"
-                "- You have finished all sections.\n"
-                "- Summarize the evaluation briefly and thank the user.\n"
-                "- Inform them that they can now generate the full report.\n"
-            )
+        return StateInstruction(self.flow.base_prompt + "\n" + state_specific, state, changes, templated_response)
 
-        return base_instruction + "\n" + state_specific
+    def apply_instruction(self, instruction: StateInstruction):
+        """Commits the transition computed by `get_state_instruction`."""
+        for name, value in instruction.changes.items():
+            setattr(self, name, value)
+        self.templated_response = instruction.templated_response
 
-    def should_ask_for_screenshot(self, user_input: str) -> bool:
+    def get_evaluation_target(self) -> Optional[dict]:
+        """The question the user's next answer responds to, for per-turn scoring."""
+        if self.state != self.State.EVALUATION or not self.history:
+            return None
+        s_info = self.questions[self.section_index]
+        return {
+            "section": s_info["section"],
+            "question": self.history[-1].content,
+            "criteria": f"Core question: {s_info['questions'][self.question_in_section_index]}"
+        }
+
+    def should_ask_for_screenshot(self, user_input: str, triggers: Optional[set] = None, section_index: Optional[int] = None) -> bool:
         """Determines if a screenshot prompt should be shown."""
-        if self.section_index < 0 or self.section_index >= len(EVALUATION_QUESTIONS):
+        if section_index is None:
+            section_index = self.section_index
+        if section_index < 0 or section_index >= len(self.questions):
             return False
             
-        s_info = EVALUATION_QUESTIONS[self.section_index]
+        s_info = self.questions[section_index]
         if not s_info["screenshots_relevant"]:
             return False
             
         if self.last_ai_question_was_screenshot_prompt:
             return False
 
-        keywords = ["ui", "interface", "visual", "output", "dashboard", "screen", "result", "chart", "page", "display", "view", "look"]
-        user_lower = user_input.lower()
-        return any(kw in user_lower for kw in keywords)
+        if triggers is None:
+            triggers = trigger_matcher.scan(user_input)
+        return "screenshot" in triggers
 
     def check_state_transition(self, user_input: str, ai_response: str) -> None:
         """Logic to transition states and update progress."""
-        if self.state != ConversationState.EVALUATION:
+        if self.state != self.State.EVALUATION:
             return
 
         ai_lower = ai_response.lower()
-        s_info = EVALUATION_QUESTIONS[self.section_index]
+        s_info = self.questions[self.section_index]
         questions = s_info["questions"]
         current_core_q = questions[self.question_in_section_index]
         
@@ -220,14 +191,11 @@ class ConversationManager:
         # 2. Update Progress (Dual-Layer Model)
         num_q_in_section = len(questions)
         micro_increment = 100.0 / num_q_in_section
-        
-        normalized_core = self._normalize(current_core_q)
-        normalized_ai = self._normalize(ai_lower)
 
         # We increment progress if we successfully moved past a question (core or follow-up limit)
         did_move_past_question = False
 
-        if normalized_core in normalized_ai:
+        if self.question_matcher.matches(current_core_q, ai_response):
             did_move_past_question = True
             self.question_in_section_index += 1
             self.follow_up_count = 0
@@ -235,7 +203,7 @@ class ConversationManager:
         else:
             self.follow_up_count += 1
             self.last_ai_question_was_screenshot_prompt = False
-            if self.follow_up_count >= max(1, self.max_follow_ups + 1): 
+            if self.follow_up_count >= max(1, self.follow_up_limit + 1): 
                 did_move_past_question = True
                 self.question_in_section_index += 1
                 self.follow_up_count = 0
@@ -254,34 +222,35 @@ class ConversationManager:
             # Reset Section Progress for new phase
             self.section_progress = 0.0
 
-        if self.section_index >= len(EVALUATION_QUESTIONS):
-            self.state = ConversationState.COMPLETED
+        if self.section_index >= len(self.questions):
+            self.state = self.State.COMPLETED
             self.section_progress = 100.0
 
     def get_progress_data(self):
         section_name = "N/A"
         completed_sections = 0
 
-        if self.state == ConversationState.PASSIVE_LISTENING:
-            section_name = "Project Understanding"
+        if self.state == self.State.PASSIVE_LISTENING:
+            section_name = self.questions[0]["section"]
             completed_sections = 0
-        elif 0 <= self.section_index < len(EVALUATION_QUESTIONS):
-            section_name = EVALUATION_QUESTIONS[self.section_index]["section"]
+        elif 0 <= self.section_index < len(self.questions):
+            section_name = self.questions[self.section_index]["section"]
             completed_sections = self.section_index
-        elif self.state == ConversationState.COMPLETED:
+        elif self.state == self.State.COMPLETED:
             section_name = "Evaluation Completed"
-            completed_sections = 5  # All 5 eval sections done → Results/Report phase
+            completed_sections = len(self.questions)  # All eval sections done → Results/Report phase
             
         return {
             "macro_completed_chunks": completed_sections,
             "micro_section_progress": min(round(self.section_progress, 1), 100.0),
             "section": section_name,
-            "state": self.state.name
+            "state": self.state.name,
+            **self.clock.snapshot()
         }
 
     def reset(self):
         self.history = []
-        self.state = ConversationState.PASSIVE_LISTENING
+        self.state = self.flow.initial_state
         self.section_index = -1
         self.question_in_section_index = 0
         self.follow_up_count = 0
@@ -289,6 +258,10 @@ class ConversationManager:
         self.global_completed_questions = 0
         self.section_progress = 0.0
         self.current_section_question_count = 0
+        self.templated_response = None
         self.time_limit_mins = 15
         self.max_follow_ups = 1
+        self.follow_up_limit = 1
+        self.time_expired = False
+        self.clock.reset()
 
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger("FlowEngine")
+
+class FlowDefinitionError(ValueError):
+    pass
+
+def _join(lines) -> str:
+    # Prompts are stored as lists of lines; every line ends with a newline
+    if isinstance(lines, str):
+        return lines
+    return "\n".join(lines) + "\n"
+
+@dataclass
+class StateInstruction:
+    """
+    The system prompt for the next reply and the transition that leads to it.
+    Building one changes nothing; the manager's `apply_instruction` commits
+    `changes` once the turn goes ahead (e.g. after the input was screened).
+    """
+    prompt: str
+    state: Enum
+    # Manager attributes set by the transition, `state` included
+    changes: Dict = field(default_factory=dict)
+    # Exact reply text when the state machine fully determines the turn (zero-LLM fast path)
+    templated_response: Optional[str] = None
+
+class CompiledFlow:
+    """
+    One interview type, compiled from its declarative definition.
+
+    States become an Enum, transition rules become dict lookups keyed by
+    (route, state) and (state, trigger), and prompts are joined once.
+    Nothing in here walks branches or rebuilds strings per turn.
+    """
+
+    def __init__(self, spec: Dict):
+        self.name = spec["name"]
+        self.kind = spec.get("kind", "state_walk")
+        self.State = Enum(spec.get("state_enum", f"{self.name.title().replace('_', '')}State"), spec["states"])
+
+        self.initial_state = self._state(spec.get("initial_state", spec["states"][0]))
+        self.final_state = self._state(spec["final_state"])
+        self.constants = spec.get("constants", {})
+        self.question_bank: List[Dict] = spec.get("question_bank", [])
+        self.time_budget = spec.get("time_budget", {})
+        self.base_prompt = _join(spec.get("base_prompt", []))
+        self.prompts: Dict[str, str] = {key: _join(lines) for key, lines in spec.get("prompts", {}).items()}
+        for key in self.prompts:
+            self._state(key.split(".", 1)[0])
+
+        # Routes: ordered state sequences, one per focus mode
+        self.routes: Dict[str, List] = {
+            route: [self._state(name) for name in names]
+            for route, names in spec.get("routes", {}).items()
+        }
+        self.default_route = spec.get("default_route", next(iter(self.routes), None))
+        if self.routes and self.default_route not in self.routes:
+            raise FlowDefinitionError(f"{self.name}: unknown default_route '{self.default_route}'")
+
+        # (route, state) -> next state. States outside a route jump to the final state.
+        self.transitions: Dict[Tuple[str, Enum], Enum] = {}
+        for route, sequence in self.routes.items():
+            for state in self.State:
+                if state != self.final_state:
+                    self.transitions[(route, state)] = self.final_state
+            for current, following in zip(sequence, sequence[1:] + [self.final_state]):
+                self.transitions[(route, current)] = following
+
+        # state -> {trigger category -> next state}; "*" applies to every non-final state
+        self.trigger_transitions: Dict[Enum, Dict[str, Enum]] = {}
+        for state_name, rules in spec.get("trigger_transitions", {}).items():
+            states = [s for s in self.State if s != self.final_state] if state_name == "*" else [self._state(state_name)]
+            for state in states:
+                table = self.trigger_transitions.setdefault(state, {})
+                for category, target in rules.items():
+                    table[category] = self._state(target)
+
+        self._rendered: Dict[Tuple, str] = {}
+
+    def _state(self, name: str):
+        try:
+            return self.State[name]
+        except KeyError:
+            raise FlowDefinitionError(f"{self.name}: unknown state '{name}'")
+
+    def entry_state(self, route: Optional[str] = None):
+        sequence = self.routes.get(route) or self.routes.get(self.default_route)
+        return sequence[0] if sequence else self.initial_state
+
+    def resolve_route(self, route: Optional[str]) -> Optional[str]:
+        return route if route in self.routes else self.default_route
+
+    def next_state(self, route: str, state):
+        return self.transitions.get((route, state), self.final_state)
+
+    def trigger_transition(self, state, triggers: Iterable[str]):
+        table = self.trigger_transitions.get(state)
+        if not table:
+            return None
+        for category in triggers:
+            if category in table:
+                return table[category]
+        return None
+
+    def prompt(self, key: str) -> str:
+        return self.prompts.get(key, "")
+
+    def render(self, key: str, **values) -> str:
+        """Formats a prompt template; results are memoised per set of values."""
+        cache_key = (key,) + tuple(sorted(values.items()))
+        rendered = self._rendered.get(cache_key)
+        if rendered is None:
+            rendered = self.prompts.get(key, "").format(**self.constants, **values)
+            self._rendered[cache_key] = rendered
+        return rendered
+
+    def render_base(self, **values) -> str:
+        return self.base_prompt.format(**self.constants, **values)
+
+    def budget_tier(self, time_limit_mins: int) -> Dict:
+        """First time-budget tier whose max_mins covers the session length."""
+        for tier in self.time_budget.get("tiers", []):
+            if tier.get("max_mins") is None or time_limit_mins <= tier["max_mins"]:
+                return tier
+        return {}
+
+    def seconds_per_exchange(self) -> float:
+        """Typical length of one question/answer exchange, for wall-clock pacing."""
+        budget = self.time_budget
+        if "seconds_per_exchange" in budget:
+            return budget["seconds_per_exchange"]
+        return budget.get("minutes_per_question", 0.75) * 60
+
+    def states_left(self, route: str, state) -> int:
+        """States still to visit on `route`, including the current one."""
+        count = 0
+        while state != self.final_state:
+            count += 1
+            state = self.next_state(route, state)
+        return count
+
+    def questions_per_state(self, time_limit_mins: int) -> int:
+        budget = self.time_budget
+        total_questions = max(budget.get("min_total_questions", 7), int(time_limit_mins // budget.get("minutes_per_question", 1.5)))
+        return max(1, total_questions // budget.get("budgeted_states", 7))
+
+
+class FlowEngine:
+    """Loads every flow definition in a directory once and keeps them compiled."""
+
+    def __init__(self, flows_dir: str):
+        self.flows: Dict[str, CompiledFlow] = {}
+        for filename in sorted(os.listdir(flows_dir)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(flows_dir, filename), encoding="utf-8") as f:
+                flow = CompiledFlow(json.load(f))
+            self.flows[flow.name] = flow
+        logger.info(f"Loaded interview flows: {', '.join(self.flows)}")
+
+    def get(self, name: str) -> CompiledFlow:
+        return self.flows[name]
+
+
+# Global instance
+flow_engine = FlowEngine(Config.FLOWS_DIR)
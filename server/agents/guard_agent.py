@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+from agents.usage_ledger import usage_ledger
+
+logger = logging.getLogger("GuardAgent")
+
+@dataclass(frozen=True)
+class Verdict:
+    label: str  # "safe" | "injection" | "abuse"
+    score: float
+    source: str
+    reason: str = ""
+
+    @property
+    def flagged(self) -> bool:
+        return self.label != "safe"
+
+SAFE = Verdict("safe", 0.0, "none")
+
+# (name, pattern, weight); weights add up, so one weak hint alone is not enough
+INJECTION_PATTERNS = [
+    ("override_instructions", r"\b(ignore|disregard|forget|override)\b.{0,40}\b(previous|prior|above|earlier|all|your)\b.{0,20}\b(instructions?|prompts?|rules|directions)", 1.0),
+    ("reveal_system_prompt", r"\b(reveal|print|show|repeat|output)\b.{0,30}\b(system|hidden|initial)\s+(prompt|instructions?|message)", 1.0),
+    ("role_reassignment", r"\byou\s+are\s+now\b|\bfrom\s+now\s+on,?\s+you\b", 0.6),
+    ("jailbreak_mode", r"\b(developer|dan|jailbreak|god)\s+mode\b|\bjailbreak\b", 0.8),
+    ("unrestricted_persona", r"\bpretend\s+(to\s+be|you\s+are)\b|\bact\s+as\s+(an?\s+)?(unfiltered|unrestricted)", 0.6),
+    ("chat_template_tokens", r"<\|im_start\|>|<\|system\|>|\[/?INST\]|^\s*#{2,}\s*(system|instruction)", 0.8),
+    ("score_manipulation", r"\b(give|rate|score)\b.{0,20}\b(me|this candidate)\b.{0,20}\b(100|perfect|highest|full marks)\b", 0.6),
+    ("refuse_instructions", r"\bdo\s+not\s+follow\b.{0,30}\b(instructions?|rules)\b", 0.6),
+]
+ABUSE_PATTERNS = [
+    ("threat", r"\b(i\s+will|i'?m\s+going\s+to)\s+(kill|hurt|find)\s+you\b", 1.0),
+    ("weapons", r"\b(how\s+to\s+make|build)\s+(a\s+)?(bomb|explosive|weapon)\b", 1.0),
+]
+
+class HeuristicClassifier:
+    """Local stand-in for the hosted guard models: regex scoring, no network."""
+    name = "heuristic"
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        flags = re.IGNORECASE | re.MULTILINE | re.DOTALL
+        self.patterns = {
+            label: [(name, re.compile(pattern, flags), weight) for name, pattern, weight in patterns]
+            for label, patterns in (("abuse", ABUSE_PATTERNS), ("injection", INJECTION_PATTERNS))
+        }
+
+    async def classify(self, text: str) -> Verdict:
+        best = 0.0
+        for label, patterns in self.patterns.items():
+            hits = [(name, weight) for name, pattern, weight in patterns if pattern.search(text)]
+            score = min(1.0, sum(weight for _, weight in hits))
+            if score >= self.threshold:
+                return Verdict(label, score, self.name, ", ".join(name for name, _ in hits))
+            best = max(best, score)
+        return Verdict("safe", best, self.name)
+
+
+class PromptGuardClassifier:
+    """
+    Groq-hosted Llama Prompt Guard 2, which returns the probability that the
+    text is an injection/jailbreak. Its context is 512 tokens, so long text
+    (a resume) is scored in windows and the worst window counts. Any error
+    falls back to the local heuristic.
+    """
+    name = "prompt_guard"
+
+    def __init__(self, api_key: str, model_name: str, threshold: float = 0.5, window_chars: int = 1800,
+                 fallback: Optional[HeuristicClassifier] = None):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.threshold = threshold
+        self.window_chars = window_chars
+        self.fallback = fallback or HeuristicClassifier()
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import AsyncGroq
+            self._client = AsyncGroq(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    async def _score_window(self, window: str) -> float:
+        started = time.perf_counter()
+        response = await self.client.chat.completions.create(model=self.model_name, messages=[{"role": "user", "content": window}])
+        usage_ledger.record_response("guard", self.model_name, response, (time.perf_counter() - started) * 1000)
+        return float(response.choices[0].message.content.strip())
+
+    async def classify(self, text: str) -> Verdict:
+        windows = [text[i:i + self.window_chars] for i in range(0, len(text), self.window_chars)] or [""]
+        try:
+            score = max(await asyncio.gather(*(self._score_window(w) for w in windows)))
+        except Exception as e:
+            logger.warning(f"Prompt guard unavailable, using heuristic: {e}")
+            return await self.fallback.classify(text)
+        label = "injection" if score >= self.threshold else "safe"
+        return Verdict(label, round(score, 4), self.name)
+
+
+class GuardAgent:
+    """
+    Screens untrusted text (transcripts, resumes) so flagged input is kept out of the interview.
+
+    Verdicts are cached by content hash, and concurrent screens of the same
+    text share one classification, so a resume is classified once per
+    process, not once per turn.
+    """
+    def __init__(self, classifier, cache_size: int = 2048):
+        self.classifier = classifier
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Verdict]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"screened": 0, "cache_hits": 0, "flagged": 0}
+
+    async def screen(self, text: str) -> Verdict:
+        if not text or not text.strip():
+            return SAFE
+        self.stats["screened"] += 1
+        key = hashlib.sha256(text.encode("utf-8", "ignore")).hexdigest()
+
+        verdict = self._cache.get(key)
+        if verdict is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return verdict
+        if key in self._inflight:
+            self.stats["cache_hits"] += 1
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            verdict = await self.classifier.classify(text)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here; waiters re-raise it
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(verdict)
+
+        self._cache[key] = verdict
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        if verdict.flagged:
+            self.stats["flagged"] += 1
+            logger.warning(f"Guard flagged text as {verdict.label} ({verdict.source}, score {verdict.score}): {verdict.reason}")
+        return verdict
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, classifier=self.classifier.name, cached=len(self._cache))
+
+
+def build_guard(mode: str, api_key: Optional[str] = None, model_name: str = "", threshold: float = 0.5) -> Optional[GuardAgent]:
+    """GUARD_MODE: "off", "local" (heuristic only) or "prompt_guard" (hosted model, heuristic fallback)."""
+    if mode == "off":
+        return None
+    if mode == "prompt_guard":
+        return GuardAgent(PromptGuardClassifier(api_key, model_name, threshold=threshold))
+    return GuardAgent(HeuristicClassifier())
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Union
+from fastapi.responses import JSONResponse
+from starlette.websockets import WebSocket
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json keeps everything working, just slower
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def dumps(obj: Any) -> bytes:
+        """Compact UTF-8 JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        return orjson.loads(data)
+else:
+    JSONDecodeError = json.JSONDecodeError
+
+    def dumps(obj: Any) -> bytes:
+        """Compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: renders straight to bytes with the fast backend."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+async def send_json(websocket: WebSocket, message: Any, binary: bool = False):
+    """
+    Sends one JSON message. Binary frames carry the encoded bytes as-is; text
+    frames need a str per the ASGI spec, so the bytes are decoded exactly once.
+    """
+    data = dumps(message)
+    if binary:
+        await websocket.send_bytes(data)
+    else:
+        await websocket.send_text(data.decode("utf-8"))
+
+
+def receive_json(message: dict) -> Any:
+    """Parses the JSON payload of a raw `websocket.receive()` message (text or bytes frame)."""
+    data = message.get("text")
+    if data is None:
+        data = message.get("bytes")
+    return loads(data)
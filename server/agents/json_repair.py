@@ -0,0 +1,138 @@
+import json
+from typing import Any, List, Optional
+from agents import json_codec
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]:" + _WHITESPACE
+
+
+class TolerantJSONParser:
+    """
+    Incremental JSON parser for LLM output.
+
+    Feed it chunks as they stream in; each character is scanned once. It skips
+    leading prose / markdown fences, ignores trailing garbage after the root
+    value, and if the output was truncated it cuts back to the last complete
+    value and closes any open objects/arrays.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.repaired = False
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        # Each entry is [bracket, expecting_key]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._scalar_start: Optional[int] = None
+        # Last position where the prefix can be closed into valid JSON
+        self._safe_end: Optional[int] = None
+        self._safe_closers = ""
+
+    def feed(self, chunk: str) -> None:
+        if self._end is not None or not chunk:
+            return
+        self.text += chunk
+        self._scan()
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def result(self) -> Any:
+        """Returns the parsed value, repairing truncated output if needed."""
+        if self._start is None:
+            raise ValueError("No JSON object found in response")
+
+        if self._end is not None:
+            return json_codec.loads(self.text[self._start:self._end])
+
+        if self._safe_end is None:
+            raise ValueError("Response truncated before any complete value")
+        self.repaired = True
+        return json_codec.loads(self.text[self._start:self._safe_end] + self._safe_closers)
+
+    def _closers(self) -> str:
+        return "".join("}" if entry[0] == "{" else "]" for entry in reversed(self._stack))
+
+    def _mark_safe(self, position: int) -> None:
+        self._safe_end = position
+        self._safe_closers = self._closers()
+
+    def _scan(self) -> None:
+        text = self.text
+        i = self._pos
+        n = len(text)
+
+        if self._start is None:
+            while i < n and text[i] not in "{[":
+                i += 1
+            if i == n:
+                self._pos = i
+                return
+            self._start = i
+
+        while i < n:
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if not self._string_is_key:
+                        self._mark_safe(i + 1)
+                i += 1
+                continue
+
+            if self._scalar_start is not None:
+                if c not in _SCALAR_END:
+                    i += 1
+                    continue
+                # Bare literal / number finished; validate it before trusting it
+                token = text[self._scalar_start:i]
+                self._scalar_start = None
+                try:
+                    json.loads(token)
+                    self._mark_safe(i)
+                except ValueError:
+                    pass
+
+            if c == '"':
+                self._in_string = True
+                top = self._stack[-1] if self._stack else None
+                self._string_is_key = bool(top and top[0] == "{" and top[1])
+            elif c in "{[":
+                self._stack.append([c, c == "{"])
+                self._mark_safe(i + 1)
+            elif c in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self._end = i + 1
+                    self._pos = self._end
+                    return
+                self._mark_safe(i + 1)
+            elif c == ":":
+                if self._stack:
+                    self._stack[-1][1] = False
+            elif c == ",":
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][1] = True
+            elif c not in _WHITESPACE:
+                self._scalar_start = i
+            i += 1
+
+        self._pos = i
+
+
+def repair_json(text: str) -> Any:
+    """Parses possibly fenced, truncated or trailing-garbage JSON text."""
+    parser = TolerantJSONParser()
+    parser.feed(text)
+    return parser.result()
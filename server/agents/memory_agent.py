@@ -1,13 +1,27 @@
 import os
-from groq import Groq
+import time
 import asyncio
 from typing import List, Dict
+from agents.usage_ledger import usage_ledger
 
 class MemoryAgent:
     def __init__(self, api_key: str, model_name: str):
-        self.client = Groq(api_key=api_key)
+        self.api_key = api_key
         self.model = model_name
         self.history = []
+        self._client = None
+
+    @property
+    def client(self):
+        # Built on first background update so importing the agent stays cheap
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
 
     async def update_memory(self, state_snapshot: Dict):
         # Fire-and-forget sync to Gemma
@@ -21,11 +35,14 @@ class MemoryAgent:
         prompt = f"Background Memory Update:\nState: {state_snapshot}\nCompress history and track state."
         try:
             # Using synchronous Groq call in executor for fire-and-forget
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=500
             )
+            usage_ledger.record_response("memory", self.model, response, (time.perf_counter() - started) * 1000,
+                                         session_id=state_snapshot.get("session_id"), state=state_snapshot.get("state"))
             # Log or store result internally
             print(f"Memory Agent Updated: {response.choices[0].message.content[:50]}...")
         except Exception as e:
@@ -0,0 +1,91 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+logger = logging.getLogger("ModelRouter")
+
+# Expected output size per conversation state (both state machines)
+EXPECTED_OUTPUT = {
+    "PASSIVE_LISTENING": "ack",
+    "COMPLETED": "summary",
+}
+
+# Token caps per expected output size; None leaves the provider default
+MAX_TOKENS = {
+    "ack": 60,
+    "question": 200,
+    "summary": 400,
+}
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+    expected_output: str
+    max_tokens: Optional[int] = None
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+
+class ModelRouter:
+    """
+    Picks the model for a turn from the conversation state, presence of images
+    and expected output length, and logs every decision with its latency.
+    """
+    def __init__(self, default_model: str, vision_model: str, ack_model: str, evaluation_model: str, enabled: bool = True):
+        self.default_model = default_model
+        self.vision_model = vision_model
+        self.ack_model = ack_model
+        self.evaluation_model = evaluation_model
+        self.enabled = enabled
+        # model -> {"turns", "first_token_ms", "total_ms"} running totals
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def route(self, mode: str, state: str, has_image: bool) -> RouteDecision:
+        expected_output = EXPECTED_OUTPUT.get(state, "question")
+
+        if not self.enabled:
+            return RouteDecision(self.default_model, "routing disabled", expected_output)
+
+        if has_image:
+            model, reason = self.vision_model, "image attached"
+        elif expected_output == "ack":
+            model, reason = self.ack_model, "acknowledgement only"
+        else:
+            model, reason = self.evaluation_model, f"{mode} {expected_output}"
+
+        return RouteDecision(model, reason, expected_output, MAX_TOKENS.get(expected_output))
+
+    def template(self) -> RouteDecision:
+        """Decision for a turn answered from a template without any model call."""
+        return RouteDecision("template", "deterministic turn", "template")
+
+    def mark_first_token(self, decision: RouteDecision):
+        if decision.first_token_at is None:
+            decision.first_token_at = time.perf_counter()
+
+    def record(self, decision: RouteDecision, mode: str, state: str, response_chars: int):
+        """Logs the decision with its time-to-first-token and total latency."""
+        end = time.perf_counter()
+        total_ms = (end - decision.started_at) * 1000
+        first_ms = ((decision.first_token_at or end) - decision.started_at) * 1000
+
+        entry = self.stats.setdefault(decision.model, {"turns": 0, "first_token_ms": 0.0, "total_ms": 0.0})
+        entry["turns"] += 1
+        entry["first_token_ms"] += first_ms
+        entry["total_ms"] += total_ms
+
+        logger.info(
+            f"route mode={mode} state={state} expected={decision.expected_output} -> {decision.model} "
+            f"({decision.reason}) first_token={first_ms:.0f}ms total={total_ms:.0f}ms chars={response_chars}"
+        )
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            model: {
+                "turns": entry["turns"],
+                "avg_first_token_ms": round(entry["first_token_ms"] / entry["turns"], 1),
+                "avg_total_ms": round(entry["total_ms"] / entry["turns"], 1),
+            }
+            for model, entry in self.stats.items()
+        }
@@ -1,73 +1,386 @@
 from agents.thinking_agent import ThinkingAgent
+from agents.turn_evaluator import TurnEvaluator
+from agents.model_router import ModelRouter, MAX_TOKENS
+from agents.admission import AdmissionController, AdmissionRejected, Priority, is_rate_limited
+from agents.usage_ledger import usage_ledger
+from agents.guard_agent import GuardAgent
+from agents.response_cache import ResponseCache, content_hash
+from agents.speculator import Speculator
 from typing import Optional, List
+from contextlib import aclosing
 import asyncio
+import logging
+
+logger = logging.getLogger("Orchestrator")
+
+# Appended to a partial response recorded in history, so the next turn knows it was cut off
+INTERRUPTED_MARKER = "[interrupted]"
+
+# Streamed instead of an error when the turn is shed under load; the state machine does not advance
+BUSY_MESSAGE = "I'm handling a lot of conversations right now. Give me a moment, then say that again."
+# Streamed instead of a model reply when the guard flags the user's answer / the resume
+GUARD_MESSAGE = "Let's keep to the interview. Could you answer the question in your own words?"
+GUARD_RESUME_MESSAGE = "I can't use the uploaded resume as it is. Please upload a plain copy of your resume to continue."
+# Injected on a resume-mode reset; the reply depends only on the session setup, so it is cached
+RESUME_OPENING_PROMPT = "[System] Resume loaded. Please briefly introduce yourself and immediately ask the first interview question based on the resume."
+# Stands in for the answer when the next section's first question is drafted ahead of the commit
+SPECULATIVE_PROMPT = "[System] The candidate has finished answering. Move on and ask the first question for this section."
+# Streamed once the session has used its token budget (SESSION_TOKEN_BUDGET)
+BUDGET_MESSAGE = "We've reached the limit for this session. Thanks for your time — you can generate your report now."
 
 class AgentOrchestrator:
-    def __init__(self, groq_api_key: str, thinking_model: str, memory_model: str):
+    def __init__(self, groq_api_key: str, thinking_model: str, memory_model: str, incremental_evaluation: bool = False, router: Optional[ModelRouter] = None, fast_path: bool = True, fast_path_bridge: bool = False, admission: Optional[AdmissionController] = None, guard: Optional[GuardAgent] = None, opening_cache: Optional[ResponseCache] = None, speculator: Optional[Speculator] = None):
         from agents.memory_agent import MemoryAgent
         from agents.conversation_manager import ConversationManager
-        from agents.resume_manager import ResumeConversationManager
+        from agents.resume_manager import ResumeConversationManager, RESUME_FLOW
+        from agents.flow_engine import flow_engine
         
         self.thinking_agent = ThinkingAgent(groq_api_key, thinking_model)
         self.memory_agent = MemoryAgent(groq_api_key, memory_model)
         self.conversation_manager = ConversationManager()
         self.resume_manager = ResumeConversationManager()
+        # Any additional state-walk flow definition is selectable by its name as the mode
+        self.flow_managers = {
+            name: ResumeConversationManager(flow)
+            for name, flow in flow_engine.flows.items()
+            if flow.kind == "state_walk" and flow is not RESUME_FLOW
+        }
         self.current_mode = "project"
+        # Without a router every turn goes to the thinking model
+        self.router = router or ModelRouter(thinking_model, thinking_model, thinking_model, thinking_model, enabled=False)
+        # Deterministic turns are streamed from a template instead of the LLM
+        self.fast_path = fast_path
+        self.fast_path_bridge = fast_path_bridge
+        # Optional background scoring of each answer (final report becomes an aggregation)
+        self.turn_evaluator = TurnEvaluator(groq_api_key, memory_model, admission=admission) if incremental_evaluation else None
+        # Groq admission: live turns first, background memory/scoring calls shed first
+        self.admission = admission
+        # Screens transcripts and resume text before a turn's reply or transition goes through (None = off)
+        self.guard = guard
+        # Completed resume opening turns, replayed when the same resume is restarted
+        self.opening_cache = opening_cache
+        # Optional drafting of the next turn while the user answers (None = off)
+        self.speculator = speculator
+        # Interrupted generations (cancel / barge-in / reset / disconnect)
+        self.cancellation_stats = {"cancelled_turns": 0, "partial_chars": 0, "est_tokens_saved": 0}
 
     def set_mode(self, mode: str, resume_text: str = "", focus_mode: str = "general", time_limit_mins: int = 15):
         self.current_mode = mode
-        if mode == "resume":
-            self.resume_manager.setup_interview(resume_text, focus_mode, time_limit_mins)
+        if mode == "resume" or mode in self.flow_managers:
+            self.active_manager.setup_interview(resume_text, focus_mode, time_limit_mins)
         else:
             self.conversation_manager.setup_evaluation(time_limit_mins)
-    async def run_flow(self, transcript: str, image_data: List[str] = None):
-        manager = self.resume_manager if self.current_mode == "resume" else self.conversation_manager
+
+    @property
+    def active_manager(self):
+        if self.current_mode == "resume":
+            return self.resume_manager
+        return self.flow_managers.get(self.current_mode, self.conversation_manager)
+
+    async def run_flow(self, transcript: str, image_data: List[str] = None, session_id: Optional[str] = None, cancel_event: Optional[asyncio.Event] = None, tenant: str = "default", trusted: bool = False):
+        """
+        Streams one turn. Setting `cancel_event` (or cancelling the consuming task)
+        stops the turn: the upstream stream is closed, the partial response is
+        recorded in history and the state machine does not advance.
+        `trusted` marks a prompt the server wrote (RESUME_OPENING_PROMPT): it is
+        neither screened nor scored. Anything typed or spoken is untrusted, even
+        when it starts with "[System]".
+        """
+        manager = self.active_manager
+
+        # Runs while the turn is prepared and the model starts; awaited before the first
+        # chunk goes out, so a flagged input never reaches the client, the history or the state machine
+        screening = asyncio.ensure_future(self._screen(manager, transcript, trusted)) if self.guard else None
+        cleared = False
+
+        async def clear() -> Optional[str]:
+            """The guard message when the input is flagged; otherwise commits the transition."""
+            nonlocal cleared
+            if screening:
+                guard_message = await screening
+                if guard_message:
+                    return guard_message
+            manager.apply_instruction(instruction)
+            cleared = True
+            return None
+
+        # 0. Capture what this answer responds to before the state machine moves on
+        evaluation_target = None
+        if self.turn_evaluator and session_id and not trusted:
+            evaluation_target = manager.get_evaluation_target()
         
-        # 1. Get State-Specific Instructions
-        system_prompt = manager.get_state_instruction(
+        # 1. Get State-Specific Instructions (the transition is only applied by clear())
+        instruction = manager.get_state_instruction(
             transcript, 
             has_image=(image_data and len(image_data) > 0)
         )
+        system_prompt = instruction.prompt
         
-        # 2. Get History
+        # 2. Pick the model for this turn, for the state the input leads to
+        state_name = instruction.state.name
+        templated = instruction.templated_response if self.fast_path else None
+        if self.speculator and session_id:
+            # Used only if it was drafted from exactly the prompt this answer leads to
+            draft = self.speculator.take(session_id, self._draft_key(manager, instruction, bool(image_data)))
+            templated = templated or draft
+        if templated:
+            route = self.router.template()
+        else:
+            route = self.router.route(self.current_mode, state_name, has_image=bool(image_data))
+
+        # 3. Get History
         history = manager.history
         
-        # 3. Get Memory
+        # 4. Get Memory
         memory_context = self.memory_agent.get_context()
+        # Attributes this turn's provider usage in the ledger
+        usage_tags = {"session_id": session_id, "state": state_name}
         
-        # 4. Stream Response
+        # 5. Stream Response
         # We need to capture the full response to update state history
         full_response = ""
+        opening_key = None
+        if self.opening_cache and self.current_mode == "resume" and trusted and transcript == RESUME_OPENING_PROMPT and not history:
+            opening_key = self._opening_key(manager, route.model, system_prompt)
+        cached_opening = None
         
         # Note: ThinkingAgent.stream_critique might need update for multiple images.
         # For now, we pass the first image if available, or the list if it supports it.
         # Looking at previous code, it seems it expected a single string.
         primary_image = image_data[0] if image_data and len(image_data) > 0 else None
 
-        async for chunk in self.thinking_agent.stream_critique(
-            transcript, 
-            primary_image, 
-            memory_context, 
-            history=history,
-            custom_system_prompt=system_prompt,
-            mode=self.current_mode
-        ):
-            full_response += chunk
-            yield chunk
-
-        # 5. Update Conversation State & History (Main Thread)
+        cancelled = False
+        try:
+            if templated:
+                # Zero-LLM fast path: the known text goes out as soon as the input is cleared
+                guard_message = await clear()
+                if guard_message:
+                    yield guard_message
+                    return
+                self.router.mark_first_token(route)
+                full_response = templated
+                yield templated
+                if self.fast_path_bridge and not (cancel_event and cancel_event.is_set()) and not usage_ledger.over_budget(session_id):
+                    try:
+                        bridge_model = self.router.route(self.current_mode, "PASSIVE_LISTENING", has_image=False).model
+                        if self.admission:
+                            await self.admission.acquire(Priority.LIVE, tenant)
+                        first = True
+                        async with aclosing(self.thinking_agent.stream_bridge(transcript, model_name=bridge_model, usage_tags=usage_tags)) as stream:
+                            async for chunk in stream:
+                                if first:
+                                    chunk = " " + chunk.lstrip()
+                                    first = False
+                                full_response += chunk
+                                yield chunk
+                                if cancel_event and cancel_event.is_set():
+                                    break
+                    except Exception as e:
+                        # The templated question already went out; the bridge is optional
+                        logger.warning(f"Bridge sentence failed: {e}")
+            elif cancel_event and cancel_event.is_set():
+                cancelled = True
+            elif usage_ledger.over_budget(session_id):
+                logger.warning(f"Session {session_id} is over its token budget ({usage_ledger.session_tokens(session_id)} tokens)")
+                yield BUDGET_MESSAGE
+                return
+            else:
+                cached_opening = self.opening_cache.get(opening_key) if opening_key else None
+                if cached_opening:
+                    # Same resume and setup as an earlier session: replay, no LLM call
+                    guard_message = await clear()
+                    if guard_message:
+                        yield guard_message
+                        return
+                    route = self.router.template()
+                    self.router.mark_first_token(route)
+                    full_response = cached_opening
+                    yield cached_opening
+                    if cancel_event and cancel_event.is_set():
+                        cancelled = True
+                else:
+                    if self.admission:
+                        try:
+                            await self.admission.acquire(Priority.LIVE, tenant)
+                        except AdmissionRejected as e:
+                            logger.warning(f"Live turn shed in {state_name}: {e}")
+                            yield BUSY_MESSAGE
+                            return
+
+                    try:
+                        async with aclosing(self.thinking_agent.stream_critique(
+                            transcript, 
+                            primary_image, 
+                            memory_context, 
+                            history=history,
+                            custom_system_prompt=system_prompt,
+                            mode=self.current_mode,
+                            model_name=route.model,
+                            max_tokens=route.max_tokens,
+                            usage_tags=usage_tags
+                        )) as stream:
+                            async for chunk in stream:
+                                if not cleared:
+                                    # The model started while the input was screened; nothing goes out before the verdict
+                                    guard_message = await clear()
+                                    if guard_message:
+                                        yield guard_message
+                                        return
+                                self.router.mark_first_token(route)
+                                full_response += chunk
+                                yield chunk
+                                # Cooperative cancel: leaving the block closes the upstream stream
+                                if cancel_event and cancel_event.is_set():
+                                    cancelled = True
+                                    break
+                    except Exception as e:
+                        # Upstream quota hit before anything was said: back off instead of surfacing an error
+                        if not (self.admission and is_rate_limited(e) and not full_response):
+                            raise
+                        self.admission.throttle()
+                        logger.warning(f"Upstream rate limited in {state_name}: {e}")
+                        yield BUSY_MESSAGE
+                        return
+
+            if not cleared:
+                # Cancelled before the model started, or an empty reply: settle the verdict now
+                guard_message = await clear()
+                if guard_message:
+                    if not cancelled:
+                        yield guard_message
+                    return
+        except (asyncio.CancelledError, GeneratorExit):
+            # Hard interruption of the consuming task / closed by the consumer;
+            # before the verdict nothing was said and the input stays out of history
+            if cleared:
+                self._record_cancelled(manager, transcript, full_response, route, state_name)
+            raise
+        finally:
+            if screening and not screening.done():
+                screening.cancel()
+
+        if cancelled:
+            self._record_cancelled(manager, transcript, full_response, route, state_name)
+            return
+
+        self.router.record(route, self.current_mode, state_name, len(full_response))
+        if opening_key and not cached_opening:
+            self.opening_cache.put(opening_key, full_response)
+
+        # 6. Update Conversation State & History (Main Thread)
         manager.update_history(transcript, full_response)
         manager.check_state_transition(transcript, full_response)
         
-        # 6. Parallel fire-and-forget long-term memory update
+        # 7. Parallel fire-and-forget long-term memory update
         state_snapshot = {
             "transcript": transcript,
             "has_images": image_data is not None and len(image_data) > 0,
             "num_images": len(image_data) if image_data else 0,
-            "timestamp": "now"
+            "timestamp": "now",
+            "session_id": session_id,
+            "state": state_name
         }
-        asyncio.create_task(self.memory_agent.update_memory(state_snapshot))
+        if not cached_opening:
+            asyncio.create_task(self._update_memory(state_snapshot, tenant))
+
+        # 8. Background per-turn evaluation with the small model
+        if evaluation_target:
+            resume_text = getattr(manager, "resume_text", "")
+            self.turn_evaluator.schedule(session_id, evaluation_target, transcript, resume_text, tenant=tenant)
+
+    def prefetch(self, session_id: str, tenant: str = "default"):
+        """
+        Starts drafting the next turn while the user answers, when that turn
+        opens a new section of a state-walk interview, so its prompt does not
+        depend on the answer. A no-op otherwise.
+        """
+        manager = self.active_manager
+        if not self.speculator or self.current_mode == "project" or usage_ledger.over_budget(session_id):
+            return
+        if not manager.history or manager.questions_asked_in_current_state != 0 or manager.state == manager.flow.final_state:
+            return
+
+        # No triggers fire on an empty answer, so this is the prompt the commit will build unless the answer changes course
+        instruction = manager.get_state_instruction("", has_image=False)
+        system_prompt = instruction.prompt
+        key = self._draft_key(manager, instruction, False)
+        if not self.speculator.wants(session_id, key):
+            return
+        route = self.router.route(self.current_mode, instruction.state.name, has_image=False)
+        history = list(manager.history)
+        memory_context = self.memory_agent.get_context()
+        usage_tags = {"session_id": session_id, "state": instruction.state.name}
+
+        async def draft() -> str:
+            if self.admission:
+                # Lowest priority: speculation is the first thing to go under load
+                await self.admission.acquire(Priority.BACKGROUND, tenant)
+            chunks = []
+            async with aclosing(self.thinking_agent.stream_critique(
+                SPECULATIVE_PROMPT, None, memory_context, history=history, custom_system_prompt=system_prompt,
+                mode=self.current_mode, model_name=route.model, max_tokens=route.max_tokens,
+                usage_tags=usage_tags, endpoint="speculative"
+            )) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+            return "".join(chunks)
+
+        self.speculator.start(session_id, key, draft)
+
+    def discard_prefetch(self, session_id: str):
+        if self.speculator:
+            self.speculator.discard(session_id)
+
+    def _draft_key(self, manager, instruction, has_image: bool) -> tuple:
+        return (self.current_mode, instruction.state.name, len(manager.history), content_hash(instruction.prompt), has_image)
+
+    async def _screen(self, manager, transcript: str, trusted: bool) -> Optional[str]:
+        """The message to send instead of the turn when the answer or the resume is flagged."""
+        answer_verdict, resume_verdict = await asyncio.gather(
+            self.guard.screen("" if trusted else transcript),
+            self.guard.screen(getattr(manager, "resume_text", ""))
+        )
+        if resume_verdict.flagged:
+            return GUARD_RESUME_MESSAGE
+        return GUARD_MESSAGE if answer_verdict.flagged else None
+
+    def _opening_key(self, manager, model: str, system_prompt: str) -> tuple:
+        """(resume hash, focus mode, time bucket, model, prompt version) for the opening turn."""
+        time_bucket = manager.flow.budget_tier(manager.time_limit_mins).get("max_mins")
+        return (content_hash(manager.resume_text), manager.focus_mode, time_bucket, model, content_hash(system_prompt))
+
+    async def _update_memory(self, state_snapshot: dict, tenant: str):
+        if self.admission:
+            try:
+                await self.admission.acquire(Priority.BACKGROUND, tenant)
+            except AdmissionRejected:
+                # Background work is the first to go under load
+                logger.info("Memory update shed under load")
+                return
+        await self.memory_agent.update_memory(state_snapshot)
+
+    def _record_cancelled(self, manager, transcript: str, partial_response: str, route, state_name: str):
+        """Partial turn goes into history as delivered; the state machine does not advance."""
+        self.router.record(route, self.current_mode, state_name, len(partial_response))
+        if partial_response:
+            manager.update_history(transcript, f"{partial_response.rstrip()} {INTERRUPTED_MARKER}")
+        else:
+            manager.update_history(transcript, INTERRUPTED_MARKER)
+
+        # Rough estimate: the output budget for this turn minus what was generated (~4 chars per token)
+        generated_tokens = len(partial_response) // 4
+        expected_tokens = route.max_tokens or MAX_TOKENS["question"]
+        saved = 0 if route.model == "template" else max(0, expected_tokens - generated_tokens)
+        self.cancellation_stats["cancelled_turns"] += 1
+        self.cancellation_stats["partial_chars"] += len(partial_response)
+        self.cancellation_stats["est_tokens_saved"] += saved
+        logger.info(f"Turn cancelled in {state_name}: {len(partial_response)} chars delivered, ~{saved} tokens saved")
+
+    def get_cancellation_stats(self) -> dict:
+        return dict(self.cancellation_stats)
 
     def reset_conversation(self):
         self.conversation_manager.reset()
         self.resume_manager.reset()
+        for manager in self.flow_managers.values():
+            manager.reset()
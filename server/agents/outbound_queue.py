@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import islice
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger("OutboundQueue")
+
+# Message types where only the latest value matters; older queued ones are superseded
+LATEST_WINS = ("state_update", "transcript_update")
+
+def coalescing_key(message: dict) -> Optional[str]:
+    """
+    Messages with the same key replace (or, for deltas, merge into) each other.
+    A status state_update ("RESPONDING", "ACTIVE", ...) never replaces a full
+    state snapshot, which later deltas are based on, nor the other way round.
+    """
+    message_type = message.get("type")
+    if message_type == "state_update":
+        return "state_snapshot" if isinstance(message.get("payload"), dict) else "state_status"
+    if message_type in LATEST_WINS or message_type == "state_delta":
+        return message_type
+    return None
+
+class SlowConsumerError(Exception):
+    pass
+
+def merge_state_deltas(older: dict, newer: dict) -> dict:
+    """One delta equivalent to applying `older` then `newer`."""
+    set_fields = dict(older.get("set", {}))
+    append_fields = dict(older.get("append", {}))
+    for key, value in newer.get("set", {}).items():
+        set_fields[key] = value
+        append_fields.pop(key, None)
+    for key, suffix in newer.get("append", {}).items():
+        if key in set_fields and isinstance(set_fields[key], str):
+            set_fields[key] += suffix
+        else:
+            append_fields[key] = append_fields.get(key, "") + suffix
+    merged = {"type": "state_delta", "version": newer["version"], "base_version": older["base_version"]}
+    if set_fields:
+        merged["set"] = set_fields
+    if append_fields:
+        merged["append"] = append_fields
+    return merged
+
+class OutboundQueue:
+    """
+    Bounded per-connection send queue drained by its own writer task.
+
+    Producers (the LLM stream) enqueue and move on, so a slow client no longer
+    stalls the upstream stream until the queue is full. Delivery policy:
+      - response_chunk: lossless. When full, it is appended to a queued chunk
+        at the tail; otherwise the producer waits for space.
+      - state_update / transcript_update: latest wins; an older queued one is
+        dropped and the new one goes to the tail. Status updates and full
+        state snapshots are superseded separately (see coalescing_key).
+        state_delta messages are merged so no field change is lost; an
+        older delta followed by a queued snapshot is dropped instead.
+      - everything else: lossless, waits for space.
+    A consumer that makes no progress for `slow_consumer_timeout` seconds
+    while the queue is full is disconnected when `disconnect_slow` is set.
+    """
+    def __init__(self, send: Callable[[dict], Awaitable[None]], max_size: int = 256, slow_consumer_timeout: float = 10.0,
+                 disconnect_slow: bool = False, on_disconnect: Optional[Callable[[], Awaitable[None]]] = None):
+        self._send = send
+        self.max_size = max_size
+        self.slow_consumer_timeout = slow_consumer_timeout
+        self.disconnect_slow = disconnect_slow
+        self._on_disconnect = on_disconnect
+        # (enqueued_at, message)
+        self._queue = deque()
+        self._changed = asyncio.Condition()
+        self._writer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+        self._last_progress = time.perf_counter()
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.lag_total_ms = 0.0
+        self.max_lag_ms = 0.0
+
+    def start(self):
+        self._writer = asyncio.create_task(self._drain())
+        return self
+
+    async def close(self):
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def _find_latest(self, key: str) -> Optional[int]:
+        for index in range(len(self._queue) - 1, -1, -1):
+            if coalescing_key(self._queue[index][1]) == key:
+                return index
+        return None
+
+    def _snapshot_queued_from(self, index: int) -> bool:
+        return any(coalescing_key(message) == "state_snapshot" for _, message in islice(self._queue, index, None))
+
+    def _coalesce(self, message: dict) -> dict:
+        """Drops a superseded queued message, returning what should be enqueued instead."""
+        key = coalescing_key(message)
+        if key is not None:
+            index = self._find_latest(key)
+            if index is not None:
+                _, older = self._queue[index]
+                del self._queue[index]
+                self.dropped += 1
+                # A snapshot queued after the older delta already covers it, and the new
+                # delta is based on that snapshot: merging would apply the older one twice
+                if key == "state_delta" and not self._snapshot_queued_from(index):
+                    message = merge_state_deltas(older, message)
+        return message
+
+    async def put(self, message: dict):
+        if self._error:
+            raise self._error
+
+        async with self._changed:
+            message = self._coalesce(message)
+
+            if len(self._queue) >= self.max_size and message.get("type") == "response_chunk":
+                tail_at, tail = self._queue[-1]
+                if tail.get("type") == "response_chunk":
+                    # Lossless: grow the last queued frame instead of adding one
+                    self._queue[-1] = (tail_at, {"type": "response_chunk", "payload": tail["payload"] + message["payload"]})
+                    self.coalesced += 1
+                    return
+
+            while len(self._queue) >= self.max_size:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=self.slow_consumer_timeout)
+                except asyncio.TimeoutError:
+                    if len(self._queue) < self.max_size or time.perf_counter() - self._last_progress < self.slow_consumer_timeout:
+                        continue
+                    logger.warning(f"Slow consumer: no progress for {self.slow_consumer_timeout}s with {len(self._queue)} queued")
+                    if self.disconnect_slow:
+                        self._error = SlowConsumerError("Client is not reading fast enough")
+                        if self._on_disconnect:
+                            await self._on_disconnect()
+                        raise self._error
+                if self._error:
+                    raise self._error
+
+            self._queue.append((time.perf_counter(), message))
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._changed.notify_all()
+
+    async def join(self):
+        """Waits until everything queued so far has been sent."""
+        async with self._changed:
+            while self._queue and not self._error:
+                await self._changed.wait()
+
+    async def _drain(self):
+        try:
+            while True:
+                async with self._changed:
+                    while not self._queue:
+                        await self._changed.wait()
+                    enqueued_at, message = self._queue.popleft()
+                    # Space freed for a waiting producer
+                    self._changed.notify_all()
+
+                await self._send(message)
+
+                lag_ms = (time.perf_counter() - enqueued_at) * 1000
+                self.sent += 1
+                self.lag_total_ms += lag_ms
+                self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+                self._last_progress = time.perf_counter()
+                async with self._changed:
+                    self._changed.notify_all()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Connection gone: wake producers so they see the error
+            self._error = e
+            async with self._changed:
+                self._changed.notify_all()
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "avg_send_lag_ms": round(self.lag_total_ms / self.sent, 2) if self.sent else 0.0,
+            "max_send_lag_ms": round(self.max_lag_ms, 2),
+        }
@@ -0,0 +1,41 @@
+import re
+from typing import Dict, Iterable, Set
+from config import Config
+
+class PhraseMatcher:
+    """
+    Matches many categorised trigger phrases with one precompiled regex.
+
+    Phrases only match on word boundaries ("ui" no longer fires inside "build"
+    or "quick"), are case-insensitive, and accept straight or curly apostrophes.
+    One `scan` walks the text once and reports every category that occurred.
+    """
+
+    def __init__(self, phrases_by_category: Dict[str, Iterable[str]]):
+        self.categories = {}
+        groups = []
+        for category, phrases in phrases_by_category.items():
+            cleaned = sorted({p.strip().lower() for p in phrases if p.strip()}, key=len, reverse=True)
+            self.categories[category] = cleaned
+            if not cleaned:
+                continue
+            # Longest first so "that is all" wins over "that is"
+            alternation = "|".join(re.escape(p).replace("'", "['’]") for p in cleaned)
+            groups.append(f"(?P<{category}>{alternation})")
+
+        pattern = r"(?<!\w)(?:" + "|".join(groups) + r")(?!\w)" if groups else r"(?!x)x"
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+
+    def scan(self, text: str) -> Set[str]:
+        """Categories of every phrase found in `text`, in a single pass."""
+        return {match.lastgroup for match in self.pattern.finditer(text)}
+
+    def contains(self, text: str, category: str) -> bool:
+        return category in self.scan(text)
+
+
+# Shared by both interview state machines; phrase lists are configurable per deployment
+trigger_matcher = PhraseMatcher({
+    "transition": Config.TRANSITION_TRIGGERS,
+    "screenshot": Config.SCREENSHOT_KEYWORDS,
+})
@@ -0,0 +1,107 @@
+import re
+import string
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# Punctuation (incl. typographic quotes) becomes whitespace in a single C-level pass;
+# hyphens join, so "trade-offs" and "tradeoffs" are the same token
+_PUNCT_TABLE = str.maketrans({char: " " for char in string.punctuation + "‘’“”–—"})
+_PUNCT_TABLE[ord("-")] = None
+
+# A response is compared sentence by sentence, so prefaces ("Great, thanks.") don't dilute it
+_SENTENCE_SPLIT = re.compile(r"[.!?:;]+(?:\s+|$)")
+
+# Interrogatives are kept: they give a question its shape ("what ... and who ...")
+INTERROGATIVES = frozenset("what who how why when where".split())
+
+STOPWORDS = frozenset("""
+a about all also an and any are as at be been but by can could did do does for from had has have
+i if in into is it its just let me more my of on or other our over please s so some tell than
+that the their them then there these they this those to us was we were will with would you your
+""".split())
+
+# Same meaning, same token
+_ALIASES = {"which": "what", "app": "application", "apps": "applications"}
+
+# Ordered: the first matching suffix is stripped
+_SUFFIXES = ("ations", "ation", "ments", "ment", "ings", "ing", "ies", "ed", "ly", "s")
+
+
+def stem(word: str) -> str:
+    """Very light suffix stripping; enough to equate 'solves'/'solve', 'limitations'/'limits'."""
+    word = _ALIASES.get(word, word)
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            if suffix == "s" and word.endswith("ss"):
+                break
+            word = word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+            break
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=8192)
+def _normalize(token: str) -> str:
+    return "" if token in STOPWORDS else stem(token)
+
+
+def content_tokens(text: str) -> FrozenSet[str]:
+    """Lower-cased, punctuation-free, stop-word-free, stemmed token set."""
+    # map/filter keep the per-token loop in C; both lookups are cached per distinct word
+    return frozenset(filter(None, map(_normalize, text.lower().translate(_PUNCT_TABLE).split())))
+
+
+class QuestionMatcher:
+    """
+    Decides whether an AI response asked a given question, tolerating paraphrase.
+
+    Each question's token signature is computed once, up front. A sentence of
+    the response asks the question when it uses the same interrogatives and
+    either contains every signature token, or contains at least `threshold`
+    of them while they also make up at least `precision` of the sentence.
+    The second, two-way check keeps near-topic follow-ups ("What specific
+    problem does it solve for them?") from counting as the core question.
+    """
+
+    def __init__(self, questions: Iterable[str], threshold: float = 0.8, precision: float = 0.75):
+        self.threshold = threshold
+        self.precision = precision
+        self._signatures: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        for question in questions:
+            self._signature(question)
+
+    def _signature(self, question: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        signature = self._signatures.get(question)
+        if signature is None:
+            tokens = content_tokens(question)
+            signature = self._signatures[question] = (tokens, tokens & INTERROGATIVES)
+        return signature
+
+    def _sentences(self, ai_text: str) -> List[FrozenSet[str]]:
+        return list(filter(None, map(content_tokens, _SENTENCE_SPLIT.split(ai_text))))
+
+    def score(self, question: str, ai_text: str) -> Tuple[float, float]:
+        """(share of the question found, share of the sentence that is the question) for the best sentence."""
+        signature, _ = self._signature(question)
+        best = (0.0, 0.0)
+        if not signature:
+            return best
+        for tokens in self._sentences(ai_text):
+            shared = len(signature & tokens)
+            best = max(best, (shared / len(signature), shared / len(tokens)))
+        return best
+
+    def matches(self, question: str, ai_text: str) -> bool:
+        signature, interrogatives = self._signature(question)
+        if not signature:
+            return False
+        for tokens in self._sentences(ai_text):
+            if not interrogatives <= tokens:
+                continue
+            shared = len(signature & tokens)
+            if shared == len(signature):
+                return True
+            if shared >= self.threshold * len(signature) and shared >= self.precision * len(tokens):
+                return True
+        return False
@@ -1,24 +1,120 @@
 import logging
 import json
-from google import genai
+import time
 from config import Config
+from agents.json_repair import TolerantJSONParser
+from agents.report_pipeline import BrokenSectionsError, MapReduceReportPipeline, split_into_question_chunks
+from agents.usage_ledger import usage_ledger
+from agents.report_schema import InterviewReport, ProjectReport, section_patch_model, validate_sections
 
 logger = logging.getLogger("ReportAgent")
 
+# Used when a non-essential project report section is still broken after retries
+PROJECT_REPORT_DEFAULTS = {
+    "strengths": [],
+    "areas_to_improve": [],
+    "recommendations": [],
+    "next_steps": {"priority_fixes": "", "short_term_goals": "", "long_term_goals": ""},
+    "overall_summary": ""
+}
+
+# Interview report sections that are never filled with placeholder content
+INTERVIEW_CORE_SECTIONS = ("scorecard", "readiness_verdict")
+
 class ReportAgent:
     def __init__(self, api_key: str, model_name: str):
         self.api_key = api_key
         self.model_name = model_name
-        self.client = None
-        
-        if self.api_key:
+        self._client = None
+        self._client_failed = False
+
+        if not self.api_key:
+            logger.warning("ReportAgent initialized without API key. Report generation will fail.")
+
+        self.pipeline = MapReduceReportPipeline(self._generate_json, Config.REPORT_MAX_CONCURRENCY, Config.REPORT_SECTION_RETRIES)
+
+    @property
+    def client(self):
+        # google.genai is only imported when the first report is requested
+        if self._client is None and self.api_key and not self._client_failed:
             try:
-                self.client = genai.Client(api_key=self.api_key)
+                from google import genai
+                self._client = genai.Client(api_key=self.api_key)
                 logger.info(f"ReportAgent initialized with model: {self.model_name}")
             except Exception as e:
+                self._client_failed = True
                 logger.error(f"Failed to initialize Gemini client: {e}")
-        else:
-            logger.warning("ReportAgent initialized without API key. Report generation will fail.")
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    async def _generate_json(self, prompt: str, schema=None):
+        """
+        Streams a JSON response from Gemini through the tolerant parser.
+        With a schema, native structured output is requested from the model.
+        """
+        config = None
+        if schema is not None and Config.REPORT_STRUCTURED_OUTPUT:
+            from google.genai import types
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=schema
+            )
+
+        parser = TolerantJSONParser()
+        started = time.perf_counter()
+        usage = None
+        # Async client so concurrent pipeline chunks don't block the event loop
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model_name,
+            contents=prompt,
+            config=config
+        )
+        try:
+            async for chunk in stream:
+                # Cumulative counts; the last chunk has the totals
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+                if chunk.text:
+                    parser.feed(chunk.text)
+        finally:
+            # Session tags come from the endpoint's usage_ledger.scope()
+            usage_ledger.record(
+                "report", self.model_name,
+                prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                completion_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+                latency_ms=(time.perf_counter() - started) * 1000
+            )
+
+        result = parser.result()
+        if parser.repaired:
+            logger.warning("Repaired truncated JSON response")
+        return result
+
+    async def _complete_sections(self, prompt: str, data, schema):
+        """
+        Validates each top-level section against the schema and regenerates only
+        the broken ones. Returns (valid sections, sections still broken).
+        """
+        report, broken = validate_sections(data, schema)
+        attempt = 0
+        while broken and attempt < Config.REPORT_SECTION_RETRIES:
+            attempt += 1
+            logger.warning(f"Retrying broken report sections {broken} (attempt {attempt})")
+            patch_prompt = (
+                f"{prompt}\n\n# REGENERATE ONLY THESE SECTIONS: {', '.join(broken)}\n"
+                "Return a JSON object containing ONLY these keys, following the schema above."
+            )
+            try:
+                patch = await self._generate_json(patch_prompt, section_patch_model(schema, broken))
+            except Exception as e:
+                logger.error(f"Section retry failed: {e}")
+                continue
+            fixed, broken = validate_sections(patch, section_patch_model(schema, broken))
+            report.update(fixed)
+        return report, broken
 
     async def generate_project_report(self, chat_history: list) -> str:
         print("Reached Here")
@@ -113,44 +209,26 @@ class ReportAgent:
             """
 
 
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            
-            logger.info("Raw LLM response received")
-            print("="*50)
-            print("RAW RESPONSE:")
-            print(response.text)
-            print("="*50)
-            
-            # Parse and validate JSON
-            response_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith('```json'):
-                response_text = response_text.replace('```json', '', 1)
-                response_text = response_text.rsplit('```', 1)[0]
-            elif response_text.startswith('```'):
-                response_text = response_text.replace('```', '', 1)
-                response_text = response_text.rsplit('```', 1)[0]
-            
-            response_text = response_text.strip()
-            
-            # Validate it's valid JSON
             try:
-                parsed_json = json.loads(response_text)
+                parsed_json = await self._generate_json(prompt, ProjectReport)
                 logger.info("✅ Successfully parsed JSON response")
-                print("PARSED JSON STRUCTURE:")
-                print(json.dumps(parsed_json, indent=2)[:500] + "...")
-                return parsed_json  # Return as dict, not string
-            except json.JSONDecodeError as je:
+            except ValueError as je:
+                # Unrecoverable output: every section gets regenerated below
                 logger.error(f"❌ Failed to parse LLM response as JSON: {je}")
-                print(f"INVALID JSON: {response_text[:200]}")
+                parsed_json = {}
+
+            report, broken = await self._complete_sections(prompt, parsed_json, ProjectReport)
+            if "overall_score" in broken or "evaluation" in broken:
                 return {
                     "error": "LLM returned invalid JSON",
-                    "raw_response": response_text[:500]
+                    "broken_sections": broken
                 }
+            for name in broken:
+                report[name] = PROJECT_REPORT_DEFAULTS[name]
+
+            print("PARSED JSON STRUCTURE:")
+            print(json.dumps(report, indent=2)[:500] + "...")
+            return report  # Return as dict, not string
 
         except Exception as e:
             logger.error(f"Error generating project report: {e}")
@@ -163,7 +241,7 @@ class ReportAgent:
             "For more accurate and detailed feedback, please attempt a longer interview (15+ minutes)."
         ) if is_short else "Report generated with available data."
 
-        return {
+        report = {
             "meta": {
                 "interview_type": interview_type,
                 "duration": duration_str,
@@ -209,8 +287,11 @@ class ReportAgent:
             },
             "prep_plan": None
         }
+        # Nothing here came from the interview; the client must not show it as a real evaluation
+        report["meta"]["fallback_sections"] = [name for name in report if name != "meta"]
+        return report
 
-    async def generate_interview_report(self, chat_history: list, resume_text: str, interview_type: str, duration_mins: int) -> dict:
+    async def generate_interview_report(self, chat_history: list, resume_text: str, interview_type: str, duration_mins: int, turn_records: list = None) -> dict:
         if not self.client:
             return {"error": "Error: Gemini API key not configured."}
 
@@ -231,6 +312,30 @@ class ReportAgent:
         else:
             duration_str = "60min"
 
+        # Answers already scored per turn: only the narrative (reduce) step is left
+        chunk_count = len(split_into_question_chunks(chat_history))
+        if turn_records and not is_short_interview and len(turn_records) >= Config.TURN_EVAL_MIN_COVERAGE * chunk_count:
+            logger.info(f"Aggregating {len(turn_records)} precomputed turn evaluations")
+            try:
+                return await self.pipeline.reduce(turn_records, resume_text, interview_type, duration_str)
+            except Exception as e:
+                logger.error(f"Aggregated report generation failed, falling back to full evaluation: {e}")
+
+        # Long interviews: evaluate question chunks concurrently instead of one giant prompt
+        if not is_short_interview and (duration_str == "60min" or chunk_count >= Config.REPORT_MAP_REDUCE_MIN_CHUNKS):
+            try:
+                return await self.pipeline.run(chat_history, resume_text, interview_type, duration_str)
+            except BrokenSectionsError as e:
+                # Same outcome as a broken scorecard in the single-call path: no placeholder scores
+                logger.error(f"Map-reduce report generation failed: {e}")
+                return {
+                    "error": "LLM returned invalid JSON",
+                    "broken_sections": e.broken_sections
+                }
+            except Exception as e:
+                logger.error(f"Map-reduce report generation failed: {e}")
+                return self._build_fallback_report(interview_type, duration_str, is_short=False)
+
         # Add data-sufficiency notice for short interviews
         data_notice = ""
         if is_short_interview:
@@ -346,36 +451,34 @@ IF {duration_str} == "60min":
     projects     -> Ownership, Decision Articulation, Challenge Handling, Outcome Quantification, Depth
 - Audio metrics are disabled for chat mode.
 """
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-
-            logger.info("Raw LLM response received for interview")
-            response_text = response.text.strip()
-            
-            if response_text.startswith('```json'):
-                response_text = response_text.replace('```json', '', 1)
-                response_text = response_text.rsplit('```', 1)[0]
-            elif response_text.startswith('```'):
-                response_text = response_text.replace('```', '', 1)
-                response_text = response_text.rsplit('```', 1)[0]
-                
-            response_text = response_text.strip()
-            
             try:
-                parsed_json = json.loads(response_text)
-                # Inject disclaimer for short interviews
-                if is_short_interview and "meta" in parsed_json:
-                    parsed_json["meta"]["disclaimer"] = (
-                        "This interview was very short. Results may not be fully accurate. "
-                        "For better feedback, try a longer interview (15+ minutes)."
-                    )
-                return parsed_json
-            except json.JSONDecodeError as je:
+                parsed_json = await self._generate_json(prompt, InterviewReport)
+                logger.info("Raw LLM response received for interview")
+            except ValueError as je:
                 logger.error(f"❌ Failed to parse LLM interview response as JSON: {je}")
-                logger.info("Returning fallback report instead of error")
-                return self._build_fallback_report(interview_type, duration_str, is_short=is_short_interview)
+                parsed_json = {}
+
+            report, broken = await self._complete_sections(prompt, parsed_json, InterviewReport)
+            if any(name in broken for name in INTERVIEW_CORE_SECTIONS):
+                return {
+                    "error": "LLM returned invalid JSON",
+                    "broken_sections": broken
+                }
+            if broken:
+                # Only the sections that are still broken fall back to defaults, and meta says which
+                logger.info(f"Using fallback content for sections: {broken}")
+                fallback = self._build_fallback_report(interview_type, duration_str, is_short=is_short_interview)
+                for name in broken:
+                    report[name] = fallback[name]
+                report["meta"]["fallback_sections"] = [name for name in broken if name != "meta"]
+
+            # Inject disclaimer for short interviews
+            if is_short_interview and "meta" in report:
+                report["meta"]["disclaimer"] = (
+                    "This interview was very short. Results may not be fully accurate. "
+                    "For better feedback, try a longer interview (15+ minutes)."
+                )
+            return report
 
         except Exception as e:
             logger.error(f"Error generating interview report: {e}")
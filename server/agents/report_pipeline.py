@@ -0,0 +1,329 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+from pydantic import BaseModel, ValidationError
+from agents.report_schema import CoachingSection, PrepPlan, QuestionChunkEvaluation, ScorecardReduction
+
+logger = logging.getLogger("ReportPipeline")
+
+# Dimension names per interview type (kept in sync with the single-call prompt in report_agent)
+DIMENSIONS_BY_TYPE = {
+    "general": ["Communication", "Self-Awareness", "Cultural Fit", "Storytelling", "Confidence"],
+    "technical": ["Conceptual Accuracy", "Problem Approach", "Edge Case Awareness", "Terminology", "Depth"],
+    "projects": ["Ownership", "Decision Articulation", "Challenge Handling", "Outcome Quantification", "Depth"],
+}
+
+class BrokenSectionsError(ValueError):
+    """Sections the report cannot do without are still invalid after retries."""
+    def __init__(self, message: str, broken_sections: List[str]):
+        super().__init__(message)
+        self.broken_sections = broken_sections
+
+
+def split_into_question_chunks(chat_history: list) -> List[Dict]:
+    """
+    Pairs every interviewer turn with the candidate answers that follow it.
+    Each chunk is small and independent, so chunks can be evaluated in parallel.
+    """
+    chunks = []
+    current = None
+    for msg in chat_history:
+        role = msg.get("role", "unknown")
+        content = (msg.get("content") or "").strip()
+        if not content or content.startswith("[System]"):
+            continue
+
+        if role == "assistant":
+            # A new interviewer turn closes the previous chunk
+            if current and current["answers"]:
+                chunks.append(current)
+            current = {"question": content, "answers": []}
+        else:
+            if current is None:
+                current = {"question": "", "answers": []}
+            current["answers"].append(content)
+
+    if current and current["answers"]:
+        chunks.append(current)
+
+    for index, chunk in enumerate(chunks):
+        chunk["index"] = index
+    return chunks
+
+
+class MapReduceReportPipeline:
+    """
+    Builds the interview report from many small prompts instead of one giant one.
+
+    Map:    every question/answer chunk is evaluated on its own (bounded parallelism).
+    Reduce: the scorecard/verdict and the coaching sections are generated concurrently
+            from a compact digest of the map results, never from the full transcript.
+
+    Wall-clock time is therefore roughly (slowest chunk + slowest reduce call).
+    """
+
+    def __init__(self, generate: Callable[[str, Type[BaseModel]], Awaitable[Any]], max_concurrency: int = 6, retries: int = 1):
+        # `generate` takes a prompt and a response schema and returns parsed JSON
+        self.generate = generate
+        self.max_concurrency = max(1, max_concurrency)
+        self.retries = retries
+
+    async def run(self, chat_history: list, resume_text: str, interview_type: str, duration_str: str) -> dict:
+        chunks = split_into_question_chunks(chat_history)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        logger.info(f"Map-reduce report: {len(chunks)} question chunks, concurrency={self.max_concurrency}")
+
+        # 1. Map: evaluate every question chunk independently
+        analyses = await asyncio.gather(*[
+            self._bounded(semaphore, self._evaluate_question(chunk, resume_text, interview_type))
+            for chunk in chunks
+        ])
+        analyses = [a for a in analyses if a is not None]
+        if not analyses:
+            raise BrokenSectionsError("No question chunk could be evaluated", ["per_question_analysis", "scorecard", "readiness_verdict"])
+
+        return await self.reduce(analyses, resume_text, interview_type, duration_str, semaphore)
+
+    async def reduce(self, analyses: List[dict], resume_text: str, interview_type: str, duration_str: str, semaphore: Optional[asyncio.Semaphore] = None) -> dict:
+        """
+        Narrative step only. `analyses` come from the map step or from
+        precomputed per-turn evaluation records (see TurnEvaluator).
+        """
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        dimensions = DIMENSIONS_BY_TYPE.get(interview_type, DIMENSIONS_BY_TYPE["general"])
+        digest = self._build_digest(analyses)
+
+        # 2. Reduce: scorecard/verdict plus per-section calls, all from the digest
+        section_jobs = {
+            "scorecard": self._reduce_scorecard(digest, interview_type, duration_str, dimensions),
+            "coaching": self._section_coaching(digest, resume_text, interview_type),
+        }
+        if duration_str == "60min":
+            section_jobs["prep_plan"] = self._section_prep_plan(digest, interview_type)
+
+        names = list(section_jobs.keys())
+        results = await asyncio.gather(*[
+            self._bounded(semaphore, job) for job in section_jobs.values()
+        ])
+        sections = dict(zip(names, results))
+
+        if sections["scorecard"] is None:
+            raise BrokenSectionsError("Reduce step failed to produce a scorecard", ["scorecard", "readiness_verdict"])
+
+        return self._assemble(analyses, sections, interview_type, duration_str)
+
+    async def _bounded(self, semaphore: asyncio.Semaphore, coro):
+        async with semaphore:
+            return await coro
+
+    async def _generate_json(self, prompt: str, label: str, schema: Type[BaseModel]) -> Optional[dict]:
+        # Each chunk is its own section: a broken chunk is retried alone
+        for attempt in range(self.retries + 1):
+            try:
+                data = await self.generate(prompt, schema)
+                return schema.model_validate(data).model_dump(mode="json")
+            except (ValueError, ValidationError) as e:
+                logger.warning(f"Report chunk '{label}' invalid (attempt {attempt + 1}): {e}")
+            except Exception as e:
+                logger.warning(f"Report chunk '{label}' failed: {e}")
+                return None
+        return None
+
+    async def _evaluate_question(self, chunk: Dict, resume_text: str, interview_type: str) -> Optional[dict]:
+        answer = "\n".join(chunk["answers"])
+        prompt = f"""
+# ROLE
+You are an expert interview evaluator. Evaluate ONE question/answer exchange from a {interview_type} interview.
+
+# RESUME
+{resume_text}
+
+# QUESTION
+{chunk["question"] or "(candidate spoke before any question was asked)"}
+
+# CANDIDATE ANSWER
+{answer}
+
+# OUTPUT SCHEMA — return strict JSON
+{{
+  "question": "string",
+  "candidate_answer_summary": "string",
+  "score": 0,
+  "star_method_used": false,
+  "completeness": "complete",
+  "what_was_strong": "string",
+  "what_was_missing": "string",
+  "model_answer_hint": "string",
+  "section": "short topic label, e.g. Experience, Skills, Projects, Education, HR",
+  "structured_thinking_score": 0,
+  "active_listening_score": 0,
+  "response_length_quality": "optimal",
+  "consistent_points": ["resume claims this answer supports"],
+  "discrepancies": [
+    {{ "resume_claim": "string", "interview_response": "string", "flag": "string" }}
+  ]
+}}
+
+# STRICT RULES
+- Return ONLY the JSON object. No markdown, no preamble.
+- Scores are integers from 0 to 100. completeness is one of: complete, partial, missing.
+- response_length_quality is one of: too_short, optimal, too_long.
+- Only flag discrepancies on clear contradiction with the resume.
+"""
+        result = await self._generate_json(prompt, f"question[{chunk['index']}]", QuestionChunkEvaluation)
+        if result is not None:
+            result["index"] = chunk["index"]
+            if not result.get("question"):
+                result["question"] = chunk["question"]
+        return result
+
+    def _build_digest(self, analyses: List[dict]) -> str:
+        """One compact line per question; this is all the reduce step ever sees."""
+        lines = []
+        for a in analyses:
+            lines.append(
+                f"Q{a['index'] + 1} [{a.get('section', 'General')}] score={a.get('score', 0)} "
+                f"completeness={a.get('completeness', 'partial')} | Q: {a.get('question', '')} | "
+                f"A: {a.get('candidate_answer_summary', '')} | +{a.get('what_was_strong', '')} | "
+                f"-{a.get('what_was_missing', '')}"
+            )
+        return "\n".join(lines)
+
+    async def _reduce_scorecard(self, digest: str, interview_type: str, duration_str: str, dimensions: List[str]) -> Optional[dict]:
+        prompt = f"""
+# ROLE
+You are an expert interview evaluator. Below is a per-question digest of a {duration_str} {interview_type} interview.
+Produce the final scorecard and readiness verdict.
+
+# PER-QUESTION DIGEST
+{digest}
+
+# OUTPUT SCHEMA — return strict JSON
+{{
+  "scorecard": {{
+    "overall_score": 0,
+    "dimensions": [
+      {{ "name": "string", "score": 0, "weight": 0.0, "summary": "string" }}
+    ]
+  }},
+  "section_breakdown": [
+    {{ "section": "string", "score": 0, "highlight": "string" }}
+  ],
+  "readiness_verdict": {{
+    "status": "interview_ready",
+    "label": "string",
+    "summary": "string",
+    "next_step": "string"
+  }}
+}}
+
+# STRICT RULES
+- Return ONLY the JSON object.
+- Use exactly these dimensions: {", ".join(dimensions)}.
+- Scores must be integers. Weights must sum to 1.0.
+- readiness_verdict.status is one of: interview_ready, almost_ready, needs_practice.
+"""
+        return await self._generate_json(prompt, "scorecard", ScorecardReduction)
+
+    async def _section_coaching(self, digest: str, resume_text: str, interview_type: str) -> Optional[dict]:
+        prompt = f"""
+# ROLE
+You are a career coach reviewing a {interview_type} interview from its per-question digest.
+
+# RESUME
+{resume_text}
+
+# PER-QUESTION DIGEST
+{digest}
+
+# OUTPUT SCHEMA — return strict JSON
+{{
+  "strengths": [
+    {{ "title": "string", "evidence": "string" }}
+  ],
+  "improvement_areas": [
+    {{ "title": "string", "issue": "string", "actionable_tip": "string" }}
+  ],
+  "suggested_followups": [
+    {{ "original_question": "string", "better_approach": "string" }}
+  ],
+  "unexplored_resume_strengths": ["string"]
+}}
+
+# STRICT RULES
+- Return ONLY the JSON object.
+- Up to 5 strengths and 5 improvement areas. Evidence must reference the digest.
+"""
+        return await self._generate_json(prompt, "coaching", CoachingSection)
+
+    async def _section_prep_plan(self, digest: str, interview_type: str) -> Optional[dict]:
+        prompt = f"""
+# ROLE
+You are a career coach. Build a preparation plan from this per-question digest of a {interview_type} interview.
+
+# PER-QUESTION DIGEST
+{digest}
+
+# OUTPUT SCHEMA — return strict JSON
+{{
+  "focus_topics": ["string"],
+  "question_types_to_practice": ["string"],
+  "estimated_ready_in": "string"
+}}
+
+Return ONLY the JSON object.
+"""
+        return await self._generate_json(prompt, "prep_plan", PrepPlan)
+
+    def _assemble(self, analyses: List[dict], sections: Dict[str, Optional[dict]], interview_type: str, duration_str: str) -> dict:
+        scorecard = sections["scorecard"]
+        coaching = sections.get("coaching") or {}
+
+        per_question = []
+        consistent_points = []
+        discrepancies = []
+        for a in analyses:
+            consistent_points.extend(a.get("consistent_points") or [])
+            discrepancies.extend(a.get("discrepancies") or [])
+            per_question.append({
+                "question": a.get("question", ""),
+                "candidate_answer_summary": a.get("candidate_answer_summary", ""),
+                "score": a.get("score", 0),
+                "star_method_used": a.get("star_method_used", False),
+                "completeness": a.get("completeness", "partial"),
+                "what_was_strong": a.get("what_was_strong", ""),
+                "what_was_missing": a.get("what_was_missing", ""),
+                "model_answer_hint": a.get("model_answer_hint", ""),
+            })
+
+        # Communication metrics are plain averages of the per-question readings
+        lengths = [a.get("response_length_quality", "optimal") for a in analyses]
+        communication_metrics = {
+            "response_length_quality": max(set(lengths), key=lengths.count),
+            "structured_thinking_score": round(sum(a.get("structured_thinking_score", 0) for a in analyses) / len(analyses)),
+            "active_listening_score": round(sum(a.get("active_listening_score", 0) for a in analyses) / len(analyses)),
+        }
+
+        return {
+            "meta": {
+                "interview_type": interview_type,
+                "duration": duration_str,
+                "mode": "chat",
+                "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            },
+            "scorecard": scorecard.get("scorecard", {}),
+            "section_breakdown": scorecard.get("section_breakdown", []),
+            "per_question_analysis": per_question,
+            "resume_consistency": {
+                "consistent_points": consistent_points,
+                "discrepancies": discrepancies,
+                "unexplored_resume_strengths": coaching.get("unexplored_resume_strengths", []),
+            },
+            "communication_metrics": communication_metrics,
+            "strengths": coaching.get("strengths", []),
+            "improvement_areas": coaching.get("improvement_areas", []),
+            "suggested_followups": coaching.get("suggested_followups", []),
+            "readiness_verdict": scorecard.get("readiness_verdict", {}),
+            "prep_plan": sections.get("prep_plan"),
+        }
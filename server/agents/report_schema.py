@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
+
+# Pydantic models of the report JSON. They are passed to Gemini as `response_schema`
+# (native schema-constrained output) and used to validate each top-level section
+# independently, so one broken section doesn't discard the whole report.
+# Keep types Gemini-compatible: plain scalars, lists and nested models only.
+
+# ---------- Project report ----------
+
+class ParameterEvaluation(BaseModel):
+    parameter: str
+    score: int
+    feedback: str
+
+class NextSteps(BaseModel):
+    priority_fixes: str
+    short_term_goals: str
+    long_term_goals: str
+
+class ProjectReport(BaseModel):
+    overall_score: int
+    evaluation: List[ParameterEvaluation]
+    strengths: List[str]
+    areas_to_improve: List[str]
+    recommendations: List[str]
+    next_steps: NextSteps
+    overall_summary: str
+
+# ---------- Interview report ----------
+
+class ReportMeta(BaseModel):
+    interview_type: str
+    duration: str
+    mode: str
+    generated_at: str
+    disclaimer: Optional[str] = None
+
+class Dimension(BaseModel):
+    name: str
+    score: int
+    weight: float
+    summary: str
+
+class Scorecard(BaseModel):
+    overall_score: int
+    dimensions: List[Dimension]
+
+class SectionScore(BaseModel):
+    section: str
+    score: int
+    highlight: str
+
+class QuestionAnalysis(BaseModel):
+    question: str
+    candidate_answer_summary: str
+    score: int
+    star_method_used: bool
+    completeness: str
+    what_was_strong: str
+    what_was_missing: str
+    model_answer_hint: str
+
+class Discrepancy(BaseModel):
+    resume_claim: str
+    interview_response: str
+    flag: str
+
+class ResumeConsistency(BaseModel):
+    consistent_points: List[str]
+    discrepancies: List[Discrepancy]
+    unexplored_resume_strengths: List[str]
+
+class CommunicationMetrics(BaseModel):
+    response_length_quality: str
+    structured_thinking_score: int
+    active_listening_score: int
+
+class Strength(BaseModel):
+    title: str
+    evidence: str
+
+class ImprovementArea(BaseModel):
+    title: str
+    issue: str
+    actionable_tip: str
+
+class SuggestedFollowup(BaseModel):
+    original_question: str
+    better_approach: str
+
+class ReadinessVerdict(BaseModel):
+    status: str
+    label: str
+    summary: str
+    next_step: str
+
+class PrepPlan(BaseModel):
+    focus_topics: List[str]
+    question_types_to_practice: List[str]
+    estimated_ready_in: str
+
+class InterviewReport(BaseModel):
+    meta: ReportMeta
+    scorecard: Scorecard
+    section_breakdown: List[SectionScore]
+    per_question_analysis: List[QuestionAnalysis]
+    resume_consistency: ResumeConsistency
+    communication_metrics: CommunicationMetrics
+    strengths: List[Strength]
+    improvement_areas: List[ImprovementArea]
+    suggested_followups: List[SuggestedFollowup]
+    readiness_verdict: ReadinessVerdict
+    prep_plan: Optional[PrepPlan] = None
+
+# ---------- Map-reduce pipeline chunks ----------
+
+class QuestionChunkEvaluation(QuestionAnalysis):
+    section: str
+    structured_thinking_score: int
+    active_listening_score: int
+    response_length_quality: str
+    consistent_points: List[str]
+    discrepancies: List[Discrepancy]
+
+class ScorecardReduction(BaseModel):
+    scorecard: Scorecard
+    section_breakdown: List[SectionScore]
+    readiness_verdict: ReadinessVerdict
+
+class CoachingSection(BaseModel):
+    strengths: List[Strength]
+    improvement_areas: List[ImprovementArea]
+    suggested_followups: List[SuggestedFollowup]
+    unexplored_resume_strengths: List[str]
+
+
+_adapters: Dict[Tuple[Type[BaseModel], str], TypeAdapter] = {}
+
+def _field_adapter(model: Type[BaseModel], name: str) -> TypeAdapter:
+    key = (model, name)
+    if key not in _adapters:
+        _adapters[key] = TypeAdapter(model.model_fields[name].annotation)
+    return _adapters[key]
+
+def validate_sections(data: Any, model: Type[BaseModel]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validates every top-level field of `model` on its own.
+    Returns (valid sections as plain JSON data, names of missing/broken sections).
+    """
+    if not isinstance(data, dict):
+        return {}, list(model.model_fields.keys())
+
+    valid = {}
+    broken = []
+    for name, field in model.model_fields.items():
+        if name not in data:
+            if field.is_required():
+                broken.append(name)
+            continue
+        adapter = _field_adapter(model, name)
+        try:
+            valid[name] = adapter.dump_python(adapter.validate_python(data[name]), mode="json")
+        except ValidationError:
+            broken.append(name)
+    return valid, broken
+
+def section_patch_model(model: Type[BaseModel], sections: List[str]) -> Type[BaseModel]:
+    """A schema containing only the given sections, used to regenerate just those."""
+    fields = {name: (model.model_fields[name].annotation, ...) for name in sections}
+    return create_model(f"{model.__name__}Patch", **fields)
@@ -0,0 +1,55 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from config import Config
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8", "ignore")).hexdigest()[:16]
+
+class ResponseCache:
+    """
+    Completed model replies for turns whose prompt is fully determined by
+    the session setup (the resume-mode opening turn). LRU with a TTL, so a
+    restarted interview on the same resume replays instead of regenerating.
+    """
+    def __init__(self, max_entries: int = 256, ttl_secs: float = 86400, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: Tuple) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None and self.clock() - entry[0] > self.ttl_secs:
+            del self._entries[key]
+            self.stats["evictions"] += 1
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key: Tuple, response: str):
+        if not response:
+            return
+        self._entries[key] = (self.clock(), response)
+        self._entries.move_to_end(key)
+        self.stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(self.stats, entries=len(self._entries), hit_rate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0)
+
+
+# Global instance
+opening_cache = ResponseCache(max_entries=Config.OPENING_CACHE_SIZE, ttl_secs=Config.OPENING_CACHE_TTL_SECS)
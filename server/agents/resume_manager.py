@@ -1,23 +1,27 @@
-from enum import Enum, auto
-from typing import List, Optional, Tuple
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-
-class ResumeConversationState(Enum):
-    INITIAL = auto()           
-    EXPERIENCE = auto()
-    SKILLS = auto()  
-    PROJECTS = auto()
-    EDUCATION = auto()
-    EXTRA_CURRICULARS = auto()
-    HR = auto()
-    COMPLETED = auto()
+from typing import Dict, List, Optional, Tuple
+from agents.session_records import Turn, HUMAN, AI
+from agents.phrase_matcher import trigger_matcher
+from agents.flow_engine import CompiledFlow, StateInstruction, flow_engine
+from agents.session_clock import SessionClock
+from config import Config
+
+# Declarative definition: flows/resume_interview.json
+RESUME_FLOW = flow_engine.get("resume_interview")
+ResumeConversationState = RESUME_FLOW.State
 
 class ResumeConversationManager:
-    def __init__(self):
-        self.history: List[BaseMessage] = []
-        self.state = ResumeConversationState.INITIAL
+    """
+    Walks the states of a `state_walk` flow. The default is the resume interview,
+    but any flow definition of that kind (a new interview type) runs on it unchanged.
+    """
+    def __init__(self, flow: CompiledFlow = RESUME_FLOW):
+        self.flow = flow
+        # Compact Turn records; converted to LangChain messages only when a prompt is sent
+        self.history: List[Turn] = []
+        self.state = flow.initial_state
         self.resume_text = ""
-        self.focus_mode = "general" # 'general', 'skills', 'projects'
+        self.focus_mode = "general" # any route in the flow, e.g. 'general', 'skills', 'projects'
+        self.route = flow.default_route
         self.time_limit_mins = 15
         
         # We define rough chunks based on state progression
@@ -26,149 +30,120 @@ class ResumeConversationManager:
         
         self.questions_asked_in_current_state = 0
         self.max_questions_per_state = 2 # roughly adaptable based on time_limit
+        # Wall-clock budget; fewer questions per section as it runs out
+        self.clock = SessionClock()
+        # Resume turns are always tailored by the LLM, so there is no templated fast path
+        self.templated_response: Optional[str] = None
+        # Full system prompt per state, built at most once per session
+        self._base_prompt = flow.render_base(resume_text="")
+        self._prompt_cache: Dict = {}
 
     def setup_interview(self, resume_text: str, focus_mode: str, time_limit_mins: int):
         self.resume_text = resume_text
         self.focus_mode = focus_mode
         self.time_limit_mins = time_limit_mins
-        
-        if self.focus_mode == "skills":
-            self.state = ResumeConversationState.SKILLS
-        elif self.focus_mode == "projects":
-            self.state = ResumeConversationState.PROJECTS
-        else:
-            self.state = ResumeConversationState.INITIAL
 
-        # roughly base limit on time (average 1.5 mins per question)
-        total_questions = max(7, int(self.time_limit_mins // 1.5))
-        self.max_questions_per_state = max(1, total_questions // 7)
+        self.route = self.flow.resolve_route(focus_mode)
+        self.state = self.flow.entry_state(self.route)
+
+        # roughly base limit on time (flow time budget, e.g. 1.5 mins per question)
+        self.max_questions_per_state = self.flow.questions_per_state(time_limit_mins)
+        if Config.SESSION_TIME_LIMITS:
+            self.clock.start(time_limit_mins)
+
+        # The resume is pasted into the system prompt once here, not on every turn
+        self._base_prompt = self.flow.render_base(resume_text=resume_text)
+        self._prompt_cache = {}
 
     def update_history(self, user_text: str, ai_text: str):
         if user_text.strip():
-            self.history.append(HumanMessage(content=user_text))
+            self.history.append(Turn(HUMAN, user_text))
         if ai_text.strip():
-            self.history.append(AIMessage(content=ai_text))
+            self.history.append(Turn(AI, ai_text))
 
-    def get_state_instruction(self, user_input: str, has_image: bool) -> str:
+    def get_state_instruction(self, user_input: str, has_image: bool) -> StateInstruction:
         """
         Returns the System Prompt instruction AND internal reasoning hints 
-        based on the current state.
+        for the state this input leads to. Nothing changes until `apply_instruction`.
         """
-        base_instruction = (
-            "You are an expert HR and Technical Interviewer conducting an automated interview based on the candidate's resume.\n"
-            f"Here is the parsed content of their resume:\n<RESUME>\n{self.resume_text}\n</RESUME>\n\n"
-            "STRICT CONSTRAINTS:\n"
-            "1. Ask EXACTLY ONE question at a time.\n"
-            "2. Tailor your questions specifically to the candidate's resume content provided above.\n"
-            "3. Do not ask for live demos or screenshots. Assume the interview is purely conversational.\n"
-            "4. Keep your responses concise (under 2 sentences unless summarizing).\n"
-            "5. Make it feel like a real Viva/HR interview.\n"
-        )
-        
-        state_specific = ""
-
-        if self.state == ResumeConversationState.INITIAL:
-            state_specific = (
-                "STATE: INITIAL INTRODUCTION\n"
-                "- Greet the candidate and ask them to briefly introduce themselves highlighting their background from the resume.\n"
-            )
-        elif self.state == ResumeConversationState.EXPERIENCE:
-            state_specific = (
-                "STATE: EVALUATING EXPERIENCE / WORK HISTORY\n"
-                "- Ask about a specific past role or responsibility listed in the resume.\n"
-                "- Focus on what challenges they faced or what impact they had.\n"
-            )
-        elif self.state == ResumeConversationState.SKILLS:
-            state_specific = (
-                "STATE: EVALUATING SKILLS\n"
-                "- Pick a specific technical skill or tool mentioned in their resume.\n"
-                "- Ask a situational or deep-dive question about their experience with this skill.\n"
-                "- Do NOT ask more than one question.\n"
-            )
-        elif self.state == ResumeConversationState.PROJECTS:
-            state_specific = (
-                "STATE: EVALUATING PROJECTS\n"
-                "- Ask about a specific project they built or participated in, sourced from their resume.\n"
-                "- Ask about the technical choices they made or obstacles they overcame.\n"
-            )
-        elif self.state == ResumeConversationState.EDUCATION:
-            state_specific = (
-                "STATE: EVALUATING EDUCATION\n"
-                "- Ask a question related to their educational background, degrees, or coursework mentioned.\n"
-                "- If no education is listed, ask broadly about how their learning background prepared them for this field.\n"
-            )
-        elif self.state == ResumeConversationState.EXTRA_CURRICULARS:
-            state_specific = (
-                "STATE: EVALUATING EXTRA CURRICULARS & LEADERSHIP\n"
-                "- Ask about any clubs, volunteer work, or extracurricular leadership roles mentioned.\n"
-                "- If none are listed, ask about how they stay engaged with the tech community or collaborate outside of work.\n"
-            )
-        elif self.state == ResumeConversationState.HR:
-            state_specific = (
-                "STATE: HR & BEHAVIORAL\n"
-                "- Ask a classic behavioral or cultural-fit question (e.g., handling conflicts, teamwork, greatest strengths/weaknesses).\n"
-                "- Tie it to the general theme of their resume if possible.\n"
-            )
-        elif self.state == ResumeConversationState.COMPLETED:
-            state_specific = (
-                "STATE: COMPLETED\n"
-                "- The interview time is up or all sections are complete.\n"
-                "- Summarize briefly, thank the candidate for their time, and explicitly state that the interview is concluded.\n"
-            )
-
-        return base_instruction + "\n" + state_specific
+        state = self.state
+        # Out of time: the next turn is the closing summary, whatever the state
+        if self.clock.expired() and state != self.flow.final_state:
+            state = self.flow.final_state
+
+        # Trigger-driven transitions declared by the flow (none for the resume interview)
+        next_state = self.flow.trigger_transition(state, trigger_matcher.scan(user_input))
+        if next_state is not None:
+            state = next_state
+
+        prompt = self._prompt_cache.get(state)
+        if prompt is None:
+            prompt = self._base_prompt + "\n" + self.flow.prompt(state.name)
+            self._prompt_cache[state] = prompt
+        return StateInstruction(prompt, state, {"state": state})
+
+    def apply_instruction(self, instruction: StateInstruction):
+        """Commits the transition computed by `get_state_instruction`."""
+        for name, value in instruction.changes.items():
+            setattr(self, name, value)
+        self.templated_response = instruction.templated_response
+
+    def get_evaluation_target(self) -> Optional[dict]:
+        """The question the user's next answer responds to, for per-turn scoring."""
+        if self.state == self.flow.final_state or not self.history:
+            return None
+        if self.history[-1].role != AI:
+            return None
+        return {
+            "section": self.state.name.replace("_", " ").title(),
+            "question": self.history[-1].content,
+            "criteria": "Depth of the answer and consistency with the resume"
+        }
+
+    def adaptive_questions_per_state(self) -> int:
+        """Questions per section that still fit in the remaining time, at least one each."""
+        affordable = self.clock.affordable_exchanges(self.flow.seconds_per_exchange())
+        if affordable is None:
+            return self.max_questions_per_state
+        states_left = max(1, self.flow.states_left(self.route, self.state))
+        return max(1, min(self.max_questions_per_state, affordable // states_left))
 
     def check_state_transition(self, user_input: str, ai_response: str) -> None:
         """Logic to transition states and update progress."""
-        if self.state == ResumeConversationState.COMPLETED:
+        if self.state == self.flow.final_state:
             return
 
         self.questions_asked_in_current_state += 1
         self.global_completed_questions += 1
+        question_limit = self.adaptive_questions_per_state()
         
         # Update micro progress based on max questions per state
-        if self.max_questions_per_state > 0:
-            self.section_progress = min(100.0, (self.questions_asked_in_current_state / self.max_questions_per_state) * 100)
+        if question_limit > 0:
+            self.section_progress = min(100.0, (self.questions_asked_in_current_state / question_limit) * 100)
         else:
             self.section_progress = 100.0
 
-        if self.questions_asked_in_current_state >= self.max_questions_per_state:
+        if self.questions_asked_in_current_state >= question_limit:
             # Transition to next state depending on flow
             self.questions_asked_in_current_state = 0
             self.section_progress = 0.0
             
-            if self.focus_mode == "skills":
-                self.state = ResumeConversationState.COMPLETED
-            elif self.focus_mode == "projects":
-                self.state = ResumeConversationState.COMPLETED
-            else:
-                # General flow: INITIAL -> EXPERIENCE -> SKILLS -> PROJECTS -> EDUCATION -> EXTRA_CURRICULARS -> HR -> COMPLETED
-                if self.state == ResumeConversationState.INITIAL:
-                    self.state = ResumeConversationState.EXPERIENCE
-                elif self.state == ResumeConversationState.EXPERIENCE:
-                    self.state = ResumeConversationState.SKILLS
-                elif self.state == ResumeConversationState.SKILLS:
-                    self.state = ResumeConversationState.PROJECTS
-                elif self.state == ResumeConversationState.PROJECTS:
-                    self.state = ResumeConversationState.EDUCATION
-                elif self.state == ResumeConversationState.EDUCATION:
-                    self.state = ResumeConversationState.EXTRA_CURRICULARS
-                elif self.state == ResumeConversationState.EXTRA_CURRICULARS:
-                    self.state = ResumeConversationState.HR
-                elif self.state == ResumeConversationState.HR:
-                    self.state = ResumeConversationState.COMPLETED
+            # Compiled (route, state) -> next state table
+            self.state = self.flow.next_state(self.route, self.state)
 
     def get_progress_data(self):
         return {
             "macro_completed_chunks": self.global_completed_questions,
             "micro_section_progress": min(round(self.section_progress, 1), 100.0),
             "section": self.state.name,
-            "state": self.state.name
+            "state": self.state.name,
+            **self.clock.snapshot()
         }
 
     def reset(self):
         self.history = []
-        self.state = ResumeConversationState.INITIAL
+        self.state = self.flow.initial_state
         self.global_completed_questions = 0
         self.section_progress = 0.0
         self.questions_asked_in_current_state = 0
+        self.clock.reset()
@@ -0,0 +1,54 @@
+import time
+from typing import Callable, Optional
+
+class SessionClock:
+    """
+    Wall-clock budget for one interview session.
+
+    Started when the interview is configured; the state machines read it each
+    turn to shrink follow-up depth as time runs low and to end the interview
+    once the budget is spent.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.started_at: Optional[float] = None
+        self.budget_secs: Optional[float] = None
+
+    def start(self, time_limit_mins: float):
+        self.started_at = self._clock()
+        self.budget_secs = time_limit_mins * 60
+
+    def reset(self):
+        self.started_at = None
+        self.budget_secs = None
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None
+
+    def elapsed_secs(self) -> Optional[float]:
+        if not self.running:
+            return None
+        return self._clock() - self.started_at
+
+    def remaining_secs(self) -> Optional[float]:
+        if not self.running:
+            return None
+        return max(0.0, self.budget_secs - self.elapsed_secs())
+
+    def expired(self) -> bool:
+        return self.running and self.remaining_secs() <= 0
+
+    def affordable_exchanges(self, secs_per_exchange: float) -> Optional[int]:
+        """How many more question/answer exchanges fit in the remaining time."""
+        remaining = self.remaining_secs()
+        if remaining is None:
+            return None
+        return int(remaining // secs_per_exchange)
+
+    def snapshot(self) -> dict:
+        elapsed, remaining = self.elapsed_secs(), self.remaining_secs()
+        return {
+            "time_elapsed_secs": None if elapsed is None else round(elapsed),
+            "time_remaining_secs": None if remaining is None else round(remaining)
+        }
@@ -0,0 +1,97 @@
+import base64
+import binascii
+import logging
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger("SessionRecords")
+
+HUMAN = "human"
+AI = "ai"
+
+class Turn:
+    """One history message. LangChain messages are built from these only when a prompt is sent."""
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+    def __repr__(self):
+        return f"Turn({self.role!r}, {self.content!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Turn) and self.role == other.role and self.content == other.content
+
+
+def to_messages(history: Iterable) -> List:
+    """LangChain messages for a prompt; anything that already is one passes through."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    return [
+        (AIMessage if item.role == AI else HumanMessage)(content=item.content) if isinstance(item, Turn) else item
+        for item in history
+    ]
+
+
+class Screenshot:
+    """An image attached to the turn, held as raw bytes (base64 is a third larger)."""
+    __slots__ = ("mime", "data")
+
+    def __init__(self, mime: str, data: bytes):
+        self.mime = mime
+        self.data = data
+
+    @classmethod
+    def from_data_uri(cls, value: str) -> Optional["Screenshot"]:
+        """From a `data:image/...;base64,...` URI (or bare base64); None if it can't be decoded."""
+        mime, encoded = "image/jpeg", value
+        if value.startswith("data:") and "," in value:
+            header, encoded = value.split(",", 1)
+            mime = header[5:].split(";", 1)[0] or mime
+        try:
+            return cls(mime, base64.b64decode(encoded, validate=True))
+        except (binascii.Error, ValueError):
+            return None
+
+    def b64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+    def data_uri(self) -> str:
+        return f"data:{self.mime};base64,{self.b64()}"
+
+
+class AudioBuffer:
+    """
+    The turn's audio, in one buffer with a size cap. Audio past the cap is
+    dropped (the start holds the container header, so the tail goes).
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data = bytearray()
+        self.dropped_bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def extend(self, chunk: bytes) -> bool:
+        """Appends a whole chunk, or drops it if it would pass the cap (0 = no cap)."""
+        if self.max_bytes and len(self._data) + len(chunk) > self.max_bytes:
+            if not self.dropped_bytes:
+                logger.warning(f"Turn audio reached its {self.max_bytes} byte cap; further audio is dropped")
+            self.dropped_bytes += len(chunk)
+            return False
+        self._data.extend(chunk)
+        return True
+
+    def snapshot(self) -> bytes:
+        """A copy, for transcribing while more audio keeps arriving."""
+        return bytes(self._data)
+
+    def take(self) -> bytearray:
+        """Everything buffered, handed over without a copy; the buffer starts empty."""
+        data, self._data = self._data, bytearray()
+        self.dropped_bytes = 0
+        return data
+
+    def clear(self):
+        self._data = bytearray()
+        self.dropped_bytes = 0
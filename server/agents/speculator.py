@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("Speculator")
+
+class Draft:
+    __slots__ = ("key", "task")
+
+    def __init__(self, key: Tuple, task: asyncio.Task):
+        self.key = key
+        self.task = task
+
+class Speculator:
+    """
+    Drafts the next AI turn in the background while the user answers, for
+    turns whose prompt does not depend on the answer (the first question of
+    a new section). A draft is keyed by what the prompt was built from; on
+    commit it is used only if the key still matches, the draft finished in
+    time and it reads as a single question. Anything else is thrown away
+    and counted as waste.
+    """
+    def __init__(self, max_chars: int = 600):
+        self.max_chars = max_chars
+        # session_id -> the draft for that session's next turn
+        self._drafts: Dict[str, Draft] = {}
+        # session_id -> key of the last draft used or thrown away, so a turn is drafted once
+        self._settled: Dict[str, Tuple] = {}
+        self.stats = {"drafted": 0, "hits": 0, "stale": 0, "late": 0, "invalid": 0, "failed": 0,
+                      "used_tokens_est": 0, "wasted_tokens_est": 0}
+
+    def wants(self, session_id: str, key: Tuple) -> bool:
+        """False when this turn is already being drafted, or its draft was already settled."""
+        draft = self._drafts.get(session_id)
+        return not (draft and draft.key == key) and self._settled.get(session_id) != key
+
+    def start(self, session_id: str, key: Tuple, produce: Callable[[], Awaitable[str]]):
+        if not self.wants(session_id, key):
+            return
+        self.discard(session_id)
+        self._drafts[session_id] = Draft(key, asyncio.create_task(produce()))
+        self.stats["drafted"] += 1
+
+    def take(self, session_id: str, key: Tuple) -> Optional[str]:
+        """The adapted draft for the turn being committed, or None (draft discarded)."""
+        draft = self._drafts.pop(session_id, None)
+        if draft is None:
+            return None
+        self._settled[session_id] = draft.key
+        if draft.key != key:
+            return self._waste(draft, "stale")
+        if not draft.task.done():
+            # Still generating: a fresh streamed turn starts talking sooner
+            return self._waste(draft, "late")
+        if draft.task.cancelled() or draft.task.exception() is not None:
+            return self._waste(draft, "failed")
+
+        text = self.adapt(draft.task.result())
+        if not text:
+            return self._waste(draft, "invalid")
+        self.stats["hits"] += 1
+        self.stats["used_tokens_est"] += len(text) // 4
+        return text
+
+    def adapt(self, text: str) -> Optional[str]:
+        """Light cleanup; None if the draft is not a usable question."""
+        text = re.sub(r"^\s*(QUESTION|Interviewer)\s*:\s*", "", text or "", flags=re.IGNORECASE).strip()
+        if not text or "?" not in text or len(text) > self.max_chars:
+            return None
+        return text
+
+    def discard(self, session_id: str):
+        """Drops the session's draft (reset, disconnect) and forgets the session."""
+        self._settled.pop(session_id, None)
+        draft = self._drafts.pop(session_id, None)
+        if draft:
+            self._waste(draft, "stale")
+
+    def _waste(self, draft: Draft, reason: str) -> None:
+        self.stats[reason] += 1
+        if not draft.task.done():
+            draft.task.cancel()
+            # Cancelled mid-generation: the ledger has the actual usage, count the reserved output here
+            self.stats["wasted_tokens_est"] += self.max_chars // 4
+        elif not draft.task.cancelled() and draft.task.exception() is None:
+            self.stats["wasted_tokens_est"] += len(draft.task.result() or "") // 4
+        logger.info(f"Speculative draft discarded ({reason})")
+        return None
+
+    def get_stats(self) -> dict:
+        decided = self.stats["hits"] + self.stats["stale"] + self.stats["late"] + self.stats["invalid"] + self.stats["failed"]
+        return dict(self.stats, pending=len(self._drafts), hit_rate=round(self.stats["hits"] / decided, 3) if decided else 0.0)
@@ -0,0 +1,101 @@
+import builtins
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("StartupProfile")
+
+# Provider SDKs that must not be imported until first use
+DEFERRED_MODULES = ("langchain_groq", "langchain_openai", "groq", "google.genai", "PyPDF2")
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def loaded_deferred_modules() -> List[str]:
+    return [name for name in DEFERRED_MODULES if name in sys.modules]
+
+class StartupProfiler:
+    """
+    Times the top-level imports and setup phases of the server process.
+    Enabled with STARTUP_PROFILE=true; costs nothing when off.
+    """
+    def __init__(self, top: int = 15):
+        self.top = top
+        self.active = False
+        self.imports: Dict[str, float] = {}
+        self.phases: List[tuple] = []
+        self._depth = 0
+        self._original_import = None
+        self._started_at = 0.0
+        self._last_mark = 0.0
+
+    def start(self):
+        if self.active:
+            return
+        self.active = True
+        self._started_at = self._last_mark = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only outermost first-time imports are attributed, so nested ones aren't double counted
+        if self._depth or level or name in sys.modules:
+            self._depth += 1
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            self.imports[name] = self.imports.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def mark(self, phase: str):
+        """Records the time since the previous mark under `phase`."""
+        if not self.active:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last_mark) * 1000))
+        self._last_mark = now
+
+    def finish(self) -> Optional[dict]:
+        if not self.active:
+            return None
+        builtins.__import__ = self._original_import
+        self.active = False
+        report = self.get_report()
+
+        lines = [f"Startup took {report['total_ms']}ms, peak RSS {report['peak_rss_mb']}MB"]
+        lines += [f"  phase  {name:<32} {ms:8.1f}ms" for name, ms in report["phases"]]
+        lines += [f"  import {name:<32} {ms:8.1f}ms" for name, ms in report["imports"]]
+        if report["deferred_loaded"]:
+            lines.append(f"  deferred SDKs loaded at startup: {', '.join(report['deferred_loaded'])}")
+        logger.info("\n".join(lines))
+        return report
+
+    def get_report(self) -> dict:
+        slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:self.top]
+        return {
+            "total_ms": round((time.perf_counter() - self._started_at) * 1000, 1),
+            "peak_rss_mb": peak_rss_mb(),
+            "phases": [(name, round(ms, 1)) for name, ms in self.phases],
+            "imports": [(name, round(ms, 1)) for name, ms in slowest],
+            "deferred_loaded": loaded_deferred_modules(),
+        }
+
+# Global instance
+startup_profiler = StartupProfiler()
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Optional
+
+# Fields that tick continuously; only re-sent once they drift this far (seconds)
+VOLATILE_FIELDS = {
+    "time_elapsed_secs": 10,
+    "time_remaining_secs": 10,
+}
+
+class StateSync:
+    """
+    Versioned client state for one connection.
+
+    Every snapshot sent bumps `version`. Snapshots identical to what the client
+    already has are suppressed. In delta mode only changed fields go out
+    (`set`), and text fields that merely grew are sent as their new suffix
+    (`append`), so typing into a long draft costs bytes proportional to the
+    keystrokes, not the draft. A client that misses a version asks for a
+    `resync` and gets the full state again.
+    """
+    def __init__(self, deltas: bool = False):
+        self.deltas = deltas
+        self.version = 0
+        self.sent: Dict[str, Any] = {}
+
+    def _changed(self, key: str, value: Any) -> bool:
+        if key not in self.sent:
+            return True
+        previous = self.sent[key]
+        threshold = VOLATILE_FIELDS.get(key)
+        if threshold and isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+            return abs(value - previous) >= threshold
+        return previous != value
+
+    def update(self, snapshot: Dict[str, Any]) -> Optional[dict]:
+        """Message bringing the client up to `snapshot`, or None when nothing changed."""
+        changed = {key: value for key, value in snapshot.items() if self._changed(key, value)}
+        removed = [key for key in self.sent if key not in snapshot]
+        if not changed and not removed:
+            return None
+
+        if not self.deltas:
+            # Legacy full snapshot (still versioned, still suppressed when unchanged)
+            return self.full(snapshot)
+
+        base_version = self.version
+        self.version += 1
+        set_fields, append_fields = {}, {}
+        for key, value in changed.items():
+            previous = self.sent.get(key)
+            if isinstance(value, str) and isinstance(previous, str) and previous and value.startswith(previous):
+                append_fields[key] = value[len(previous):]
+            else:
+                set_fields[key] = value
+            self.sent[key] = value
+        for key in removed:
+            set_fields[key] = None
+            del self.sent[key]
+
+        message = {"type": "state_delta", "version": self.version, "base_version": base_version}
+        if set_fields:
+            message["set"] = set_fields
+        if append_fields:
+            message["append"] = append_fields
+        return message
+
+    def full(self, snapshot: Dict[str, Any]) -> dict:
+        """Full snapshot, e.g. for a (re)connecting client's resync request."""
+        self.version += 1
+        self.sent = dict(snapshot)
+        return {"type": "state_update", "version": self.version, "payload": snapshot}
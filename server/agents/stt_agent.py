@@ -1,16 +1,31 @@
-from groq import Groq
 from config import Config
+from agents.usage_ledger import usage_ledger
+from typing import Optional
 import asyncio
+import time
 import os
 
 class STTAgent:
     def __init__(self):
-        self.client = Groq(api_key=Config.GROQ_API_KEY)
+        self._client = None
+
+    @property
+    def client(self):
+        # The Groq SDK is imported on the first transcription, not at server startup
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=Config.GROQ_API_KEY)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
 
     async def transcribe(self, audio_path: str) -> str:
         # Running Groq transcription in a thread
         loop = asyncio.get_event_loop()
         def _transcribe():
+            started = time.perf_counter()
             with open(audio_path, "rb") as file:
                 transcription = self.client.audio.transcriptions.create(
                     file=(os.path.basename(audio_path), file.read()),
@@ -18,12 +33,18 @@ class STTAgent:
                     language=Config.TRANSCRIPTION_LANGUAGE,
                     response_format="verbose_json",
                 )
+                self._record_usage(transcription, started, None)
                 return transcription.text
         
         return await loop.run_in_executor(None, _transcribe)
 
 
-    async def transcribe_bytes(self, audio_bytes: bytes) -> str:
+    def _record_usage(self, transcription, started: float, session_id: Optional[str]):
+        # verbose_json carries the audio duration, which is what transcription is billed on
+        usage_ledger.record("stt", Config.WHISPER_MODEL, audio_secs=getattr(transcription, "duration", 0.0) or 0.0,
+                            latency_ms=(time.perf_counter() - started) * 1000, session_id=session_id)
+
+    async def transcribe_bytes(self, audio_bytes: bytes, session_id: Optional[str] = None) -> str:
         # Create a named pipe or temp file for the bytes
         loop = asyncio.get_event_loop()
         def _transcribe():
@@ -41,6 +62,7 @@ class STTAgent:
                 tmp_path = tmp.name
             
             try:
+                started = time.perf_counter()
                 with open(tmp_path, "rb") as file:
                     transcription = self.client.audio.transcriptions.create(
                         file=("audio.webm", file),
@@ -48,6 +70,7 @@ class STTAgent:
                         language=Config.TRANSCRIPTION_LANGUAGE,
                         response_format="verbose_json",
                     )
+                self._record_usage(transcription, started, session_id)
                 return transcription.text
             except Exception as e:
                 # Log error but don't crash? 
@@ -1,21 +1,34 @@
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_core.output_parsers import JsonOutputParser
 from typing import AsyncIterable, List, Dict, Optional
-import json
-import os
+from contextlib import aclosing
+import time
 from config import Config
+from agents.usage_ledger import usage_ledger
+from agents.session_records import to_messages
 
 class ThinkingAgent:
     def __init__(self, api_key: str, model_name: str):
-        self.llm = ChatGroq(
-            api_key=api_key,
-            model_name=model_name,
-            streaming=True
-        )
+        self.api_key = api_key
+        self.model_name = model_name
+        self._llm = None
+
+    @property
+    def llm(self):
+        # langchain_groq is the slowest import on the startup path; pay for it on first use
+        if self._llm is None:
+            from langchain_groq import ChatGroq
+            self._llm = ChatGroq(
+                api_key=self.api_key,
+                model_name=self.model_name,
+                streaming=True
+            )
+        return self._llm
 
-    async def stream_critique(self, transcript: str, image_data: Optional[str] = None, memory_context: str = "", history: List[Dict] = [], custom_system_prompt: Optional[str] = None, mode: str = "project") -> AsyncIterable[str]:
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+
+    async def stream_critique(self, transcript: str, image_data: Optional[str] = None, memory_context: str = "", history: List[Dict] = [], custom_system_prompt: Optional[str] = None, mode: str = "project", model_name: Optional[str] = None, max_tokens: Optional[int] = None, usage_tags: Optional[Dict] = None, endpoint: str = "live_turn") -> AsyncIterable[str]:
         # Default prompt if no custom logic provided
         base_system_prompt = (
             "You are an Agentic Critique System. Your task is to analyze user input and optional UI screenshots.\n"
@@ -33,14 +46,9 @@ class ThinkingAgent:
         messages = [SystemMessage(content=system_prompt)]
         
         # Add History
-        # history is expected to be list of langchain BaseMessages or dicts
-        # If they are dicts, convert? Or assume caller handles it?
-        # Let's assume caller sends proper LangChain messages or we just append them if they match.
-        # But `history` arg type hint says List[Dict] in my signature? 
-        # Plan said List[BaseMessage]. Let's support BaseMessage.
-        
+        # Session history is kept as compact Turn records; LangChain messages exist only for this call
         if history:
-            messages.extend(history)
+            messages.extend(to_messages(history))
 
         # Current Turn Input
         content = [{"type": "text", "text": f"Transcript: {transcript}\nMemory Context: {memory_context}"}]
@@ -53,6 +61,56 @@ class ThinkingAgent:
 
         messages.append(HumanMessage(content=content))
 
-        async for chunk in self.llm.astream(messages):
-            if chunk.content:
-                yield chunk.content
+        # Per-turn overrides (see ModelRouter) reuse the same client and connection pool
+        overrides = {}
+        if model_name:
+            overrides["model"] = model_name
+        if max_tokens:
+            overrides["max_tokens"] = max_tokens
+
+        async with aclosing(self._stream(messages, overrides, endpoint, usage_tags)) as stream:
+            async for text in stream:
+                yield text
+
+    async def _stream(self, messages: list, overrides: Dict, endpoint: str, usage_tags: Optional[Dict]) -> AsyncIterable[str]:
+        started = time.perf_counter()
+        usage = None
+        completion_chars = 0
+        try:
+            # aclosing: when the consumer stops early (cancel/disconnect) the upstream HTTP stream is closed at once
+            async with aclosing(self.llm.astream(messages, **overrides)) as stream:
+                async for chunk in stream:
+                    # Groq reports usage on the final chunk of the stream
+                    if chunk.usage_metadata:
+                        usage = chunk.usage_metadata
+                    if chunk.content:
+                        completion_chars += len(chunk.content)
+                        yield chunk.content
+        finally:
+            if usage is None:
+                # Stream cut before the provider reported usage: estimate at ~4 chars per token
+                prompt_chars = sum(len(str(message.content)) for message in messages)
+                usage = {"input_tokens": prompt_chars // 4, "output_tokens": completion_chars // 4}
+            usage_ledger.record(
+                endpoint, overrides.get("model", self.model_name),
+                prompt_tokens=usage.get("input_tokens", 0), completion_tokens=usage.get("output_tokens", 0),
+                latency_ms=(time.perf_counter() - started) * 1000, **(usage_tags or {})
+            )
+
+    async def stream_bridge(self, transcript: str, model_name: Optional[str] = None, usage_tags: Optional[Dict] = None) -> AsyncIterable[str]:
+        """One short sentence to follow a templated (zero-LLM) question."""
+        messages = [
+            SystemMessage(content=(
+                "You are a friendly interviewer. The next question has already been asked. "
+                "Write ONE short sentence (under 12 words) to follow it, e.g. inviting the user "
+                "to take their time or to include specifics. Do NOT ask another question."
+            )),
+            HumanMessage(content=f"User's previous answer: {transcript}")
+        ]
+        overrides = {"max_tokens": 30}
+        if model_name:
+            overrides["model"] = model_name
+
+        async with aclosing(self._stream(messages, overrides, "bridge", usage_tags)) as stream:
+            async for text in stream:
+                yield text
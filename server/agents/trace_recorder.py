@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+from agents import json_codec
+
+logger = logging.getLogger("TraceRecorder")
+
+MAGIC = b"ESSTRACE"
+VERSION = 1
+_HEADER = struct.Struct("<H")
+# kind, seconds since the connection opened, payload length
+_RECORD = struct.Struct("<BdI")
+# offset and length in the session's blob file
+_BLOB_REF = struct.Struct("<QI")
+
+META, IN_TEXT, IN_RAW_TEXT, IN_BYTES, OUT, CLOSE = range(6)
+KIND_NAMES = {META: "meta", IN_TEXT: "in_text", IN_RAW_TEXT: "in_raw_text", IN_BYTES: "in_bytes", OUT: "out", CLOSE: "close"}
+
+# Inbound string fields longer than this (screenshots, resumes) are stored in the blob file
+INLINE_LIMIT = 4096
+BLOB_KEY = "$blob"
+
+
+class TraceRecorder:
+    """
+    Timestamped trace of one /chatbot/ws connection: every inbound frame and
+    every outbound event, for offline replay (agents.trace_replay).
+
+    `<session>.trace` is a sequence of small binary records (kind, offset in
+    seconds, length, payload); JSON payloads are stored compactly. Audio
+    frames and large inbound fields (images, resumes) go to `<session>.blobs`
+    and are referenced by offset, with identical content stored once.
+    """
+    def __init__(self, trace_dir: str, session_id: str, meta: Optional[Dict[str, Any]] = None, clock=time.perf_counter):
+        os.makedirs(trace_dir, exist_ok=True)
+        self.path = os.path.join(trace_dir, f"{session_id}.trace")
+        self.clock = clock
+        self.started = clock()
+        self._trace = open(self.path, "wb", buffering=1 << 16)
+        self._blobs = open(os.path.join(trace_dir, f"{session_id}.blobs"), "wb", buffering=1 << 16)
+        self._blob_size = 0
+        self._blob_refs: Dict[bytes, tuple] = {}
+        self.records = 0
+        self._trace.write(MAGIC + _HEADER.pack(VERSION))
+        self._write(META, json_codec.dumps(dict(meta or {}, session_id=session_id, started_at=time.time())))
+        # A trace being written is readable (up to its last flushed record)
+        self._trace.flush()
+
+    def _write(self, kind: int, payload: bytes):
+        self._trace.write(_RECORD.pack(kind, self.clock() - self.started, len(payload)))
+        self._trace.write(payload)
+        self.records += 1
+
+    def _blob(self, data: bytes) -> tuple:
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        ref = self._blob_refs.get(digest)
+        if ref is None:
+            ref = self._blob_refs[digest] = (self._blob_size, len(data))
+            self._blobs.write(data)
+            self._blob_size += len(data)
+        return ref
+
+    def inbound(self, message: dict):
+        """A raw `websocket.receive()` message (text or bytes frame)."""
+        if self._trace.closed:
+            return
+        if message.get("bytes") is not None:
+            self._write(IN_BYTES, _BLOB_REF.pack(*self._blob(message["bytes"])))
+            return
+        text = message.get("text")
+        if text is None:
+            return
+        try:
+            payload = json_codec.loads(text)
+        except json_codec.JSONDecodeError:
+            self._write(IN_RAW_TEXT, text.encode("utf-8"))
+            return
+        if isinstance(payload, dict):
+            payload = {
+                key: {BLOB_KEY: self._blob(value.encode("utf-8"))} if isinstance(value, str) and len(value) > INLINE_LIMIT else value
+                for key, value in payload.items()
+            }
+        self._write(IN_TEXT, json_codec.dumps(payload))
+
+    def outbound(self, message: dict):
+        if not self._trace.closed:
+            self._write(OUT, json_codec.dumps(message))
+
+    def close(self, reason: str = ""):
+        if self._trace.closed:
+            return
+        self._write(CLOSE, json_codec.dumps({"reason": reason}))
+        self._trace.close()
+        self._blobs.close()
+        logger.info(f"Trace written: {self.path} ({self.records} records, {self._blob_size} blob bytes)")
+
+
+@dataclass
+class TraceEvent:
+    kind: str
+    t: float
+    data: Any  # dict for meta/in_text/out/close, str for in_raw_text, bytes for in_bytes
+
+
+def read_trace(path: str) -> Iterator[TraceEvent]:
+    """Events of a trace in order, with blob references resolved."""
+    blob_path = path[:-len(".trace")] + ".blobs" if path.endswith(".trace") else path + ".blobs"
+    with open(path, "rb") as trace, open(blob_path, "rb") as blobs:
+        if trace.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session trace")
+        version, = _HEADER.unpack(trace.read(_HEADER.size))
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+
+        def blob(offset: int, length: int) -> bytes:
+            blobs.seek(offset)
+            return blobs.read(length)
+
+        while True:
+            header = trace.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return  # end of file (or a trace cut short by a crash)
+            kind, t, length = _RECORD.unpack(header)
+            payload = trace.read(length)
+            if len(payload) < length:
+                return
+            if kind == IN_BYTES:
+                data = blob(*_BLOB_REF.unpack(payload))
+            elif kind == IN_RAW_TEXT:
+                data = payload.decode("utf-8")
+            else:
+                data = json_codec.loads(payload)
+                if kind == IN_TEXT and isinstance(data, dict):
+                    data = {
+                        key: blob(*value[BLOB_KEY]).decode("utf-8") if isinstance(value, dict) and BLOB_KEY in value else value
+                        for key, value in data.items()
+                    }
+            yield TraceEvent(KIND_NAMES.get(kind, str(kind)), t, data)
+
+
+def open_recorder(trace_dir: Optional[str], session_id: str, meta: Optional[Dict[str, Any]] = None) -> Optional[TraceRecorder]:
+    """A recorder for the connection, or None when recording is off or the directory is unusable."""
+    if not trace_dir:
+        return None
+    try:
+        return TraceRecorder(trace_dir, session_id, meta)
+    except OSError as e:
+        logger.warning(f"Trace recording disabled for {session_id}: {e}")
+        return None
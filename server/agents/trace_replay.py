@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import statistics
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+from agents import json_codec
+from agents.trace_recorder import TraceEvent, read_trace
+
+logger = logging.getLogger("TraceReplay")
+
+FALLBACK_RESPONSE = "Could you tell me more about that?"
+
+
+class RecordedProviders:
+    """
+    Stand-ins for the LLM and STT that answer with what a trace recorded:
+    the committed transcripts in order, and each turn's response keyed by
+    the text it answered. With `latency="recorded"` each response waits as
+    long as the recorded turn took to its first chunk; a number is a fixed
+    delay (0 = providers cost nothing, to measure the server alone).
+    """
+    def __init__(self, events: List[TraceEvent], latency="recorded", chunk_words: int = 3):
+        self.latency = latency
+        self.chunk_words = chunk_words
+        self.transcripts = deque(e.data["payload"] for e in events if e.kind == "out" and e.data.get("type") == "transcript_update")
+        self.responses: Dict[str, deque] = defaultdict(deque)
+        for turn in turn_latencies(events):
+            self.responses[turn["text"]].append((turn["response"], turn["ttfc"]))
+
+    def install(self, orchestrator, stt_agent):
+        orchestrator.thinking_agent = self
+        orchestrator.turn_evaluator = None
+
+        async def no_memory_update(state_snapshot):
+            return None
+        orchestrator.memory_agent.update_memory = no_memory_update
+        stt_agent.transcribe_bytes = self.transcribe_bytes
+
+    async def transcribe_bytes(self, audio_bytes: bytes, session_id: Optional[str] = None) -> str:
+        if len(self.transcripts) > 1:
+            return self.transcripts.popleft()
+        return self.transcripts[0] if self.transcripts else ""
+
+    async def _replay(self, text: str, recorded_delay: float):
+        delay = recorded_delay if self.latency == "recorded" else float(self.latency)
+        await asyncio.sleep(max(0.0, delay or 0.0))
+        words = text.split(" ")
+        for i in range(0, len(words), self.chunk_words):
+            yield " ".join(words[i:i + self.chunk_words]) + (" " if i + self.chunk_words < len(words) else "")
+            await asyncio.sleep(0)
+
+    async def stream_critique(self, transcript: str, *args, **kwargs):
+        recorded = self.responses.get(transcript)
+        text, delay = recorded.popleft() if recorded else (FALLBACK_RESPONSE, 0.0)
+        async for chunk in self._replay(text, delay):
+            yield chunk
+
+    async def stream_bridge(self, transcript: str, *args, **kwargs):
+        # Recorded bridges are already part of the recorded turn text
+        for chunk in ():
+            yield chunk
+
+
+def _decode(message: dict) -> Optional[dict]:
+    data = message.get("text")
+    if data is None:
+        data = message.get("bytes")
+    if data is None:
+        return None
+    try:
+        return json_codec.loads(data)
+    except json_codec.JSONDecodeError:
+        import msgpack  # only reachable when the trace was recorded with msgpack framing
+        return msgpack.unpackb(data, raw=False)
+
+
+def turn_latencies(events: List[TraceEvent]) -> List[dict]:
+    """
+    Per committed turn: the text committed, the response, time to the first
+    response chunk and to the end of the turn, measured from the inbound
+    frame that triggered it. A turn ends at the first state update after
+    its commit confirmation.
+    """
+    turns = []
+    last_inbound = 0.0
+    current = None
+    for event in events:
+        if event.kind.startswith("in_"):
+            last_inbound = event.t
+            continue
+        if event.kind != "out":
+            continue
+        kind, payload = event.data.get("type"), event.data.get("payload")
+        if kind == "commit_confirmation":
+            current = {"text": payload.get("text", ""), "started": last_inbound, "response": "", "ttfc": None, "duration": None}
+            turns.append(current)
+        elif current and kind == "response_chunk":
+            if current["ttfc"] is None:
+                current["ttfc"] = event.t - current["started"]
+            current["response"] += payload
+        elif current and kind == "state_update" and payload != "RESPONDING":
+            # "ACTIVE"/"INACTIVE" (or the state snapshot sent after it, should a trace lack it)
+            current["duration"] = event.t - current["started"]
+            current = None
+    return turns
+
+
+def summarize(turns: List[dict]) -> dict:
+    def ms(values, pct=None):
+        values = sorted(v for v in values if v is not None)
+        if not values:
+            return None
+        if pct is None:
+            return round(statistics.fmean(values) * 1000, 1)
+        return round(values[min(len(values) - 1, int(len(values) * pct))] * 1000, 1)
+
+    return {
+        "turns": len(turns),
+        "ttfc_p50_ms": ms([t["ttfc"] for t in turns], 0.5),
+        "ttfc_p95_ms": ms([t["ttfc"] for t in turns], 0.95),
+        "turn_mean_ms": ms([t["duration"] for t in turns]),
+    }
+
+
+async def replay(app, events: List[TraceEvent], speed: float = 1.0, settle_secs: float = 0.5, turn_timeout: float = 30.0,
+                 path: str = "/chatbot/ws") -> dict:
+    """
+    Drives the ASGI app with the trace's inbound frames over an in-process
+    WebSocket, at the recorded pace divided by `speed` (0 = as fast as the
+    server allows), and returns recorded vs replayed turn latencies. A frame
+    sent after a turn ended in the recording is held until that turn has
+    ended in the replay as well, so accelerated replays don't barge in.
+    """
+    meta = events[0].data if events and events[0].kind == "meta" else {}
+    inbound = [e for e in events if e.kind.startswith("in_")]
+    # Recorded end of each completed turn: later frames wait for the replayed turn to end too
+    turn_ends = sorted(t["started"] + t["duration"] for t in turn_latencies(events) if t["duration"] is not None)
+    incoming: asyncio.Queue = asyncio.Queue()
+    captured: List[TraceEvent] = []
+    last_output = time.perf_counter()
+    started = time.perf_counter()
+
+    async def receive():
+        return await incoming.get()
+
+    async def send(message: dict):
+        nonlocal last_output
+        if message["type"] == "websocket.send":
+            decoded = _decode(message)
+            if decoded is not None:
+                last_output = time.perf_counter()
+                captured.append(TraceEvent("out", last_output - started, decoded))
+
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": meta.get("query", "").encode(), "headers": [(b"x-tenant-id", b"replay")],
+        "client": ("127.0.0.1", 0), "server": ("replay", 80), "subprotocols": [],
+    }
+    await incoming.put({"type": "websocket.connect"})
+    server = asyncio.create_task(app(scope, receive, send))
+
+    def completed_turns() -> int:
+        return sum(1 for t in turn_latencies(captured) if t["duration"] is not None)
+
+    for event in inbound:
+        if speed:
+            await asyncio.sleep(max(0.0, started + event.t / speed - time.perf_counter()))
+        required = sum(1 for end in turn_ends if end <= event.t)
+        deadline = time.perf_counter() + turn_timeout
+        while completed_turns() < required and time.perf_counter() < deadline and not server.done():
+            await asyncio.sleep(0.005)
+        if event.kind == "in_bytes":
+            frame = {"type": "websocket.receive", "bytes": event.data}
+        else:
+            text = event.data if event.kind == "in_raw_text" else json_codec.dumps(event.data).decode("utf-8")
+            frame = {"type": "websocket.receive", "text": text}
+        captured.append(TraceEvent(event.kind, time.perf_counter() - started, event.data))
+        await incoming.put(frame)
+
+    # Let the last turns finish: done once nothing has been sent for `settle_secs`
+    while not server.done() and time.perf_counter() - last_output < settle_secs:
+        await asyncio.sleep(settle_secs / 10)
+    await incoming.put({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.wait({server}, timeout=5)
+    wall_secs = time.perf_counter() - started
+
+    recorded, replayed = turn_latencies(events), turn_latencies(captured)
+    return {
+        "speed": speed,
+        "inbound_frames": len(inbound),
+        "outbound_events": {"recorded": sum(1 for e in events if e.kind == "out"), "replayed": sum(1 for e in captured if e.kind == "out")},
+        "recorded": summarize(recorded),
+        "replayed": summarize(replayed),
+        "responses_match": [t["response"] for t in recorded] == [t["response"] for t in replayed],
+        "wall_secs": round(wall_secs, 3),
+    }
+
+
+def load(path: str) -> List[TraceEvent]:
+    return list(read_trace(path))
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from pydantic import ValidationError
+from agents.report_schema import QuestionChunkEvaluation
+from agents import json_codec
+from agents.admission import AdmissionController, AdmissionRejected, Priority
+from agents.usage_ledger import usage_ledger
+
+logger = logging.getLogger("TurnEvaluator")
+
+class TurnEvaluator:
+    """
+    Scores every committed answer in the background with the small memory model.
+    Records have the same shape as a map-reduce question chunk, so the final report
+    only needs the reduce (narrative) step on top of them.
+    """
+    def __init__(self, api_key: str, model_name: str, max_sessions: int = 100, resume_chars: int = 2000, admission: Optional[AdmissionController] = None):
+        self.api_key = api_key
+        self.admission = admission
+        self._client = None
+        self.model = model_name
+        self.max_sessions = max_sessions
+        self.resume_chars = resume_chars
+        # session_id -> list of records, oldest sessions evicted first
+        self.records: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self.pending: Dict[str, set] = {}
+        self.turn_counts: Dict[str, int] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    def schedule(self, session_id: str, target: Dict, answer: str, resume_text: str = "", tenant: str = "default"):
+        """Fire-and-forget evaluation of one answer; never blocks the live turn."""
+        # Order is fixed at schedule time; evaluations may finish out of order
+        index = self.turn_counts.get(session_id, 0)
+        self.turn_counts[session_id] = index + 1
+        task = asyncio.create_task(self.evaluate_turn(session_id, index, target, answer, resume_text, tenant))
+        self.pending.setdefault(session_id, set()).add(task)
+        task.add_done_callback(lambda t: self._forget_task(session_id, t))
+
+    def _forget_task(self, session_id: str, task: asyncio.Task):
+        tasks = self.pending.get(session_id)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self.pending[session_id]
+
+    async def evaluate_turn(self, session_id: str, index: int, target: Dict, answer: str, resume_text: str = "", tenant: str = "default"):
+        if self.admission:
+            try:
+                await self.admission.acquire(Priority.BACKGROUND, tenant)
+            except AdmissionRejected:
+                # Too few scored turns and the final report runs the full evaluation instead
+                logger.info(f"Turn {index} scoring shed under load")
+                return
+        loop = asyncio.get_event_loop()
+        record = await loop.run_in_executor(None, self._score, target, answer, resume_text, session_id)
+        if record is None:
+            return
+
+        session_records = self.records.setdefault(session_id, [])
+        self.records.move_to_end(session_id)
+        record["index"] = index
+        session_records.append(record)
+        while len(self.records) > self.max_sessions:
+            self.records.popitem(last=False)
+
+    def _score(self, target: Dict, answer: str, resume_text: str, session_id: Optional[str] = None) -> Optional[dict]:
+        resume_excerpt = resume_text[:self.resume_chars]
+        prompt = f"""Evaluate ONE interview answer. Return ONLY a JSON object.
+
+SECTION: {target["section"]}
+QUESTION ASKED: {target["question"]}
+EVALUATION CRITERIA: {target.get("criteria", "")}
+{f"RESUME (excerpt): {resume_excerpt}" if resume_excerpt else ""}
+
+CANDIDATE ANSWER: {answer}
+
+JSON keys: question, candidate_answer_summary, score (0-100 int), star_method_used (bool),
+completeness (complete|partial|missing), what_was_strong, what_was_missing, model_answer_hint,
+section, structured_thinking_score (0-100 int), active_listening_score (0-100 int),
+response_length_quality (too_short|optimal|too_long), consistent_points (list of strings),
+discrepancies (list of {{resume_claim, interview_response, flag}}).
+Keep every string under 25 words."""
+        try:
+            started = time.perf_counter()
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                max_tokens=500
+            )
+            usage_ledger.record_response("turn_scoring", self.model, response, (time.perf_counter() - started) * 1000, session_id=session_id)
+            data = json_codec.loads(response.choices[0].message.content)
+            data["question"] = target["question"]
+            data["section"] = target["section"]
+            return QuestionChunkEvaluation.model_validate(data).model_dump(mode="json")
+        except (ValueError, ValidationError) as e:
+            logger.warning(f"Discarding malformed turn evaluation: {e}")
+        except Exception as e:
+            logger.error(f"Turn evaluation error: {e}")
+        return None
+
+    async def get_records(self, session_id: str, timeout: float = 5.0) -> List[dict]:
+        """Waits briefly for in-flight evaluations, then returns the session's records."""
+        tasks = list(self.pending.get(session_id, ()))
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        records = sorted(self.records.get(session_id, []), key=lambda r: r["index"])
+        return [dict(record, index=i) for i, record in enumerate(records)]
+
+    def close(self, session_id: str):
+        """
+        The session's connection is gone, so no more turns are scheduled for it.
+        In-flight evaluations still finish: their records are kept (bounded by
+        `max_sessions`) for the report the client requests afterwards.
+        """
+        self.turn_counts.pop(session_id, None)
+
+    def clear(self, session_id: str):
+        self.records.pop(session_id, None)
+        # Evaluations of the previous interview must not land in the next one's records
+        for task in self.pending.pop(session_id, ()):
+            task.cancel()
+        self.turn_counts.pop(session_id, None)
@@ -4,7 +4,10 @@ from enum import Enum
 import time
 import asyncio
 import logging
-import base64
+import uuid
+from agents.state_sync import StateSync
+from agents.session_records import Screenshot, AudioBuffer
+from config import Config
 
 # Define the ActiveTurnContext as the single authoritative object
 @dataclass
@@ -12,7 +15,7 @@ class ActiveTurnContext:
     active: bool = False
     transcript: str = ""
     typed_text: str = ""
-    screenshots: List[str] = field(default_factory=list) # List of Base64 strings
+    screenshots: List[Screenshot] = field(default_factory=list) # Decoded images, re-encoded only at commit
     screen_source: Optional[str] = None # "shared" | "pasted" | None
     sources: Dict[str, bool] = field(default_factory=lambda: {"audio": False, "text": False, "image": False})
     started_at: float = field(default_factory=time.time)
@@ -27,31 +30,55 @@ class ActiveTurnContext:
         self.started_at = time.time()
 
 class TurnManager:
-    def __init__(self, orchestrator, stt_agent):
+    def __init__(self, orchestrator, stt_agent, state_deltas: bool = False, tenant: str = "default"):
         self.context = ActiveTurnContext()
         self.orchestrator = orchestrator
         self.stt_agent = stt_agent
         self.logger = logging.getLogger("TurnManager")
+        # Identifies this connection's interview (e.g. for per-turn evaluation records)
+        self.session_id = uuid.uuid4().hex
+        # Admission control bucket this connection's LLM calls count against
+        self.tenant = tenant
+        # Versioned snapshots / deltas of get_context_snapshot() sent to the client
+        self.state_sync = StateSync(deltas=state_deltas)
         self.is_responding = False
-        self.turn_audio = bytearray()
+        # Set to stop the in-flight response cooperatively (cancel event, reset, disconnect)
+        self.cancel_event = asyncio.Event()
+        # The one buffer for this turn's audio (main.py appends, pre-transcribes and takes it at commit)
+        self.audio = AudioBuffer(Config.MAX_TURN_AUDIO_BYTES)
         # Track triggered commands to avoid duplicates in accumulating transcript
         self.triggered_commands = {"screenshot": False}
 
     def get_context_snapshot(self):
-        manager = self.orchestrator.resume_manager if getattr(self.orchestrator, "current_mode", "project") == "resume" else self.orchestrator.conversation_manager
+        manager = self.orchestrator.active_manager
         progress_data = manager.get_progress_data()
         return {
+            "session_id": self.session_id,
             "active": self.context.active,
             "transcript": self.context.transcript,
             "typed_text": self.context.typed_text,
             "has_screenshot": len(self.context.screenshots) > 0,
-            "sources": self.context.sources,
+            # A copy: the turn updates sources in place, and StateSync compares against what it sent
+            "sources": dict(self.context.sources),
             "is_responding": self.is_responding,
             "macro_completed_chunks": progress_data["macro_completed_chunks"],
             "micro_section_progress": progress_data["micro_section_progress"],
-            "section": progress_data["section"]
+            "section": progress_data["section"],
+            # Session clock, pushed with every state update
+            "time_elapsed_secs": progress_data.get("time_elapsed_secs"),
+            "time_remaining_secs": progress_data.get("time_remaining_secs")
         }
 
+    def state_message(self, full: bool = False) -> Optional[dict]:
+        """
+        Versioned state message for the client, or None when nothing changed
+        since the last one. `full` forces a complete snapshot (resync).
+        """
+        snapshot = self.get_context_snapshot()
+        if full:
+            return self.state_sync.full(snapshot)
+        return self.state_sync.update(snapshot)
+
     async def process_audio_chunk(self, audio_bytes: bytes) -> AsyncGenerator[dict, None]:
         """
         Process incoming audio chunks.
@@ -61,11 +88,11 @@ class TurnManager:
         if self.is_responding or not self.context.active:
             return
 
-        self.turn_audio.extend(audio_bytes)
+        self.audio.extend(audio_bytes)
         
         try:
             # Transcribe the FULL audio buffer so far
-            full_transcript = await self.stt_agent.transcribe_bytes(bytes(self.turn_audio))
+            full_transcript = await self.stt_agent.transcribe_bytes(self.audio.snapshot(), session_id=self.session_id)
             if full_transcript:
                 # Use the unified text handler
                 async for response in self.process_text_input(full_transcript, source="audio"):
@@ -81,23 +108,31 @@ class TurnManager:
             self.logger.info("Ignoring image input while responding.")
             return
 
-        # We store the full Data URI (including prefix) to preserve mime type 
-        # for proper frontend rendering when confirmed back.
-        self.context.screenshots.append(image_b64)
+        # Kept as raw bytes plus the mime type; the data URI is rebuilt for the commit confirmation
+        screenshot = Screenshot.from_data_uri(image_b64)
+        if screenshot is None:
+            self.logger.warning("Ignoring image input that is not valid base64.")
+            return
+        if len(self.context.screenshots) >= Config.MAX_TURN_SCREENSHOTS:
+            self.logger.warning(f"Ignoring image input: the turn already has {Config.MAX_TURN_SCREENSHOTS} images.")
+            return
+        self.context.screenshots.append(screenshot)
         self.context.screen_source = source
         self.context.sources["image"] = True
         self.context.active = True
         self.logger.info(f"Context Image Added from source: {source}. Total: {len(self.context.screenshots)}")
 
-    async def handle_commit(self) -> AsyncGenerator[dict, None]:
+    async def handle_commit(self, trusted: bool = False) -> AsyncGenerator[dict, None]:
         """
         Triggers the interaction.
+        `trusted` is set only when the server itself put the prompt in the context.
         """
         if not self.context.active and not self.context.typed_text and not self.context.screenshots:
              self.logger.info("Commit called but context is empty/inactive. Ignoring.")
              return
 
         self.is_responding = True
+        self.cancel_event = asyncio.Event()
         yield {"type": "state_update", "payload": "RESPONDING"}
 
         full_prompt = f"{self.context.transcript} {self.context.typed_text}".strip()
@@ -109,33 +144,41 @@ class TurnManager:
             "type": "commit_confirmation", 
             "payload": {
                 "text": full_prompt, 
-                "images": self.context.screenshots # Sends list of full Data URIs
+                "images": [s.data_uri() for s in self.context.screenshots] # Full Data URIs for the frontend
             }
         }
 
         try:
-            # Orchestrator likely expects raw base64 (no header), so we strip them here for processing
-            processing_images = []
-            for img in self.context.screenshots:
-                if "," in img:
-                    processing_images.append(img.split(",", 1)[1])
-                else:
-                    processing_images.append(img)
+            # The orchestrator expects raw base64 (no header)
+            processing_images = [s.b64() for s in self.context.screenshots]
 
             # Note: We need to update Orchestrator to handle multiple images
-            async for chunk in self.orchestrator.run_flow(full_prompt, processing_images):
+            async for chunk in self.orchestrator.run_flow(full_prompt, processing_images, session_id=self.session_id, cancel_event=self.cancel_event, tenant=self.tenant, trusted=trusted):
                 yield {"type": "response_chunk", "payload": chunk}
                 
+        except asyncio.CancelledError:
+            # Interrupted (barge-in / cancel): clean up below, but don't yield while unwinding
+            self.logger.info("Turn interrupted")
+            raise
+
         except Exception as e:
             self.logger.error(f"Error during reasoning: {e}")
             yield {"type": "response_chunk", "payload": f"Error: {str(e)}"}
             
         finally:
+            # Audio arriving while the response streamed belongs to the next turn, so self.audio is kept
             self.context.reset()
-            self.turn_audio.clear()
             self.triggered_commands = {"screenshot": False}
             self.is_responding = False
-            yield {"type": "state_update", "payload": "ACTIVE" if self.context.active else "INACTIVE"}
+
+        yield {"type": "state_update", "payload": "ACTIVE" if self.context.active else "INACTIVE"}
+
+    def cancel_response(self):
+        """Asks the in-flight response to stop; returns False when nothing is streaming."""
+        if not self.is_responding:
+            return False
+        self.cancel_event.set()
+        return True
 
     def start_turn(self):
         if not self.context.active:
@@ -0,0 +1,144 @@
+import contextvars
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+from config import Config
+
+logger = logging.getLogger("UsageLedger")
+
+# Tags (session_id, state) for calls made deep inside a request, e.g. the report pipeline
+_scope: contextvars.ContextVar = contextvars.ContextVar("usage_scope", default={})
+
+def _empty() -> dict:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "audio_secs": 0.0, "latency_ms": 0.0, "cost_usd": 0.0}
+
+def _add(totals: dict, entry: dict):
+    for key, value in entry.items():
+        totals[key] += value
+
+def _rounded(totals: dict) -> dict:
+    return {
+        "calls": totals["calls"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "total_tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+        "audio_secs": round(totals["audio_secs"], 1),
+        "cost_usd": round(totals["cost_usd"], 6),
+        "avg_latency_ms": round(totals["latency_ms"] / totals["calls"], 1) if totals["calls"] else 0.0,
+    }
+
+class UsageLedger:
+    """
+    Upstream usage of every provider call: prompt/completion tokens, audio
+    seconds, latency and (where a price is configured) cost. Aggregated in
+    memory per endpoint, per state, per model and per session.
+    """
+    def __init__(self, session_token_budget: int = 0, prices: Optional[Dict[str, dict]] = None, max_sessions: int = 500):
+        self.session_token_budget = session_token_budget
+        # model -> {"prompt": $ per 1M tokens, "completion": $ per 1M tokens, "audio_hour": $ per hour}
+        self.prices = prices or {}
+        self.max_sessions = max_sessions
+        self.totals = _empty()
+        self.by_endpoint: Dict[str, dict] = {}
+        self.by_state: Dict[str, dict] = {}
+        self.by_model: Dict[str, dict] = {}
+        # session_id -> {"totals": ..., "by_state": ...}; oldest sessions evicted first
+        self.sessions: "OrderedDict[str, dict]" = OrderedDict()
+        # Memory, scoring and STT calls record from executor threads
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scope(self, **tags):
+        """Tags every call recorded inside the block (same task and tasks it creates)."""
+        token = _scope.set({**_scope.get(), **{k: v for k, v in tags.items() if v is not None}})
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+
+    def _cost(self, model: str, prompt_tokens: int, completion_tokens: int, audio_secs: float) -> float:
+        price = self.prices.get(model)
+        if not price:
+            return 0.0
+        return (prompt_tokens * price.get("prompt", 0.0) + completion_tokens * price.get("completion", 0.0)) / 1_000_000 \
+            + audio_secs * price.get("audio_hour", 0.0) / 3600
+
+    def record(self, endpoint: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, audio_secs: float = 0.0,
+               latency_ms: float = 0.0, session_id: Optional[str] = None, state: Optional[str] = None):
+        scope = _scope.get()
+        session_id = session_id or scope.get("session_id")
+        state = state or scope.get("state")
+        entry = {
+            "calls": 1,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "audio_secs": float(audio_secs or 0.0),
+            "latency_ms": float(latency_ms),
+            "cost_usd": self._cost(model, prompt_tokens or 0, completion_tokens or 0, audio_secs or 0.0),
+        }
+        with self._lock:
+            _add(self.totals, entry)
+            _add(self.by_endpoint.setdefault(endpoint, _empty()), entry)
+            _add(self.by_model.setdefault(model, _empty()), entry)
+            if state:
+                _add(self.by_state.setdefault(state, _empty()), entry)
+            if session_id:
+                session = self.sessions.get(session_id)
+                if session is None:
+                    session = self.sessions[session_id] = {"totals": _empty(), "by_state": {}}
+                    while len(self.sessions) > self.max_sessions:
+                        self.sessions.popitem(last=False)
+                self.sessions.move_to_end(session_id)
+                _add(session["totals"], entry)
+                if state:
+                    _add(session["by_state"].setdefault(state, _empty()), entry)
+
+    def record_response(self, endpoint: str, model: str, response, latency_ms: float, **tags):
+        """Records a non-streaming Groq/OpenAI-style completion from its `usage` block."""
+        usage = getattr(response, "usage", None)
+        self.record(endpoint, model, prompt_tokens=getattr(usage, "prompt_tokens", 0), completion_tokens=getattr(usage, "completion_tokens", 0),
+                    latency_ms=latency_ms, **tags)
+
+    def session_tokens(self, session_id: Optional[str]) -> int:
+        session = self.sessions.get(session_id) if session_id else None
+        return session["totals"]["prompt_tokens"] + session["totals"]["completion_tokens"] if session else 0
+
+    def over_budget(self, session_id: Optional[str]) -> bool:
+        return bool(self.session_token_budget) and self.session_tokens(session_id) >= self.session_token_budget
+
+    def session_usage(self, session_id: str) -> Optional[dict]:
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        return {
+            "totals": _rounded(session["totals"]),
+            "by_state": {state: _rounded(t) for state, t in session["by_state"].items()},
+            "token_budget": self.session_token_budget or None,
+        }
+
+    def log_session(self, session_id: str):
+        usage = self.session_usage(session_id)
+        if usage:
+            totals = usage["totals"]
+            logger.info(f"Session {session_id} usage: {totals['calls']} calls, {totals['prompt_tokens']} prompt + "
+                        f"{totals['completion_tokens']} completion tokens, {totals['audio_secs']}s audio, ${totals['cost_usd']}")
+
+    def get_stats(self) -> dict:
+        def ranked(table: Dict[str, dict]) -> dict:
+            # Biggest spenders first
+            ordered = sorted(table.items(), key=lambda item: item[1]["prompt_tokens"] + item[1]["completion_tokens"], reverse=True)
+            return {name: _rounded(totals) for name, totals in ordered}
+
+        return {
+            "totals": _rounded(self.totals),
+            "by_endpoint": ranked(self.by_endpoint),
+            "by_state": ranked(self.by_state),
+            "by_model": ranked(self.by_model),
+            "sessions": len(self.sessions),
+        }
+
+
+# Global instance
+usage_ledger = UsageLedger(session_token_budget=Config.SESSION_TOKEN_BUDGET, prices=Config.USAGE_PRICES)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from agents import json_codec
+from agents.flow_engine import flow_engine
+from agents.phrase_matcher import trigger_matcher
+
+logger = logging.getLogger("Warmup")
+
+class Warmup:
+    """
+    Runs the startup warm-up steps and tracks readiness for `/ready`.
+
+    Steps run concurrently, each bounded by `timeout`. A failed or timed-out
+    step is reported but does not keep the worker out of rotation: it only
+    means the first real request pays that cost instead.
+    """
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+        self.status = "pending"  # pending -> warming -> ready -> draining
+        self.steps: Dict[str, dict] = {}
+        self.duration_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def skip(self):
+        """Warm-up disabled: ready as soon as the app has started."""
+        self.status = "ready"
+
+    def drain(self):
+        """Shutting down: stop taking new traffic while in-flight sessions finish."""
+        self.status = "draining"
+
+    async def _step(self, name: str, step: Callable[[], Awaitable]):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(step(), timeout=self.timeout)
+            result = {"status": "ok"}
+        except asyncio.TimeoutError:
+            result = {"status": "timeout"}
+            logger.warning(f"Warm-up step '{name}' timed out after {self.timeout}s")
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+        result["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.steps[name] = result
+
+    async def run(self, steps: Dict[str, Callable[[], Awaitable]]):
+        self.status = "warming"
+        started = time.perf_counter()
+        await asyncio.gather(*(self._step(name, step) for name, step in steps.items()))
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if self.status == "warming":
+            self.status = "ready"
+        logger.info(f"Warm-up finished in {self.duration_ms}ms: {self.steps}")
+
+    def snapshot(self) -> dict:
+        return {"status": self.status, "warmup_ms": self.duration_ms, "steps": self.steps}
+
+
+def precompile_flows() -> int:
+    """Renders every prompt that needs only the flow constants, filling the render memo."""
+    rendered = 0
+    for flow in flow_engine.flows.values():
+        for key in flow.prompts:
+            try:
+                flow.render(key)
+                rendered += 1
+            except (KeyError, IndexError):
+                # Needs per-session values; rendered on first use
+                pass
+    return rendered
+
+def exercise_turn_paths(orchestrator):
+    """One dry turn through a throwaway manager per flow, so first-call costs are paid here."""
+    from agents.conversation_manager import ConversationManager
+    from agents.resume_manager import ResumeConversationManager
+
+    trigger_matcher.scan("Let's move on to the next question, here is a screenshot.")
+    json_codec.loads(json_codec.dumps({"type": "state_update", "payload": {"state": "warmup"}}))
+
+    managers = [ConversationManager(), ResumeConversationManager()]
+    managers += [ResumeConversationManager(manager.flow) for manager in orchestrator.flow_managers.values()]
+    for manager in managers:
+        if isinstance(manager, ConversationManager):
+            manager.setup_evaluation(15)
+        else:
+            manager.setup_interview("", manager.route, 15)
+        manager.get_state_instruction("Hello, this is a warm-up.", has_image=False)
+        orchestrator.router.route(orchestrator.current_mode, manager.state.name, has_image=False)
+
+async def open_async_groq_pool(llm):
+    """Lists models on the chat model's own async client, leaving a TLS connection in its pool."""
+    await llm.async_client._client.models.list()
+
+async def open_sync_client_pool(client):
+    """Same for a synchronous Groq client (STT, memory, turn scoring), off the event loop."""
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, client.models.list)
+
+async def open_gemini_pool(client, model_name: str):
+    await client.aio.models.get(model=model_name)
@@ -0,0 +1,102 @@
+"""
+Benchmark: JSON encoding/decoding on the WebSocket and REST paths.
+
+Compares what Starlette's `send_json` / FastAPI's JSONResponse do with the
+stdlib against agents.json_codec (orjson when installed) on representative
+payloads: a token chunk, a state_update snapshot and a 60-minute report.
+
+Run from the server directory:
+    python benchmarks/bench_json_codec.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import json_codec
+
+
+def token_chunk():
+    return {"type": "response_chunk", "payload": " scalability"}
+
+
+def state_update():
+    return {
+        "type": "state_update",
+        "version": 42,
+        "payload": {
+            "session_id": "0f5c2d7e9a3b4c1d8e6f0a2b4c6d8e0f",
+            "active": True,
+            "transcript": "So the service batches the embedding calls and caches them per user " * 6,
+            "typed_text": "We also shard the vector index by tenant " * 4,
+            "has_screenshot": False,
+            "sources": {"audio": True, "text": True, "image": False},
+            "is_responding": False,
+            "macro_completed_chunks": 3,
+            "micro_section_progress": 66.7,
+            "section": "Technical Implementation",
+            "time_elapsed_secs": 1260,
+            "time_remaining_secs": 2340,
+        },
+    }
+
+
+def interview_report_60min():
+    question = {
+        "question": "Walk me through how you designed the caching layer for the recommendation service.",
+        "answer_summary": "Described a read-through Redis cache keyed by user and model version, with TTL-based invalidation " * 2,
+        "score": 7,
+        "strengths": ["Clear trade-off reasoning", "Concrete numbers on hit rate"],
+        "improvements": ["Did not discuss cache stampede", "Vague on eviction policy under memory pressure"],
+        "ideal_answer_points": ["Stampede protection", "Versioned keys", "Metrics on hit ratio", "Fallback path"],
+    }
+    return {
+        "overall_score": 72,
+        "summary": "The candidate showed solid backend fundamentals with some gaps in distributed systems depth. " * 5,
+        "consistent_points": [f"Claimed experience with service {i} matched detailed answers" for i in range(12)],
+        "discrepancies": [f"Resume lists project {i} as lead but answers suggested a supporting role" for i in range(4)],
+        "communication": {"clarity": 7.5, "confidence": 6.8, "structure": 7.1, "conciseness": 6.2},
+        "question_breakdown": [dict(question, index=i) for i in range(40)],
+        "coaching": {"top_strengths": ["System design", "Ownership"] * 3, "focus_areas": ["Consistency models", "Capacity planning"] * 3},
+        "prep_plan": [{"day": d, "topic": "Distributed caching", "resources": ["DDIA ch. 5", "Redis docs"] * 2} for d in range(1, 15)],
+    }
+
+
+def stdlib_dumps(obj):
+    # What Starlette's send_json does for text frames
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def stdlib_render(obj):
+    # What FastAPI's default JSONResponse does
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def per_call_us(fn, payload, number):
+    seconds = min(timeit.repeat(lambda: fn(payload), number=number, repeat=5))
+    return seconds / number * 1e6
+
+
+def main():
+    payloads = [
+        ("token chunk", token_chunk(), 200000),
+        ("state_update", state_update(), 50000),
+        ("60-min report", interview_report_60min(), 2000),
+    ]
+    print(f"Fast backend: {json_codec.BACKEND}\n")
+    print(f"{'payload':<16}{'bytes':>8}{'stdlib send':>13}{'codec send':>12}{'stdlib loads':>14}{'codec loads':>13}{'render x':>10}")
+    for name, payload, number in payloads:
+        encoded = json_codec.dumps(payload)
+        text = encoded.decode("utf-8")
+        send_std = per_call_us(stdlib_dumps, payload, number)
+        send_fast = per_call_us(lambda p: json_codec.dumps(p).decode("utf-8"), payload, number)
+        loads_std = per_call_us(json.loads, text, number)
+        loads_fast = per_call_us(json_codec.loads, text, number)
+        render_speedup = per_call_us(stdlib_render, payload, number) / per_call_us(json_codec.dumps, payload, number)
+        print(f"{name:<16}{len(encoded):>8}{send_std:>11.2f}us{send_fast:>10.2f}us{loads_std:>12.2f}us{loads_fast:>11.2f}us{render_speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: core-question detection in ConversationManager.check_state_transition.
+
+Compares the old normalised-substring check with the token-set QuestionMatcher
+on a corpus of real AI phrasings (benchmarks/question_phrasings.json).
+
+Run from the server directory:
+    python benchmarks/bench_question_matcher.py
+"""
+import json
+import os
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.conversation_manager import EVALUATION_QUESTIONS, QUESTION_MATCHER
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_phrasings.json")
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    for case in corpus:
+        case["core"] = EVALUATION_QUESTIONS[case["section"]]["questions"][case["question"]]
+    return corpus
+
+
+def legacy_normalize(text):
+    lowered = text.lower()
+    no_punct = "".join(char for char in lowered if char not in string.punctuation)
+    return " ".join(no_punct.split())
+
+
+def legacy_matches(core, ai_text):
+    return legacy_normalize(core) in legacy_normalize(ai_text)
+
+
+def evaluate(corpus, matches):
+    tp = fp = fn = tn = 0
+    for case in corpus:
+        predicted = matches(case["core"], case["text"])
+        if predicted and case["asks"]:
+            tp += 1
+        elif predicted:
+            fp += 1
+        elif case["asks"]:
+            fn += 1
+        else:
+            tn += 1
+    return {
+        "accuracy": (tp + tn) / len(corpus),
+        "recall": tp / max(1, tp + fn),
+        "false_positives": fp,
+    }
+
+
+def per_call_us(corpus, matches, repeat=200):
+    def run():
+        for case in corpus:
+            matches(case["core"], case["text"])
+    seconds = min(timeit.repeat(run, number=repeat, repeat=3))
+    return seconds / (repeat * len(corpus)) * 1e6
+
+
+def main():
+    corpus = load_corpus()
+    print(f"Corpus: {len(corpus)} AI responses ({sum(c['asks'] for c in corpus)} ask the core question)\n")
+    print(f"{'matcher':<22}{'accuracy':>10}{'recall':>10}{'false+':>8}{'us/call':>10}")
+    for name, fn in [("normalised substring", legacy_matches), ("token-set matcher", QUESTION_MATCHER.matches)]:
+        stats = evaluate(corpus, fn)
+        cost = per_call_us(corpus, fn)
+        print(f"{name:<22}{stats['accuracy']:>10.2%}{stats['recall']:>10.2%}{stats['false_positives']:>8}{cost:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
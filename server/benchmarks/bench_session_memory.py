@@ -0,0 +1,89 @@
+"""
+Benchmark: memory held per live session, old vs compact representation.
+
+Old: history as LangChain HumanMessage/AIMessage objects, screenshots as
+base64 data URIs, the turn's audio held twice (TurnManager.turn_audio and
+main.py's audio_buffer). Compact: agents.session_records Turn records,
+raw-bytes Screenshots and one capped AudioBuffer.
+
+Sessions of 15 and 60 minutes, one exchange every 45s (between the project
+and resume flow budgets), ~550-char answers and ~380-char replies, with a
+turn in flight holding 45s of Opus audio and two screenshots. Measured
+with tracemalloc.
+
+Run from the server directory:
+    python benchmarks/bench_session_memory.py
+"""
+import base64
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from agents.session_records import AI, HUMAN, AudioBuffer, Screenshot, Turn
+
+SECONDS_PER_EXCHANGE = 45
+ANSWER = "We batch the embedding calls per tenant and cache the vectors so repeated matches are cheap. " * 6
+REPLY = "That makes sense. How do you invalidate the cache when a student updates their profile, and what breaks if it is stale? " * 3
+AUDIO_BYTES = 45 * 32_000 // 8  # 45s of Opus at 32 kbps
+SCREENSHOT_BYTES = 250_000
+SCREENSHOTS = 2
+AUDIO_CHUNK = 4_000
+
+
+def screenshot_uri(i):
+    return "data:image/png;base64," + base64.b64encode(bytes([i % 251]) * SCREENSHOT_BYTES).decode("ascii")
+
+
+def old_session(exchanges):
+    history = []
+    for i in range(exchanges):
+        history.append(HumanMessage(content=f"{i} {ANSWER}"))
+        history.append(AIMessage(content=f"{i} {REPLY}"))
+    screenshots = [screenshot_uri(i) for i in range(SCREENSHOTS)]
+    turn_audio, audio_buffer = bytearray(), bytearray()
+    for _ in range(AUDIO_BYTES // AUDIO_CHUNK):
+        chunk = os.urandom(AUDIO_CHUNK)
+        turn_audio.extend(chunk)
+        audio_buffer.extend(chunk)
+    return history, screenshots, (turn_audio, audio_buffer)
+
+
+def compact_session(exchanges):
+    history = []
+    for i in range(exchanges):
+        history.append(Turn(HUMAN, f"{i} {ANSWER}"))
+        history.append(Turn(AI, f"{i} {REPLY}"))
+    screenshots = [Screenshot.from_data_uri(screenshot_uri(i)) for i in range(SCREENSHOTS)]
+    audio = AudioBuffer(8 * 1024 * 1024)
+    for _ in range(AUDIO_BYTES // AUDIO_CHUNK):
+        audio.extend(os.urandom(AUDIO_CHUNK))
+    return history, screenshots, audio
+
+
+def measure(build, exchanges, sessions=5):
+    """Bytes per session still allocated once the sessions are built (temporaries excluded)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    held = [build(exchanges) for _ in range(sessions)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del held
+    return total / sessions
+
+
+def main():
+    print(f"{'session':<10}{'exchanges':>10}{'old KB':>10}{'compact KB':>12}{'saved':>8}{'old/GB':>9}{'compact/GB':>12}")
+    for minutes in (15, 60):
+        exchanges = minutes * 60 // SECONDS_PER_EXCHANGE
+        old = measure(old_session, exchanges)
+        compact = measure(compact_session, exchanges)
+        print(f"{minutes:>3} min   {exchanges:>10}{old / 1024:>10.0f}{compact / 1024:>12.0f}{1 - compact / old:>8.0%}"
+              f"{2**30 // old:>9.0f}{2**30 // compact:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
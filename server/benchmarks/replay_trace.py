@@ -0,0 +1,46 @@
+"""
+Replay a recorded /chatbot/ws session against the current server code.
+
+Record traces with TRACE_RECORDING=true (written to TRACE_DIR), then run
+from the server directory:
+    python benchmarks/replay_trace.py traces/<session_id>.trace --speed 4
+    python benchmarks/replay_trace.py traces/<session_id>.trace --speed 0 --provider-latency 0
+
+Providers (LLM, STT) answer from the trace itself, so no API keys or network
+are needed. `--provider-latency recorded` replays each turn's recorded time
+to first chunk; a number in seconds fixes it (0 measures the server alone).
+Prints recorded vs replayed time-to-first-chunk and turn duration as JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Providers are stubbed; the replay must not record itself
+for key in ("GROQ_API_KEY", "CHATBOT_API_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(key, "replay")
+os.environ["TRACE_RECORDING"] = "false"
+os.environ.setdefault("WARMUP_ENABLED", "false")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 4 = 4x faster, 0 = no pauses")
+    parser.add_argument("--provider-latency", default="recorded", help="'recorded' or seconds")
+    args = parser.parse_args()
+
+    import main as server
+    from agents.trace_replay import RecordedProviders, load, replay
+
+    events = load(args.trace)
+    RecordedProviders(events, latency=args.provider_latency).install(server.orchestrator, server.stt_agent)
+    result = asyncio.run(replay(server.app, events, speed=args.speed))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
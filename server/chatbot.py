@@ -1,48 +1,119 @@
 # chatbot.py
-from google import genai
-import os
-from dotenv import load_dotenv # type: ignore
-
-load_dotenv()
-CHATBOT_API_KEY = os.getenv("CHATBOT_API_KEY")
-client = genai.Client(api_key=CHATBOT_API_KEY)
-
-# In-memory history
-history = [
-    {"role": "model", "parts": "Hi I am Essence - an Agentic Critic, how can I help you today?"}
-]
-
-
-def chat(user_input: str):
-    global history
-    SYSTEM_PROMPT = f"""
-        You are Essence - an Agentic Critic, a large language model trained by Google.
-        You are an expert in providing critical analysis and feedback on a project/website/product.
-        You would try to understand the user's requirements and provide constructive criticism to help them improve.
-        You would also provide suggestions and recommendations to help the user achieve their goals.
-        You should try to develop a thorough understanding of the user's project/website/product and ask questions on parts which you don't understand.
-        Also try and understand how the product is developed, which tech stack is used. If you feel the tech stack isn't right, try to ask the user why they chose that stack and provide suggestions on better alternatives.
-        Also try to tell them future scope of how they can improve their product/website/project to solve a real world problem.
+import asyncio
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional
+from config import Config
+from agents.usage_ledger import usage_ledger
+
+SYSTEM_PROMPT = """
+You are Essence - an Agentic Critic, a large language model trained by Google.
+You are an expert in providing critical analysis and feedback on a project/website/product.
+You would try to understand the user's requirements and provide constructive criticism to help them improve.
+You would also provide suggestions and recommendations to help the user achieve their goals.
+You should try to develop a thorough understanding of the user's project/website/product and ask questions on parts which you don't understand.
+Also try and understand how the product is developed, which tech stack is used. If you feel the tech stack isn't right, try to ask the user why they chose that stack and provide suggestions on better alternatives.
+Also try to tell them future scope of how they can improve their product/website/project to solve a real world problem.
+"""
+
+class ChatSession:
+    def __init__(self):
+        # Native multi-turn Content objects (user/model pairs), oldest first
+        self.history: List = []
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class ChatService:
+    """
+    Per-session, async, streaming Gemini chat.
+
+    Each session keeps its own structured history, capped at `max_turns`
+    user/model exchanges, and is sent as multi-turn contents with the system
+    prompt as a system instruction, so nothing is re-concatenated per turn.
+    Messages within a session are serialised; sessions run concurrently.
+    Idle sessions expire after `idle_ttl_secs`, and the least recently used
+    are evicted beyond `max_sessions`.
     """
+    def __init__(self, api_key: Optional[str], model_name: str, max_turns: int = 20, max_sessions: int = 200, idle_ttl_secs: float = 1800):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.idle_ttl_secs = idle_ttl_secs
+        self.sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._client = None
+        self._config = None
+
+    @property
+    def client(self):
+        # google.genai is only imported when the first message arrives
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+
+    @property
+    def config(self):
+        if self._config is None:
+            from google.genai import types
+            self._config = types.GenerateContentConfig(system_instruction=SYSTEM_PROMPT)
+        return self._config
+
+    def _session(self, session_id: str) -> ChatSession:
+        now = time.monotonic()
+        for stale_id in [sid for sid, s in self.sessions.items() if now - s.last_used > self.idle_ttl_secs and not s.lock.locked()]:
+            del self.sessions[stale_id]
+
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = ChatSession()
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        self.sessions.move_to_end(session_id)
+        session.last_used = now
+        return session
 
-    # Add user input
-    history.append({"role": "user", "parts": user_input})
+    async def stream(self, session_id: str, user_input: str) -> AsyncIterator[str]:
+        """Streams the reply text; the exchange joins the history only once it completes."""
+        session = self._session(session_id)
+        async with session.lock:
+            chat = self.client.aio.chats.create(model=self.model_name, config=self.config, history=list(session.history))
+            started = time.perf_counter()
+            usage = None
+            try:
+                async for chunk in await chat.send_message_stream(user_input):
+                    if chunk.usage_metadata:
+                        usage = chunk.usage_metadata
+                    if chunk.text:
+                        yield chunk.text
+            finally:
+                usage_ledger.record(
+                    "chatbot", self.model_name,
+                    prompt_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+                    completion_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+                    latency_ms=(time.perf_counter() - started) * 1000, session_id=session_id
+                )
 
-    # Build conversation text
-    conversation = "\n".join(
-        f"{msg['role'].capitalize()}: {msg['parts']}" for msg in history
-    )
+            # Whole exchanges only, so the history always starts with a user turn
+            history = chat.get_history(curated=True)
+            session.history = history[-2 * self.max_turns:]
+            session.last_used = time.monotonic()
 
-    # Send request to Gemini
-    response = client.models.generate_content(
-        model="gemini-3-flash-preview",
-        contents=SYSTEM_PROMPT + "\n\nConversation:\n" + conversation,
-    )
+    async def reply(self, session_id: str, user_input: str) -> str:
+        return "".join([text async for text in self.stream(session_id, user_input)])
 
-    # Extract reply
-    bot_reply = response.text
+    def reset(self, session_id: str):
+        self.sessions.pop(session_id, None)
 
-    # Add bot reply
-    history.append({"role": "model", "parts": bot_reply})
 
-    return bot_reply
+# Global instance
+chat_service = ChatService(
+    api_key=Config.CHATBOT_API_KEY,
+    model_name=Config.CHATBOT_MODEL,
+    max_turns=Config.CHATBOT_MAX_TURNS
+)
@@ -1,8 +1,14 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _phrase_list(env_name: str, default: list) -> list:
+    """Comma-separated override from the environment, else the default phrases."""
+    value = os.getenv(env_name)
+    return [p.strip() for p in value.split(",") if p.strip()] if value else default
+
 class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     # LLaMA 4 Scout (Vision) - Using llama-3.2-11b-vision-preview as placeholder if scout not available
@@ -10,6 +16,17 @@ class Config:
     
     # Llama 3.1 8B - High quality small model for memory
     MEMORY_MODEL = "llama-3.1-8b-instant" 
+
+    # Per-turn model routing with output caps (see agents/model_router.py); opt-in,
+    # off means every turn uses THINKING_MODEL with no max_tokens
+    ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "false").lower() == "true"
+    VISION_MODEL = THINKING_MODEL                # Only for turns with screenshots
+    ACK_MODEL = "llama-3.1-8b-instant"           # "I see" / "Go on" acknowledgements
+    EVALUATION_MODEL = "llama-3.3-70b-versatile" # Follow-ups, questions and summaries
+
+    # Zero-LLM fast path for turns fully determined by the state machine
+    FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+    FAST_PATH_BRIDGE = os.getenv("FAST_PATH_BRIDGE", "false").lower() == "true"
     
     # Audio whisper
     WHISPER_MODEL = "whisper-large-v3"
@@ -18,6 +35,110 @@ class Config:
     # Report Generation
     GEMINI_API_KEY = os.getenv("CHATBOT_API_KEY")
     REPORT_MODEL = "gemini-2.5-flash"
+    # Map-reduce report pipeline (long interviews)
+    REPORT_MAX_CONCURRENCY = int(os.getenv("REPORT_MAX_CONCURRENCY", "6"))
+    REPORT_MAP_REDUCE_MIN_CHUNKS = int(os.getenv("REPORT_MAP_REDUCE_MIN_CHUNKS", "12"))
+    # Ask Gemini for schema-constrained JSON; broken sections are regenerated individually
+    REPORT_STRUCTURED_OUTPUT = os.getenv("REPORT_STRUCTURED_OUTPUT", "true").lower() == "true"
+    REPORT_SECTION_RETRIES = int(os.getenv("REPORT_SECTION_RETRIES", "1"))
+
+    # Per-turn background evaluation with MEMORY_MODEL (reports aggregate the records)
+    INCREMENTAL_EVALUATION = os.getenv("INCREMENTAL_EVALUATION", "false").lower() == "true"
+    # Minimum share of question chunks that must have a record to skip the map step
+    TURN_EVAL_MIN_COVERAGE = float(os.getenv("TURN_EVAL_MIN_COVERAGE", "0.6"))
+
+    # Trigger phrases (matched on word boundaries, see agents/phrase_matcher.py)
+    TRANSITION_TRIGGERS = _phrase_list("TRANSITION_TRIGGERS", [
+        "that's it", "that is it", "that's all", "that is all",
+        "done explaining", "finished explaining",
+        "what do you think", "ready for questions",
+        "basically it", "started"
+    ])
+    SCREENSHOT_KEYWORDS = _phrase_list("SCREENSHOT_KEYWORDS", [
+        "ui", "interface", "interfaces", "visual", "visuals", "output", "outputs",
+        "dashboard", "dashboards", "screen", "screens", "result", "results",
+        "chart", "charts", "page", "pages", "display", "displays", "view", "views", "look", "looks"
+    ])
+
+    # Send versioned field deltas instead of full state snapshots (clients may also opt in per connection)
+    STATE_DELTAS = os.getenv("STATE_DELTAS", "false").lower() == "true"
+
+    # Batch response_chunk tokens into fewer websocket frames (first token always sent at once)
+    CHUNK_COALESCING = os.getenv("CHUNK_COALESCING", "true").lower() == "true"
+    CHUNK_FLUSH_MIN_MS = int(os.getenv("CHUNK_FLUSH_MIN_MS", "10"))
+    CHUNK_FLUSH_MAX_MS = int(os.getenv("CHUNK_FLUSH_MAX_MS", "60"))
+    CHUNK_FLUSH_BYTES = int(os.getenv("CHUNK_FLUSH_BYTES", "512"))
+    # Outbound frame encoding: "json" (text frames), "json_binary" or "msgpack" (binary, needs the msgpack package)
+    WS_FRAMING = os.getenv("WS_FRAMING", "json")
+
+    # Per-connection outbound queue (backpressure for slow clients)
+    WS_QUEUE_MAX_MESSAGES = int(os.getenv("WS_QUEUE_MAX_MESSAGES", "256"))
+    WS_SLOW_CONSUMER_TIMEOUT_SECS = float(os.getenv("WS_SLOW_CONSUMER_TIMEOUT_SECS", "10"))
+    WS_DISCONNECT_SLOW_CONSUMERS = os.getenv("WS_DISCONNECT_SLOW_CONSUMERS", "false").lower() == "true"
+
+    # Websocket commands waiting behind an in-flight response
+    WS_COMMAND_QUEUE_MAX = int(os.getenv("WS_COMMAND_QUEUE_MAX", "64"))
+    # Transcribe audio that arrives while a response is streaming, ahead of the commit
+    PRETRANSCRIBE_AUDIO = os.getenv("PRETRANSCRIBE_AUDIO", "true").lower() == "true"
+    PRETRANSCRIBE_MIN_BYTES = int(os.getenv("PRETRANSCRIBE_MIN_BYTES", "32000"))
+    # Opt-in trace of every /chatbot/ws frame in and event out, for offline replay
+    # (benchmarks/replay_trace.py). Traces hold user audio, screenshots and resumes.
+    TRACE_RECORDING = os.getenv("TRACE_RECORDING", "false").lower() == "true"
+    TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+    # Per-turn caps on what a session holds in memory: buffered audio and attached screenshots
+    MAX_TURN_AUDIO_BYTES = int(os.getenv("MAX_TURN_AUDIO_BYTES", str(8 * 1024 * 1024)))
+    MAX_TURN_SCREENSHOTS = int(os.getenv("MAX_TURN_SCREENSHOTS", "8"))
+    # Draft the first question of the next interview section while the user is still answering
+    SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "false").lower() == "true"
+    SPECULATIVE_MAX_CHARS = int(os.getenv("SPECULATIVE_MAX_CHARS", "600"))
+
+    # Admission control (token buckets per provider): live turns > reports > background calls.
+    # Each tenant (x-tenant-id header / ?tenant=, else client address) gets a share of the rate.
+    ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+    GROQ_RATE_PER_SEC = float(os.getenv("GROQ_RATE_PER_SEC", "5"))
+    GROQ_BURST = float(os.getenv("GROQ_BURST", "20"))
+    GEMINI_RATE_PER_SEC = float(os.getenv("GEMINI_RATE_PER_SEC", "0.5"))
+    GEMINI_BURST = float(os.getenv("GEMINI_BURST", "4"))
+    ADMISSION_TENANT_SHARE = float(os.getenv("ADMISSION_TENANT_SHARE", "0.5"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    ADMISSION_MAX_WAIT_LIVE_SECS = float(os.getenv("ADMISSION_MAX_WAIT_LIVE_SECS", "5"))
+    ADMISSION_MAX_WAIT_REPORT_SECS = float(os.getenv("ADMISSION_MAX_WAIT_REPORT_SECS", "30"))
+    ADMISSION_MAX_WAIT_BACKGROUND_SECS = float(os.getenv("ADMISSION_MAX_WAIT_BACKGROUND_SECS", "2"))
+
+    # Input guard on transcripts and resume text: "off", "local" (offline heuristic) or
+    # "prompt_guard" (Groq-hosted Llama Prompt Guard 2, heuristic fallback)
+    GUARD_MODE = os.getenv("GUARD_MODE", "local").lower()
+    GUARD_MODEL = os.getenv("GUARD_MODEL", "meta-llama/llama-prompt-guard-2-22m")
+    GUARD_THRESHOLD = float(os.getenv("GUARD_THRESHOLD", "0.5"))
+
+    # Cache of the resume-mode opening turn, replayed when the same resume is restarted
+    OPENING_CACHE_ENABLED = os.getenv("OPENING_CACHE_ENABLED", "true").lower() == "true"
+    OPENING_CACHE_SIZE = int(os.getenv("OPENING_CACHE_SIZE", "256"))
+    OPENING_CACHE_TTL_SECS = float(os.getenv("OPENING_CACHE_TTL_SECS", "86400"))
+
+    # Legacy Essence chat (chatbot.py): per-session Gemini chat with bounded history
+    CHATBOT_API_KEY = os.getenv("CHATBOT_API_KEY")
+    CHATBOT_MODEL = os.getenv("CHATBOT_MODEL", "gemini-3-flash-preview")
+    CHATBOT_MAX_TURNS = int(os.getenv("CHATBOT_MAX_TURNS", "20"))
+
+    # Usage ledger: per-session token budget (0 = unlimited) and optional per-model prices,
+    # e.g. {"llama-3.3-70b-versatile": {"prompt": 0.59, "completion": 0.79}, "whisper-large-v3": {"audio_hour": 0.111}}
+    SESSION_TOKEN_BUDGET = int(os.getenv("SESSION_TOKEN_BUDGET", "0"))
+    USAGE_PRICES = json.loads(os.getenv("USAGE_PRICES", "{}"))
+
+    # Startup profiling: logs an import/setup time breakdown and peak RSS once the app is built
+    STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+    # Warm-up before /ready reports ready: prompt templates and first-call code paths,
+    # plus pooled provider connections (Groq, Gemini) when WARMUP_CONNECTIONS is on
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "false").lower() == "true"
+    WARMUP_CONNECTIONS = os.getenv("WARMUP_CONNECTIONS", "true").lower() == "true"
+    WARMUP_TIMEOUT_SECS = float(os.getenv("WARMUP_TIMEOUT_SECS", "10"))
+
+    # Enforce the selected interview length on the wall clock (adaptive depth, hard stop)
+    SESSION_TIME_LIMITS = os.getenv("SESSION_TIME_LIMITS", "true").lower() == "true"
+
+    # Interview flow definitions (states, transitions, prompts, time budgets)
+    FLOWS_DIR = os.getenv("FLOWS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "flows"))
 
     # OpenRouter
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
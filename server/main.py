@@ -2,24 +2,72 @@ import logging
 import os
 from dotenv import load_dotenv
 load_dotenv()
+from config import Config
+from agents.startup_profile import startup_profiler
+if Config.STARTUP_PROFILE:
+    startup_profiler.start()
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uvicorn
-import json
 import asyncio
+from contextlib import aclosing, asynccontextmanager
 import io
-import PyPDF2
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Form, HTTPException, Request
+from fastapi.requests import HTTPConnection
+from fastapi.responses import StreamingResponse
 
-from config import Config
 from agents.stt_agent import stt_agent
-from agents.orchestrator import AgentOrchestrator
+from agents.orchestrator import AgentOrchestrator, RESUME_OPENING_PROMPT
+from agents.model_router import ModelRouter
 from agents.turn_manager import TurnManager
+from agents.chunk_coalescer import ChunkCoalescer, resolve_framing, pack_message
+from agents import json_codec
+from agents.outbound_queue import OutboundQueue, SlowConsumerError
 from agents.report_agent import report_agent
+from chatbot import chat_service
+from agents.usage_ledger import usage_ledger
+from agents.admission import AdmissionController, AdmissionRejected, Priority
+from agents.guard_agent import build_guard
+from agents.response_cache import opening_cache
+from agents.speculator import Speculator
+from agents.trace_recorder import open_recorder
+from agents.warmup import Warmup, precompile_flows, exercise_turn_paths, open_async_groq_pool, open_sync_client_pool, open_gemini_pool
+
+startup_profiler.mark("imports")
+
+# Readiness for /ready; liveness stays on /
+warmup = Warmup(timeout=Config.WARMUP_TIMEOUT_SECS)
+
+def warmup_steps() -> dict:
+    async def templates():
+        precompile_flows()
+        exercise_turn_paths(orchestrator)
 
-app = FastAPI(title="Essence Agentic Critique API")
+    steps = {"templates": templates}
+    if Config.WARMUP_CONNECTIONS:
+        steps["groq_chat"] = lambda: open_async_groq_pool(orchestrator.thinking_agent.llm)
+        steps["groq_stt"] = lambda: open_sync_client_pool(stt_agent.client)
+        if orchestrator.turn_evaluator:
+            steps["groq_scoring"] = lambda: open_sync_client_pool(orchestrator.turn_evaluator.client)
+        if report_agent.client:
+            steps["gemini"] = lambda: open_gemini_pool(report_agent.client, report_agent.model_name)
+    return steps
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # In the background, so liveness answers while the worker warms up
+    warmup_task = asyncio.create_task(warmup.run(warmup_steps())) if Config.WARMUP_ENABLED else None
+    if warmup_task is None:
+        warmup.skip()
+    yield
+    warmup.drain()
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+        await asyncio.wait({warmup_task})
+
+app = FastAPI(title="Essence Agentic Critique API", default_response_class=json_codec.FastJSONResponse, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -31,13 +79,70 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Main")
 
+# Admission control per upstream provider (None when disabled)
+def admission_controller(name: str, rate_per_sec: float, burst: float) -> Optional[AdmissionController]:
+    if not Config.ADMISSION_CONTROL:
+        return None
+    return AdmissionController(
+        name, rate_per_sec, burst,
+        tenant_share=Config.ADMISSION_TENANT_SHARE,
+        max_queue=Config.ADMISSION_MAX_QUEUE,
+        max_wait={
+            Priority.LIVE: Config.ADMISSION_MAX_WAIT_LIVE_SECS,
+            Priority.REPORT: Config.ADMISSION_MAX_WAIT_REPORT_SECS,
+            Priority.BACKGROUND: Config.ADMISSION_MAX_WAIT_BACKGROUND_SECS,
+        },
+    )
+
+groq_admission = admission_controller("groq", Config.GROQ_RATE_PER_SEC, Config.GROQ_BURST)
+gemini_admission = admission_controller("gemini", Config.GEMINI_RATE_PER_SEC, Config.GEMINI_BURST)
+
+def tenant_of(connection: HTTPConnection) -> str:
+    """Rate-limit key: explicit tenant header / query param, else the client address."""
+    return (connection.headers.get("x-tenant-id") or connection.query_params.get("tenant")
+            or (connection.client.host if connection.client else "default"))
+
+async def admit_gemini(http_request: Request, priority: Priority = Priority.REPORT):
+    """Reports wait behind live chat; when shed the client is told when to retry."""
+    if gemini_admission is None:
+        return
+    try:
+        await gemini_admission.acquire(priority, tenant_of(http_request))
+    except AdmissionRejected as e:
+        logger.warning(f"{priority.name} request shed: {e}")
+        raise HTTPException(status_code=503, detail="The service is busy, please retry shortly.",
+                            headers={"Retry-After": str(int(e.retry_after + 0.5))})
+
+# Screens transcripts and uploaded resumes before they reach a prompt
+guard = build_guard(Config.GUARD_MODE, Config.GROQ_API_KEY, Config.GUARD_MODEL, Config.GUARD_THRESHOLD)
+
 # Global dependencies
 orchestrator = AgentOrchestrator(
     groq_api_key=Config.GROQ_API_KEY,
     thinking_model=Config.THINKING_MODEL,
-    memory_model=Config.MEMORY_MODEL
+    memory_model=Config.MEMORY_MODEL,
+    incremental_evaluation=Config.INCREMENTAL_EVALUATION,
+    fast_path=Config.FAST_PATH_ENABLED,
+    fast_path_bridge=Config.FAST_PATH_BRIDGE,
+    admission=groq_admission,
+    guard=guard,
+    opening_cache=opening_cache if Config.OPENING_CACHE_ENABLED else None,
+    speculator=Speculator(max_chars=Config.SPECULATIVE_MAX_CHARS) if Config.SPECULATIVE_PREFETCH else None,
+    router=ModelRouter(
+        default_model=Config.THINKING_MODEL,
+        vision_model=Config.VISION_MODEL,
+        ack_model=Config.ACK_MODEL,
+        evaluation_model=Config.EVALUATION_MODEL,
+        enabled=Config.ROUTING_ENABLED
+    )
 )
 
+# Outbound queue per live connection (session_id -> queue), for metrics
+active_connections: Dict[str, OutboundQueue] = {}
+
+startup_profiler.mark("app setup")
+startup_profiler.finish()
+
 # We might want one TurnManager per connection, or global?
 # "There is exactly ONE Active Turn Context object." - Usually implies per-session.
 # For a simple local-user scenario, global is fine, but per-websocket is safer.
@@ -48,9 +153,209 @@ orchestrator = AgentOrchestrator(
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     
-    turn_manager = TurnManager(orchestrator, stt_agent)
+    # Delta state updates: server-wide default or per-connection ?state_deltas=true
+    state_deltas = websocket.query_params.get("state_deltas", str(Config.STATE_DELTAS)).lower() == "true"
+    turn_manager = TurnManager(orchestrator, stt_agent, state_deltas=state_deltas, tenant=tenant_of(websocket))
     logger.info("WebSocket connected. TurnManager initialized.")
-    audio_buffer = bytearray()
+    # Single capped buffer for the turn's audio, owned by the TurnManager
+    audio_buffer = turn_manager.audio
+
+    # Outbound framing: JSON text frames, or JSON/msgpack binary frames when negotiated (?framing=...)
+    framing = resolve_framing(websocket.query_params.get("framing", Config.WS_FRAMING))
+
+    recorder = open_recorder(Config.TRACE_DIR, turn_manager.session_id, {
+        "query": websocket.url.query, "framing": framing, "state_deltas": state_deltas
+    }) if Config.TRACE_RECORDING else None
+
+    async def send(message: dict):
+        if recorder:
+            recorder.outbound(message)
+        if framing == "msgpack":
+            await websocket.send_bytes(pack_message(message))
+        else:
+            await json_codec.send_json(websocket, message, binary=(framing == "json_binary"))
+
+    # Token chunks from the LLM are batched into frames; other messages pass through in order
+    coalescer = ChunkCoalescer(
+        min_interval=Config.CHUNK_FLUSH_MIN_MS / 1000,
+        max_interval=Config.CHUNK_FLUSH_MAX_MS / 1000,
+        max_bytes=Config.CHUNK_FLUSH_BYTES
+    )
+
+    def outbound(messages):
+        return coalescer.stream(messages) if Config.CHUNK_COALESCING else messages
+
+    # Bounded send queue drained by its own task: a slow client can't stall the LLM stream
+    outbound_queue = OutboundQueue(
+        send,
+        max_size=Config.WS_QUEUE_MAX_MESSAGES,
+        slow_consumer_timeout=Config.WS_SLOW_CONSUMER_TIMEOUT_SECS,
+        disconnect_slow=Config.WS_DISCONNECT_SLOW_CONSUMERS,
+        on_disconnect=lambda: websocket.close(code=1013)
+    ).start()
+    active_connections[turn_manager.session_id] = outbound_queue
+
+    # In-flight response stream (its own task, so a barge-in commit or cancel can interrupt it)
+    generation: Optional[asyncio.Task] = None
+    # JSON commands, processed one at a time by their own task; the receive loop never blocks on them
+    commands: asyncio.Queue = asyncio.Queue(maxsize=Config.WS_COMMAND_QUEUE_MAX)
+    # Audio received while a response streams is transcribed ahead of the commit
+    pretranscription = {"task": None, "length": 0}
+
+    async def forward(messages):
+        async with aclosing(outbound(messages)) as responses:
+            async for response in responses:
+                await outbound_queue.put(response)
+
+    async def respond(messages):
+        nonlocal generation
+        generation = asyncio.create_task(forward(messages))
+        try:
+            # asyncio.wait: an interrupted generation doesn't raise into the command processor
+            await asyncio.wait({generation})
+            if generation.cancelled():
+                logger.info("Response interrupted")
+                await outbound_queue.put({"type": "state_update", "payload": "ACTIVE" if turn_manager.context.active else "INACTIVE"})
+            elif generation.exception():
+                raise generation.exception()
+        finally:
+            generation = None
+
+    def interrupt_generation(force: bool = False):
+        """
+        Stops the in-flight LLM response: cooperatively first (run_flow closes the
+        upstream stream and records the partial turn), then by cancelling the task
+        so a stream waiting on the network stops immediately too. Quick input
+        updates run to completion unless `force` (disconnect).
+        """
+        if generation and not generation.done() and (force or turn_manager.is_responding):
+            turn_manager.cancel_response()
+            generation.cancel()
+
+    def pretranscribe():
+        """Transcribes the audio buffered so far while the LLM is still talking."""
+        task = pretranscription["task"]
+        if not Config.PRETRANSCRIBE_AUDIO or generation is None or (task and not task.done()):
+            return
+        if len(audio_buffer) - pretranscription["length"] < Config.PRETRANSCRIBE_MIN_BYTES:
+            return
+        snapshot = audio_buffer.snapshot()
+        pretranscription.update(task=asyncio.create_task(stt_agent.transcribe_bytes(snapshot, session_id=turn_manager.session_id)), length=len(snapshot))
+
+    def discard_pretranscription():
+        task = pretranscription["task"]
+        if task and not task.done():
+            task.cancel()
+        pretranscription.update(task=None, length=0)
+
+    def prefetch():
+        """The user is answering: draft the next turn now if it doesn't depend on the answer."""
+        if generation is None and not turn_manager.is_responding:
+            orchestrator.prefetch(turn_manager.session_id, turn_manager.tenant)
+
+    async def transcribe_buffered_audio() -> str:
+        audio_bytes = audio_buffer.take()
+
+        logger.info(f"🎧 Audio buffer size: {len(audio_bytes)} bytes")
+        if not audio_bytes:
+            discard_pretranscription()
+            return ""
+
+        # Reuse the pre-transcription when it covers exactly the audio being committed
+        task, covered = pretranscription["task"], pretranscription["length"]
+        if task and covered == len(audio_bytes):
+            pretranscription.update(task=None, length=0)
+            await asyncio.wait({task})
+            if not task.cancelled() and task.exception() is None and task.result():
+                logger.info("🎧 Using pre-transcribed audio")
+                return task.result()
+        else:
+            discard_pretranscription()
+        return await stt_agent.transcribe_bytes(audio_bytes, session_id=turn_manager.session_id)
+
+    async def handle_command(payload: dict):
+        event_type = payload.get("type")
+
+        if event_type == "text_input":
+            prefetch()
+            await respond(turn_manager.process_text_input(
+                payload.get("text", ""), 
+                source="text", 
+                mode=payload.get("mode", "append")
+            ))
+            
+        elif event_type == "image_input":
+            await turn_manager.handle_image_input(payload.get("image", ""), payload.get("source", "pasted"))
+            
+        elif event_type == "commit":
+            logger.info("🔔 Commit received, transcribing audio")
+
+            transcript = await transcribe_buffered_audio()
+            if transcript:
+                await respond(turn_manager.process_text_input(
+                    transcript,
+                    source="audio",
+                    mode="replace"
+                ))
+
+            # Then finalize the turn
+            await respond(turn_manager.handle_commit())
+
+        elif event_type == "cancel":
+            # Already interrupted by the reader; just report the resulting state below
+            pass
+                
+        elif event_type == "reset":
+             mode = payload.get("mode", "project")
+             resume_text = payload.get("resume_text", "")
+             focus_mode = payload.get("focus_mode", "general")
+             time_limit = payload.get("time_limit", 15)
+             
+             turn_manager.context.reset()
+             orchestrator.reset_conversation()
+             # After the reset: configuring the mode starts the session clock and picks the entry state
+             orchestrator.set_mode(mode, resume_text, focus_mode, time_limit)
+             if orchestrator.turn_evaluator:
+                 orchestrator.turn_evaluator.clear(turn_manager.session_id)
+             turn_manager.triggered_commands = {"screenshot": False}
+             audio_buffer.clear()
+             discard_pretranscription()
+             orchestrator.discard_prefetch(turn_manager.session_id)
+             state_message = turn_manager.state_message()
+             if state_message:
+                 await outbound_queue.put(state_message)
+             
+             if mode == "resume" and resume_text:
+                 # Silently start the AI response without showing a user bubble on the frontend
+                 turn_manager.context.active = True
+                 turn_manager.context.typed_text = RESUME_OPENING_PROMPT
+                 # Server-written prompt: exempt from the guard, unlike anything the user sends
+                 await respond(turn_manager.handle_commit(trusted=True))
+
+        elif event_type == "resync":
+            # Reconnecting / out-of-sync client: full state, then deltas from this version
+            await outbound_queue.put(turn_manager.state_message(full=True))
+            return
+
+        # Send updated context state/transcript back if needed (or TurnManager yields it?)
+        # TurnManager methods above didn't yield for input updates, strictly speaking.
+        # We might want to send an ack or update.
+        # Let's send a generic state update (skipped when nothing changed).
+        state_message = turn_manager.state_message()
+        if state_message:
+            await outbound_queue.put(state_message)
+
+    async def process_commands():
+        while True:
+            payload = await commands.get()
+            try:
+                await handle_command(payload)
+            except (SlowConsumerError, WebSocketDisconnect, RuntimeError):
+                raise
+            except Exception as e:
+                logger.error(f"Command {payload.get('type')} failed: {e}")
+
+    processor = asyncio.create_task(process_commands())
 
     try:
         while True:
@@ -62,83 +367,32 @@ async def websocket_endpoint(websocket: WebSocket):
             # Or we can check the message type if we use `receive()`.
             
             message = await websocket.receive()
+            if recorder:
+                recorder.inbound(message)
+            if message.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if processor.done():
+                # The command processor hit a fatal error (e.g. slow consumer); surface it here
+                processor.result()
             
             if "text" in message:
-                data = message["text"]
                 # Try to parse as JSON command
                 try:
-                    payload = json.loads(data)
-                    event_type = payload.get("type")
-                    
-                    if event_type == "text_input":
-                        async for response in turn_manager.process_text_input(
-                            payload.get("text", ""), 
-                            source="text", 
-                            mode=payload.get("mode", "append")
-                        ):
-                            await websocket.send_json(response)
-                        
-                    elif event_type == "image_input":
-                        await turn_manager.handle_image_input(payload.get("image", ""), payload.get("source", "pasted"))
-                        
-                    elif event_type == "commit":
-                        logger.info("🔔 Commit received, transcribing audio")
-
-                        audio_bytes = bytes(audio_buffer)
-                        audio_buffer.clear()
-
-                        logger.info(f"🎧 Audio buffer size: {len(audio_bytes)} bytes")
-
-                        if audio_bytes:
-                            transcript = await stt_agent.transcribe_bytes(audio_bytes)
-
-                            if transcript:
-                                async for response in turn_manager.process_text_input(
-                                    transcript,
-                                    source="audio",
-                                    mode="replace"
-                                ):
-                                    await websocket.send_json(response)
-
-                        # Then finalize the turn
-                        async for response in turn_manager.handle_commit():
-                            await websocket.send_json(response)
-
-                            
-                    elif event_type == "reset":
-                         mode = payload.get("mode", "project")
-                         resume_text = payload.get("resume_text", "")
-                         focus_mode = payload.get("focus_mode", "general")
-                         time_limit = payload.get("time_limit", 15)
-                         
-                         orchestrator.set_mode(mode, resume_text, focus_mode, time_limit)
-                         
-                         turn_manager.context.reset()
-                         orchestrator.reset_conversation()
-                         turn_manager.triggered_commands = {"screenshot": False}
-                         audio_buffer.clear()
-                         await websocket.send_json({"type": "state_update", "payload": turn_manager.get_context_snapshot()})
-                         
-                         if mode == "resume" and resume_text:
-                             # Silently start the AI response without showing a user bubble on the frontend
-                             turn_manager.context.active = True
-                             turn_manager.context.typed_text = "[System] Resume loaded. Please briefly introduce yourself and immediately ask the first interview question based on the resume."
-                             async for response in turn_manager.handle_commit():
-                                 await websocket.send_json(response)
-
-                    # Send updated context state/transcript back if needed (or TurnManager yields it?)
-                    # TurnManager methods above didn't yield for input updates, strictly speaking.
-                    # We might want to send an ack or update.
-                    # Let's send a generic state update.
-                    await websocket.send_json({"type": "state_update", "payload": turn_manager.get_context_snapshot()})
-                        
-                except json.JSONDecodeError:
+                    payload = json_codec.receive_json(message)
+                    # Barge-in: a new commit, an explicit cancel or a reset stops the response immediately
+                    if payload.get("type") in ("commit", "cancel", "reset"):
+                        interrupt_generation()
+                    await commands.put(payload)
+                except json_codec.JSONDecodeError:
                     logger.warning("Received non-JSON text message")
 
             if "bytes" in message:
+                # Audio is buffered even while a response is streaming
                 audio_data = message["bytes"]
                 audio_buffer.extend(audio_data)
                 turn_manager.start_turn()
+                pretranscribe()
+                prefetch()
             # if "bytes" in message:
             #     audio_data = message["bytes"]
             #     # Process audio chunk
@@ -167,6 +421,8 @@ async def websocket_endpoint(websocket: WebSocket):
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
+    except SlowConsumerError:
+        logger.warning("WebSocket closed: slow consumer")
     except RuntimeError as e:
         if "disconnect message" in str(e) or "websocket.close" in str(e):
              logger.info("WebSocket connection closed")
@@ -179,11 +435,82 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.close()
         except:
             pass
+    finally:
+        # First, before any await: nothing more is exchanged with the client
+        if recorder:
+            recorder.close()
+        # Disconnected: abort the upstream generation rather than letting it run to completion
+        in_flight = generation
+        interrupt_generation(force=True)
+        discard_pretranscription()
+        processor.cancel()
+        try:
+            await asyncio.wait({processor})
+            if in_flight:
+                await asyncio.wait({in_flight})
+        finally:
+            # Only once nothing can still draft or take a turn (a turn finishing after the
+            # disconnect settles its draft), and even when the handler itself is cancelled
+            orchestrator.discard_prefetch(turn_manager.session_id)
+            if orchestrator.turn_evaluator:
+                orchestrator.turn_evaluator.close(turn_manager.session_id)
+        await outbound_queue.close()
+        active_connections.pop(turn_manager.session_id, None)
+        logger.info(f"Outbound stats: {outbound_queue.get_stats()}")
+        usage_ledger.log_session(turn_manager.session_id)
 
 @app.get("/")
 def root():
     return {"message": "Essence Multi-Agent Critique API is running!"}
 
+@app.get("/ready")
+def ready():
+    """Readiness for the load balancer: 503 until warm-up has finished, and again while draining."""
+    return json_codec.FastJSONResponse(warmup.snapshot(), status_code=200 if warmup.ready else 503)
+
+@app.get("/api/metrics/cancellations")
+def cancellation_metrics():
+    """Interrupted generations and the estimated output tokens they saved."""
+    return orchestrator.get_cancellation_stats()
+
+@app.get("/api/metrics/admission")
+def admission_metrics():
+    """Token availability, queue depth, wait times and shed counts per upstream provider."""
+    controllers = {"groq": groq_admission, "gemini": gemini_admission}
+    return {name: controller.get_stats() for name, controller in controllers.items() if controller}
+
+@app.get("/api/metrics/opening_cache")
+def opening_cache_metrics():
+    """Hits, misses and size of the resume opening-turn cache."""
+    return opening_cache.get_stats()
+
+@app.get("/api/metrics/speculation")
+def speculation_metrics():
+    """Next-turn drafts: hit rate, why misses were thrown away and estimated wasted tokens."""
+    return orchestrator.speculator.get_stats() if orchestrator.speculator else {"enabled": False}
+
+@app.get("/api/metrics/guard")
+def guard_metrics():
+    """Screened inputs, verdict cache hits and flagged counts."""
+    return guard.get_stats() if guard else {"enabled": False}
+
+@app.get("/api/usage")
+def usage_totals():
+    """Upstream tokens, audio seconds, latency and cost by endpoint, state and model."""
+    return usage_ledger.get_stats()
+
+@app.get("/api/usage/{session_id}")
+def session_usage(session_id: str):
+    usage = usage_ledger.session_usage(session_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail="No usage recorded for this session.")
+    return usage
+
+@app.get("/api/metrics/connections")
+def connection_metrics():
+    """Outbound queue depth and send lag for every live websocket."""
+    return {"connections": {session_id: queue.get_stats() for session_id, queue in active_connections.items()}}
+
 @app.post("/api/upload_resume")
 async def upload_resume(file: UploadFile = File(...)):
     print("File received")
@@ -192,6 +519,7 @@ async def upload_resume(file: UploadFile = File(...)):
         
     try:
         contents = await file.read()
+        import PyPDF2
         pdf_reader = PyPDF2.PdfReader(io.BytesIO(contents))
         extracted_text = ""
         for page in pdf_reader.pages:
@@ -202,12 +530,34 @@ async def upload_resume(file: UploadFile = File(...)):
         if len(extracted_text.strip()) < 50:
             logger.warning("PDF extraction yielded very little text. Likely image-based.")
             # For this context, return what we have or a note
+
+        if guard:
+            verdict = await guard.screen(extracted_text)
+            if verdict.flagged:
+                raise HTTPException(status_code=422, detail="The resume contains instructions aimed at the interviewer. Please upload a plain resume.")
             
         return {"parsed_text": extracted_text}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing PDF: {e}")
         raise HTTPException(status_code=500, detail="Failed to parse PDF.")
 
+class ChatRequest(BaseModel):
+    session_id: str
+    message: str
+
+@app.post("/api/chat")
+async def chat(request: ChatRequest, http_request: Request):
+    """Essence text chat: streams the reply as plain text, one history per session_id."""
+    await admit_gemini(http_request, Priority.LIVE)
+    return StreamingResponse(chat_service.stream(request.session_id, request.message), media_type="text/plain")
+
+@app.delete("/api/chat/{session_id}")
+def reset_chat(session_id: str):
+    chat_service.reset(session_id)
+    return {"status": "reset"}
+
 class ReportRequest(BaseModel):
     chat_history: List[Dict[str, Any]]
 
@@ -216,10 +566,13 @@ class InterviewReportRequest(BaseModel):
     resume_text: str
     interview_type: str
     duration_mins: int
+    # From state_update snapshots; enables aggregation of per-turn evaluations
+    session_id: Optional[str] = None
 
 @app.post("/report")
-async def generate_report(request: ReportRequest):
+async def generate_report(request: ReportRequest, http_request: Request):
     logger.info("Generating project report...")
+    await admit_gemini(http_request)
     
     # Transform frontend message format to backend format
     # Frontend sends: {sender: "user"|"bot", text: "...", ...}
@@ -236,8 +589,9 @@ async def generate_report(request: ReportRequest):
     return {"report": report}
 
 @app.post("/api/interview_report")
-async def generate_interview_report(request: InterviewReportRequest):
+async def generate_interview_report(request: InterviewReportRequest, http_request: Request):
     logger.info("Generating interview report...")
+    await admit_gemini(http_request)
     
     transformed_history = []
     for msg in request.chat_history:
@@ -247,12 +601,20 @@ async def generate_interview_report(request: InterviewReportRequest):
         })
     
     logger.info(f"Transformed {len(transformed_history)} messages for interview report generation")
-    report = await report_agent.generate_interview_report(
-        chat_history=transformed_history,
-        resume_text=request.resume_text,
-        interview_type=request.interview_type,
-        duration_mins=request.duration_mins
-    )
+    turn_records = None
+    if request.session_id and orchestrator.turn_evaluator:
+        turn_records = await orchestrator.turn_evaluator.get_records(request.session_id)
+
+    with usage_ledger.scope(session_id=request.session_id):
+        report = await report_agent.generate_interview_report(
+            chat_history=transformed_history,
+            resume_text=request.resume_text,
+            interview_type=request.interview_type,
+            duration_mins=request.duration_mins,
+            turn_records=turn_records
+        )
+    if request.session_id:
+        usage_ledger.log_session(request.session_id)
     return {"report": report}
 
 if __name__ == "__main__":
@@ -9,6 +9,7 @@ def test_adaptive_flow_new():
     # 1. Transition to EVALUATION
     user_input = "basically it"
     instruction = cm.get_state_instruction(user_input, False)
+    cm.apply_instruction(instruction)
     
     print(f"After '{user_input}': {cm.state}, Section: {cm.section_index}, Q_Index: {cm.question_in_section_index}")
     
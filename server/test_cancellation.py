@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import aclosing
+from agents.orchestrator import AgentOrchestrator, INTERRUPTED_MARKER
+from agents.conversation_manager import ConversationState
+
+class StreamingThinkingAgent:
+    """Stands in for the Groq stream; records whether it was closed early."""
+    def __init__(self):
+        self.closed = False
+        self.produced = 0
+
+    async def stream_critique(self, *args, **kwargs):
+        try:
+            for i in range(500):
+                await asyncio.sleep(0.002)
+                self.produced += 1
+                yield f"word{i} "
+        finally:
+            self.closed = True
+
+async def no_memory_update(state_snapshot):
+    return None
+
+def make_orchestrator():
+    orchestrator = AgentOrchestrator(groq_api_key="test", thinking_model="scout", memory_model="small")
+    orchestrator.thinking_agent = StreamingThinkingAgent()
+    orchestrator.memory_agent.update_memory = no_memory_update
+    orchestrator.set_mode("project", time_limit_mins=15)
+    cm = orchestrator.conversation_manager
+    cm.state = ConversationState.EVALUATION
+    cm.section_index = 0
+    return orchestrator
+
+async def cooperative_cancel(orchestrator):
+    cancel_event = asyncio.Event()
+    received = []
+    async for chunk in orchestrator.run_flow("It matches students to internships.", [], cancel_event=cancel_event):
+        received.append(chunk)
+        if len(received) == 5:
+            cancel_event.set()
+    return received
+
+def test_cooperative_cancel_closes_stream_and_keeps_state():
+    orchestrator = make_orchestrator()
+    cm = orchestrator.conversation_manager
+    received = asyncio.run(cooperative_cancel(orchestrator))
+
+    assert len(received) == 5
+    assert orchestrator.thinking_agent.closed and orchestrator.thinking_agent.produced == 5
+    # Partial answer recorded as delivered, but the state machine did not advance
+    assert cm.history[-1].content == "".join(received).rstrip() + " " + INTERRUPTED_MARKER
+    assert cm.follow_up_count == 0 and cm.question_in_section_index == 0
+    stats = orchestrator.get_cancellation_stats()
+    assert stats["cancelled_turns"] == 1 and stats["est_tokens_saved"] > 0
+
+async def hard_cancel(orchestrator):
+    async def consume():
+        async with aclosing(orchestrator.run_flow("It matches students to internships.", [])) as stream:
+            async for _ in stream:
+                pass
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.wait({task})
+
+def test_task_cancel_records_partial_turn():
+    orchestrator = make_orchestrator()
+    asyncio.run(hard_cancel(orchestrator))
+
+    assert orchestrator.thinking_agent.closed
+    assert orchestrator.thinking_agent.produced < 500
+    assert orchestrator.conversation_manager.history[-1].content.endswith(INTERRUPTED_MARKER)
+    assert orchestrator.get_cancellation_stats()["cancelled_turns"] == 1
+
+    print("\nALL CANCELLATION TESTS PASSED")
+
+if __name__ == "__main__":
+    test_cooperative_cancel_closes_stream_and_keeps_state()
+    test_task_cancel_records_partial_turn()
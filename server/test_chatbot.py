@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+from chatbot import ChatService
+
+class FakeChat:
+    """Mimics google.genai's AsyncChat: history is recorded once the stream finishes."""
+    def __init__(self, client, history):
+        self.client = client
+        self.history = history
+
+    async def send_message_stream(self, message):
+        self.client.sent.append((len(self.history), message))
+
+        async def chunks():
+            for word in ("Tell ", "me ", "more."):
+                await asyncio.sleep(0.001)
+                yield SimpleNamespace(text=word, usage_metadata=None)
+            yield SimpleNamespace(text="", usage_metadata=SimpleNamespace(prompt_token_count=50, candidates_token_count=3))
+            self.history = self.history + [{"role": "user", "text": message}, {"role": "model", "text": "Tell me more."}]
+        return chunks()
+
+    def get_history(self, curated=False):
+        return self.history
+
+class FakeGenaiClient:
+    def __init__(self):
+        self.sent = []
+        self.aio = SimpleNamespace(chats=SimpleNamespace(create=self.create))
+
+    def create(self, model, config=None, history=None):
+        assert isinstance(history, list)
+        return FakeChat(self, history)
+
+def make_service(max_turns=3):
+    service = ChatService(api_key="test", model_name="gemini-test", max_turns=max_turns)
+    service.client = FakeGenaiClient()
+    service._config = object()
+    return service
+
+def test_sessions_are_isolated_and_bounded():
+    service = make_service(max_turns=3)
+
+    async def conversation():
+        for i in range(5):
+            assert await service.reply("alice", f"message {i}") == "Tell me more."
+        await service.reply("bob", "hello")
+    asyncio.run(conversation())
+
+    alice = service.sessions["alice"].history
+    assert len(alice) == 6 and alice[0] == {"role": "user", "text": "message 2"}
+    assert len(service.sessions["bob"].history) == 2
+    # History is sent as structured turns, never re-joined into a prompt string
+    assert service.client.sent[-1] == (0, "hello")
+    assert max(size for size, _ in service.client.sent) == 6
+
+def test_same_session_messages_are_serialised():
+    service = make_service()
+
+    async def burst():
+        return await asyncio.gather(*(service.reply("alice", f"m{i}") for i in range(3)))
+    asyncio.run(burst())
+
+    # Each message saw the previous exchange, none raced on a stale history
+    assert [size for size, _ in service.client.sent] == [0, 2, 4]
+
+def test_cancelled_reply_leaves_history_untouched():
+    service = make_service()
+
+    async def cut_short():
+        await service.reply("alice", "first")
+        stream = service.stream("alice", "second")
+        await stream.__anext__()
+        await stream.aclose()
+    asyncio.run(cut_short())
+
+    assert [turn["text"] for turn in service.sessions["alice"].history] == ["first", "Tell me more."]
+    assert not service.sessions["alice"].lock.locked()
+
+    print("\nALL CHATBOT TESTS PASSED")
+
+if __name__ == "__main__":
+    test_sessions_are_isolated_and_bounded()
+    test_same_session_messages_are_serialised()
+    test_cancelled_reply_leaves_history_untouched()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from agents.chunk_coalescer import ChunkCoalescer, resolve_framing
+
+async def fake_turn(tokens, gap):
+    yield {"type": "state_update", "payload": "RESPONDING"}
+    yield {"type": "commit_confirmation", "payload": {"text": "hi", "images": []}}
+    for token in tokens:
+        await asyncio.sleep(gap)
+        yield {"type": "response_chunk", "payload": token}
+    yield {"type": "state_update", "payload": "INACTIVE"}
+
+async def collect(coalescer, stream):
+    received = []
+    started = time.perf_counter()
+    async for message in coalescer.stream(stream):
+        received.append((time.perf_counter() - started, message))
+    return received
+
+def test_batches_tokens_and_keeps_order():
+    tokens = [f"tok{i} " for i in range(200)]
+    coalescer = ChunkCoalescer(min_interval=0.01, max_interval=0.03)
+    received = asyncio.run(collect(coalescer, fake_turn(tokens, 0.001)))
+    types = [m["type"] for _, m in received]
+
+    assert types[:2] == ["state_update", "commit_confirmation"]
+    assert types[-1] == "state_update"
+    chunks = [m["payload"] for _, m in received if m["type"] == "response_chunk"]
+    assert "".join(chunks) == "".join(tokens)
+    # First token on its own, then far fewer frames than tokens
+    assert chunks[0] == "tok0 "
+    assert len(chunks) < len(tokens) / 4
+    print(coalescer.get_stats())
+
+def test_byte_threshold_flushes_early():
+    tokens = ["x" * 100] * 20
+    coalescer = ChunkCoalescer(min_interval=5.0, max_interval=5.0, max_bytes=300)
+    received = asyncio.run(collect(coalescer, fake_turn(tokens, 0)))
+    chunks = [m["payload"] for _, m in received if m["type"] == "response_chunk"]
+    assert "".join(chunks) == "".join(tokens)
+    assert all(len(c) <= 300 for c in chunks)
+    # Never waited for the (huge) interval
+    assert received[-1][0] < 1.0
+
+def test_slow_tokens_are_not_held_back():
+    coalescer = ChunkCoalescer(min_interval=0.01, max_interval=0.02)
+    received = asyncio.run(collect(coalescer, fake_turn(["a", "b", "c"], 0.1)))
+    chunks = [(t, m["payload"]) for t, m in received if m["type"] == "response_chunk"]
+    assert [c for _, c in chunks] == ["a", "b", "c"]
+    # Each trickling token is flushed within the max interval of its arrival
+    for i, (t, _) in enumerate(chunks):
+        assert t < 0.1 * (i + 1) + 0.08
+
+def test_framing_fallback():
+    assert resolve_framing("json") == "json"
+    assert resolve_framing("bogus") == "json"
+    assert resolve_framing("msgpack") in ("json", "msgpack")
+
+    print("\nALL CHUNK COALESCER TESTS PASSED")
+
+if __name__ == "__main__":
+    test_batches_tokens_and_keeps_order()
+    test_byte_threshold_flushes_early()
+    test_slow_tokens_are_not_held_back()
+    test_framing_fallback()
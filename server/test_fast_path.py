@@ -0,0 +1,52 @@
+import asyncio
+from agents.orchestrator import AgentOrchestrator
+from agents.conversation_manager import ConversationState, EVALUATION_QUESTIONS, SCREENSHOT_PROMPT
+
+class NoLLMThinkingAgent:
+    """Fails the test if the fast path ever reaches the model."""
+    async def stream_critique(self, *args, **kwargs):
+        raise AssertionError("LLM should not be called for a templated turn")
+        yield
+
+async def no_memory_update(state_snapshot):
+    return None
+
+def make_orchestrator():
+    orchestrator = AgentOrchestrator(groq_api_key="test", thinking_model="scout", memory_model="small")
+    orchestrator.thinking_agent = NoLLMThinkingAgent()
+    orchestrator.memory_agent.update_memory = no_memory_update
+    return orchestrator
+
+async def collect(orchestrator, transcript):
+    return "".join([chunk async for chunk in orchestrator.run_flow(transcript, [])])
+
+def test_exact_core_question_is_templated():
+    orchestrator = make_orchestrator()
+    orchestrator.set_mode("project", time_limit_mins=5)  # rush mode: no follow-ups
+    cm = orchestrator.conversation_manager
+    cm.state = ConversationState.EVALUATION
+    cm.section_index = 0
+
+    response = asyncio.run(collect(orchestrator, "It helps students find internships."))
+    assert response == EVALUATION_QUESTIONS[0]["questions"][0]
+    # check_state_transition still advanced to the next core question
+    assert cm.question_in_section_index == 1
+    assert cm.get_progress_data()["micro_section_progress"] == 50.0
+    assert orchestrator.router.get_stats()["template"]["turns"] == 1
+
+def test_screenshot_prompt_is_templated():
+    orchestrator = make_orchestrator()
+    orchestrator.set_mode("project", time_limit_mins=5)
+    cm = orchestrator.conversation_manager
+    cm.state = ConversationState.EVALUATION
+    cm.section_index = 1  # UI & User Experience: screenshots relevant
+
+    response = asyncio.run(collect(orchestrator, "The dashboard shows every application."))
+    assert response == SCREENSHOT_PROMPT
+    assert cm.last_ai_question_was_screenshot_prompt
+
+    print("\nALL FAST PATH TESTS PASSED")
+
+if __name__ == "__main__":
+    test_exact_core_question_is_templated()
+    test_screenshot_prompt_is_templated()
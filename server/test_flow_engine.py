@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from agents.flow_engine import CompiledFlow, FlowEngine, FlowDefinitionError, flow_engine
+from agents.resume_manager import ResumeConversationManager, ResumeConversationState
+
+# A new interview type, defined purely as data
+SYSTEM_DESIGN_FLOW = {
+    "name": "system_design",
+    "kind": "state_walk",
+    "states": ["REQUIREMENTS", "HIGH_LEVEL", "DEEP_DIVE", "COMPLETED"],
+    "final_state": "COMPLETED",
+    "trigger_transitions": {"*": {"transition": "COMPLETED"}},
+    "time_budget": {"minutes_per_question": 3, "min_total_questions": 3, "budgeted_states": 3},
+    "base_prompt": ["You are a system design interviewer.", "Candidate background: {resume_text}"],
+    "prompts": {
+        "REQUIREMENTS": ["Clarify the requirements."],
+        "HIGH_LEVEL": ["Ask for a high-level design."],
+        "DEEP_DIVE": ["Pick one component and go deep."],
+        "COMPLETED": ["Wrap up."]
+    },
+    "routes": {"general": ["REQUIREMENTS", "HIGH_LEVEL", "DEEP_DIVE"], "deep": ["DEEP_DIVE"]},
+    "default_route": "general"
+}
+
+def test_compiled_transitions():
+    flow = CompiledFlow(SYSTEM_DESIGN_FLOW)
+    State = flow.State
+    assert flow.entry_state("general") == State.REQUIREMENTS
+    assert flow.next_state("general", State.REQUIREMENTS) == State.HIGH_LEVEL
+    assert flow.next_state("general", State.DEEP_DIVE) == State.COMPLETED
+    # Unknown route falls back to the default; states outside a route end the interview
+    assert flow.resolve_route("nonsense") == "general"
+    assert flow.next_state("deep", State.HIGH_LEVEL) == State.COMPLETED
+    assert flow.trigger_transition(State.HIGH_LEVEL, {"transition"}) == State.COMPLETED
+    assert flow.trigger_transition(State.COMPLETED, {"transition"}) is None
+
+def test_invalid_definition_rejected():
+    broken = dict(SYSTEM_DESIGN_FLOW, routes={"general": ["REQUIREMENTS", "MISSING"]})
+    try:
+        CompiledFlow(broken)
+        assert False, "unknown state should be rejected"
+    except FlowDefinitionError:
+        pass
+
+def test_new_interview_type_runs_on_resume_manager():
+    with tempfile.TemporaryDirectory() as flows_dir:
+        with open(os.path.join(flows_dir, "system_design.json"), "w") as f:
+            json.dump(SYSTEM_DESIGN_FLOW, f)
+        flow = FlowEngine(flows_dir).get("system_design")
+
+    manager = ResumeConversationManager(flow)
+    manager.setup_interview("10 years backend", "general", 9)
+    assert manager.max_questions_per_state == 1
+
+    prompt = manager.get_state_instruction("ok", False).prompt
+    assert "10 years backend" in prompt and "Clarify the requirements." in prompt
+    manager.check_state_transition("ok", "question")
+    assert manager.state.name == "HIGH_LEVEL"
+    manager.apply_instruction(manager.get_state_instruction("that's all", False))
+    assert manager.state == flow.final_state
+
+def test_shipped_flows():
+    assert {"project_evaluation", "resume_interview"} <= set(flow_engine.flows)
+
+    manager = ResumeConversationManager()
+    manager.setup_interview("resume", "skills", 15)
+    assert manager.state == ResumeConversationState.SKILLS
+    for _ in range(manager.max_questions_per_state):
+        manager.check_state_transition("answer", "question")
+    assert manager.state == ResumeConversationState.COMPLETED
+
+    print("\nALL FLOW ENGINE TESTS PASSED")
+
+if __name__ == "__main__":
+    test_compiled_transitions()
+    test_invalid_definition_rejected()
+    test_new_interview_type_runs_on_resume_manager()
+    test_shipped_flows()
@@ -0,0 +1,33 @@
+from agents import json_codec
+from agents.chunk_coalescer import resolve_framing
+
+def test_round_trip():
+    message = {"type": "response_chunk", "payload": "naïve — “quoted” 🚀"}
+    encoded = json_codec.dumps(message)
+    assert isinstance(encoded, bytes)
+    assert json_codec.loads(encoded) == message
+    assert json_codec.loads(encoded.decode("utf-8")) == message
+    # Raw websocket messages: text or binary frames
+    assert json_codec.receive_json({"type": "websocket.receive", "text": '{"type": "commit"}'}) == {"type": "commit"}
+    assert json_codec.receive_json({"type": "websocket.receive", "bytes": b'{"type": "reset"}'}) == {"type": "reset"}
+
+def test_decode_errors_are_stdlib_compatible():
+    import json
+    try:
+        json_codec.loads("{not json")
+        assert False, "should fail"
+    except json.JSONDecodeError:
+        pass
+
+def test_response_class():
+    response = json_codec.FastJSONResponse({"report": {"score": 7, 1: "non-str key"}})
+    assert json_codec.loads(response.body) == {"report": {"score": 7, "1": "non-str key"}}
+    assert response.media_type == "application/json"
+    assert resolve_framing("json_binary") == "json_binary"
+
+    print("\nALL JSON CODEC TESTS PASSED")
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_decode_errors_are_stdlib_compatible()
+    test_response_class()
@@ -0,0 +1,44 @@
+from agents.model_router import ModelRouter
+
+def make_router(enabled=True):
+    return ModelRouter(
+        default_model="scout",
+        vision_model="scout",
+        ack_model="llama-3.1-8b-instant",
+        evaluation_model="llama-3.3-70b-versatile",
+        enabled=enabled
+    )
+
+def test_routing_rules():
+    router = make_router()
+
+    ack = router.route("project", "PASSIVE_LISTENING", has_image=False)
+    assert ack.model == "llama-3.1-8b-instant"
+    assert ack.max_tokens == 60
+
+    # Images always need the vision model, even while listening
+    assert router.route("project", "PASSIVE_LISTENING", has_image=True).model == "scout"
+
+    follow_up = router.route("project", "EVALUATION", has_image=False)
+    assert follow_up.model == "llama-3.3-70b-versatile"
+    assert follow_up.expected_output == "question"
+
+    assert router.route("resume", "COMPLETED", has_image=False).expected_output == "summary"
+
+def test_disabled_router_and_stats():
+    router = make_router(enabled=False)
+    decision = router.route("project", "PASSIVE_LISTENING", has_image=False)
+    assert decision.model == "scout"
+    assert decision.max_tokens is None
+
+    router.mark_first_token(decision)
+    router.record(decision, "project", "PASSIVE_LISTENING", response_chars=8)
+    stats = router.get_stats()
+    print(f"Router stats: {stats}")
+    assert stats["scout"]["turns"] == 1
+
+    print("\nALL MODEL ROUTER TESTS PASSED")
+
+if __name__ == "__main__":
+    test_routing_rules()
+    test_disabled_router_and_stats()
@@ -0,0 +1,115 @@
+import asyncio
+from agents.outbound_queue import OutboundQueue, SlowConsumerError, merge_state_deltas
+
+class SlowClient:
+    def __init__(self, delay):
+        self.delay = delay
+        self.received = []
+
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+async def run_slow_client():
+    client = SlowClient(0.005)
+    queue = OutboundQueue(client.send, max_size=8).start()
+
+    await queue.put({"type": "state_update", "payload": "RESPONDING"})
+    for i in range(200):
+        await queue.put({"type": "response_chunk", "payload": f"{i} "})
+        if i % 20 == 0:
+            await queue.put({"type": "transcript_update", "payload": f"draft {i}"})
+    await queue.put({"type": "state_update", "payload": "INACTIVE"})
+    await queue.join()
+    await asyncio.sleep(0.02)
+    await queue.close()
+    return client.received, queue.get_stats()
+
+def test_lossless_chunks_latest_state():
+    received, stats = asyncio.run(run_slow_client())
+    text = "".join(m["payload"] for m in received if m["type"] == "response_chunk")
+    assert text == "".join(f"{i} " for i in range(200))
+    # Fewer frames than chunks: the backlog was merged, not dropped
+    assert len(received) < 200 and stats["coalesced"] > 0
+    assert received[-1] == {"type": "state_update", "payload": "INACTIVE"}
+    transcripts = [m for m in received if m["type"] == "transcript_update"]
+    assert transcripts[-1]["payload"] == "draft 180"
+    assert stats["max_queue_depth"] <= 8
+    print(stats)
+
+def test_delta_merge():
+    older = {"type": "state_delta", "version": 3, "base_version": 2, "set": {"active": True}, "append": {"typed_text": "hel"}}
+    newer = {"type": "state_delta", "version": 4, "base_version": 3, "append": {"typed_text": "lo"}, "set": {"section": "UI"}}
+    merged = merge_state_deltas(older, newer)
+    assert merged == {"type": "state_delta", "version": 4, "base_version": 2,
+                      "set": {"active": True, "section": "UI"}, "append": {"typed_text": "hello"}}
+
+async def run_status_after_snapshot():
+    client = SlowClient(0.01)
+    queue = OutboundQueue(client.send, max_size=8).start()
+    await queue.put({"type": "commit_confirmation", "payload": {"text": "hi"}})  # occupies the writer
+    await queue.put({"type": "state_update", "version": 5, "payload": {"active": False, "section": "UI"}})
+    await queue.put({"type": "state_update", "payload": "RESPONDING"})
+    await queue.put({"type": "state_update", "payload": "INACTIVE"})
+    await queue.join()
+    await asyncio.sleep(0.02)
+    await queue.close()
+    return client.received
+
+def test_status_never_replaces_snapshot():
+    received = asyncio.run(run_status_after_snapshot())
+    # The resync snapshot survives; only the older status is superseded
+    assert received[1] == {"type": "state_update", "version": 5, "payload": {"active": False, "section": "UI"}}
+    assert received[2:] == [{"type": "state_update", "payload": "INACTIVE"}]
+
+async def run_delta_around_snapshot():
+    client = SlowClient(0.01)
+    queue = OutboundQueue(client.send, max_size=8).start()
+    await queue.put({"type": "commit_confirmation", "payload": {"text": "hi"}})  # occupies the writer
+    await queue.put({"type": "state_delta", "version": 2, "base_version": 1, "append": {"transcript": "a"}})
+    await queue.put({"type": "state_update", "version": 3, "payload": {"transcript": "ab"}})
+    await queue.put({"type": "state_delta", "version": 4, "base_version": 3, "append": {"transcript": "c"}})
+    await queue.join()
+    await asyncio.sleep(0.02)
+    await queue.close()
+    return client.received
+
+def test_delta_never_merges_across_snapshot():
+    received = asyncio.run(run_delta_around_snapshot())
+    # The snapshot covers the older delta; the new one still applies on top of the snapshot
+    assert received[1:] == [
+        {"type": "state_update", "version": 3, "payload": {"transcript": "ab"}},
+        {"type": "state_delta", "version": 4, "base_version": 3, "append": {"transcript": "c"}},
+    ]
+
+async def run_stuck_client():
+    closed = []
+
+    async def never_returns(message):
+        await asyncio.sleep(3600)
+
+    async def on_disconnect():
+        closed.append(True)
+
+    queue = OutboundQueue(never_returns, max_size=2, slow_consumer_timeout=0.05, disconnect_slow=True, on_disconnect=on_disconnect).start()
+    try:
+        for i in range(10):
+            await queue.put({"type": "commit_confirmation", "payload": {"text": str(i)}})
+        raised = False
+    except SlowConsumerError:
+        raised = True
+    await queue.close()
+    return raised, closed
+
+def test_slow_consumer_disconnect():
+    raised, closed = asyncio.run(run_stuck_client())
+    assert raised and closed == [True]
+
+    print("\nALL OUTBOUND QUEUE TESTS PASSED")
+
+if __name__ == "__main__":
+    test_lossless_chunks_latest_state()
+    test_delta_merge()
+    test_status_never_replaces_snapshot()
+    test_delta_never_merges_across_snapshot()
+    test_slow_consumer_disconnect()
@@ -0,0 +1,37 @@
+from agents.phrase_matcher import PhraseMatcher, trigger_matcher
+from agents.conversation_manager import ConversationManager, ConversationState
+from agents.resume_manager import ResumeConversationManager, ResumeConversationState
+
+def test_word_boundaries():
+    matcher = PhraseMatcher({"screenshot": ["ui", "screen"], "transition": ["that's it"]})
+    assert matcher.scan("I had to build it quickly") == set()
+    assert matcher.scan("The UI has a login screen") == {"screenshot"}
+    # Curly apostrophes from mobile keyboards still match
+    assert matcher.scan("That’s it, and the UI is done") == {"screenshot", "transition"}
+    assert not matcher.contains("screenshots", "screenshot")
+
+def test_shared_by_both_state_machines():
+    cm = ConversationManager()
+    cm.apply_instruction(cm.get_state_instruction("I built this quickly, that's all", False))
+    assert cm.state == ConversationState.EVALUATION
+
+    cm.section_index = 1  # UI section: screenshots relevant
+    assert not cm.should_ask_for_screenshot("we built it quickly")
+    assert cm.should_ask_for_screenshot("the dashboard displays results")
+
+    # The resume interview declares no trigger transitions: asking to stop does not end it
+    rm = ResumeConversationManager()
+    rm.setup_interview("resume", "general", 15)
+    rm.apply_instruction(rm.get_state_instruction("Sorry, can we wrap up and end the interview now?", False))
+    assert rm.state == ResumeConversationState.INITIAL
+
+def test_long_transcript_single_pass():
+    transcript = "we built a quick prototype " * 5000 + "and here is the dashboard"
+    assert trigger_matcher.scan(transcript) == {"screenshot"}
+
+    print("\nALL PHRASE MATCHER TESTS PASSED")
+
+if __name__ == "__main__":
+    test_word_boundaries()
+    test_shared_by_both_state_machines()
+    test_long_transcript_single_pass()
@@ -0,0 +1,44 @@
+from agents.question_matcher import QuestionMatcher, content_tokens
+from agents.conversation_manager import ConversationManager, ConversationState, EVALUATION_QUESTIONS
+from benchmarks.bench_question_matcher import evaluate, load_corpus
+
+def test_content_tokens():
+    assert content_tokens("What problem does this project solve?") == content_tokens("what PROBLEM does the project solves")
+    assert "the" not in content_tokens("Walk me through the application")
+
+def test_paraphrase_advances_progress():
+    cm = ConversationManager()
+    cm.state = ConversationState.EVALUATION
+    cm.section_index = 0
+
+    # Slight paraphrase of the core question with a preface
+    cm.check_state_transition("answer", "Thanks. So what problem is this project solving, and who is it for?")
+    assert cm.question_in_section_index == 1
+    assert cm.follow_up_count == 0
+
+    # A follow-up that shares some words is not the core question
+    cm.check_state_transition("answer", "Which of those features took the longest to build?")
+    assert cm.question_in_section_index == 1
+    assert cm.follow_up_count == 1
+
+def test_near_topic_follow_up_is_not_the_core_question():
+    matcher = QuestionMatcher([EVALUATION_QUESTIONS[0]["questions"][0]])
+    core = EVALUATION_QUESTIONS[0]["questions"][0]
+    # Every content word of the core question, but a narrower question
+    assert not matcher.matches(core, "What specific problem does the project solve for them?")
+    assert matcher.matches(core, "Let's start with the basics: what problem does your project solve, and who is it meant for?")
+
+def test_corpus_accuracy():
+    questions = [q for s_info in EVALUATION_QUESTIONS for q in s_info["questions"]]
+    stats = evaluate(load_corpus(), QuestionMatcher(questions).matches)
+    print(f"Corpus stats: {stats}")
+    assert stats["accuracy"] >= 0.9
+    assert stats["false_positives"] == 0
+
+    print("\nALL QUESTION MATCHER TESTS PASSED")
+
+if __name__ == "__main__":
+    test_content_tokens()
+    test_paraphrase_advances_progress()
+    test_near_topic_follow_up_is_not_the_core_question()
+    test_corpus_accuracy()
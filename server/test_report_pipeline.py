@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+from agents.json_repair import repair_json
+from agents.report_agent import ReportAgent
+from agents.report_pipeline import MapReduceReportPipeline, split_into_question_chunks
+
+def build_history(num_questions):
+    history = [{"role": "user", "content": "[System] Resume loaded. Please briefly introduce yourself."}]
+    for i in range(num_questions):
+        history.append({"role": "assistant", "content": f"Question {i}?"})
+        history.append({"role": "user", "content": f"Answer {i}."})
+    # Trailing unanswered question should not become a chunk
+    history.append({"role": "assistant", "content": "Thanks, that concludes the interview."})
+    return history
+
+class FakeGemini:
+    """Answers each pipeline prompt with canned JSON after a fixed delay."""
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def generate(self, prompt, schema):
+        return repair_json(await self._respond(prompt))
+
+    async def _respond(self, prompt):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        if "ONE question/answer exchange" in prompt:
+            return "```json\n" + json.dumps({
+                "question": "", "candidate_answer_summary": "ok", "score": 70,
+                "star_method_used": False, "completeness": "complete",
+                "what_was_strong": "clear", "what_was_missing": "metrics", "model_answer_hint": "quantify",
+                "section": "Experience", "structured_thinking_score": 60, "active_listening_score": 80,
+                "response_length_quality": "optimal", "consistent_points": ["Python"], "discrepancies": []
+            }) + "\n```"
+        if "final scorecard" in prompt:
+            return json.dumps({
+                "scorecard": {"overall_score": 70, "dimensions": []},
+                "section_breakdown": [{"section": "Experience", "score": 70, "highlight": "solid"}],
+                "readiness_verdict": {"status": "almost_ready", "label": "Close", "summary": "s", "next_step": "n"}
+            })
+        if "preparation plan" in prompt:
+            return json.dumps({"focus_topics": ["SQL"], "question_types_to_practice": [], "estimated_ready_in": "2 weeks"})
+        return json.dumps({"strengths": [{"title": "t", "evidence": "e"}], "improvement_areas": [],
+                           "suggested_followups": [], "unexplored_resume_strengths": ["Rust"]})
+
+def test_split_into_question_chunks():
+    chunks = split_into_question_chunks(build_history(4))
+    assert len(chunks) == 4
+    assert chunks[0]["question"] == "Question 0?"
+    assert chunks[3]["answers"] == ["Answer 3."]
+    assert [c["index"] for c in chunks] == [0, 1, 2, 3]
+
+def test_map_reduce_report():
+    fake = FakeGemini(delay=0.05)
+    pipeline = MapReduceReportPipeline(fake.generate, max_concurrency=4)
+
+    start = time.perf_counter()
+    report = asyncio.run(pipeline.run(build_history(12), "resume", "general", "60min"))
+    elapsed = time.perf_counter() - start
+    print(f"12 chunks + 3 reduce calls in {elapsed:.2f}s (peak concurrency {fake.peak})")
+
+    # 12 question chunks + scorecard + coaching + prep_plan
+    assert fake.calls == 15
+    assert fake.peak <= 4
+    # Bounded parallelism: 3 map waves + 1 reduce wave, far below 15 serial calls
+    assert elapsed < 15 * fake.delay
+
+    assert len(report["per_question_analysis"]) == 12
+    assert report["per_question_analysis"][0]["question"] == "Question 0?"
+    assert report["scorecard"]["overall_score"] == 70
+    assert report["readiness_verdict"]["status"] == "almost_ready"
+    assert report["resume_consistency"]["consistent_points"] == ["Python"] * 12
+    assert report["resume_consistency"]["unexplored_resume_strengths"] == ["Rust"]
+    assert report["communication_metrics"]["structured_thinking_score"] == 60
+    assert report["prep_plan"]["focus_topics"] == ["SQL"]
+    assert report["meta"]["duration"] == "60min"
+
+class BrokenScorecardGemini(FakeGemini):
+    async def _respond(self, prompt):
+        if "final scorecard" in prompt:
+            return "Sorry, I can't produce that."
+        return await super()._respond(prompt)
+
+def test_broken_scorecard_is_an_error():
+    agent = ReportAgent(api_key="test", model_name="test")
+    agent.client = object()
+    agent.pipeline = MapReduceReportPipeline(BrokenScorecardGemini(delay=0).generate)
+
+    # Same answer as the single-call path: an error, not placeholder scores
+    report = asyncio.run(agent.generate_interview_report(build_history(12), "resume", "general", 60))
+    assert report == {"error": "LLM returned invalid JSON", "broken_sections": ["scorecard", "readiness_verdict"]}
+
+    print("\nALL MAP-REDUCE REPORT TESTS PASSED")
+
+if __name__ == "__main__":
+    test_split_into_question_chunks()
+    test_map_reduce_report()
+    test_broken_scorecard_is_an_error()
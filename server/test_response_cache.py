@@ -0,0 +1,88 @@
+import asyncio
+from agents.response_cache import ResponseCache
+from agents.orchestrator import AgentOrchestrator, RESUME_OPENING_PROMPT
+
+RESUME = "Jane Doe. Built a Django internship matching service; led a team of four; Python, Postgres, Redis."
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_lru_and_ttl_eviction():
+    clock = FakeClock()
+    cache = ResponseCache(max_entries=2, ttl_secs=60, clock=clock)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")  # "b" is least recently used
+    assert cache.get("b") is None and cache.get("a") == "A"
+    clock.now = 61
+    assert cache.get("a") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2 and stats["entries"] == 1
+
+class CountingThinkingAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def stream_critique(self, *args, **kwargs):
+        self.calls += 1
+        for word in ("Hi, I'm your interviewer. ", "Tell me about the matching service?"):
+            yield word
+
+async def no_memory_update(state_snapshot):
+    return None
+
+def make_orchestrator(cache):
+    orchestrator = AgentOrchestrator(groq_api_key="test", thinking_model="scout", memory_model="small", opening_cache=cache)
+    orchestrator.thinking_agent = CountingThinkingAgent()
+    orchestrator.memory_agent.update_memory = no_memory_update
+    return orchestrator
+
+def opening_turn(orchestrator, resume_text=RESUME, focus_mode="general", time_limit=15):
+    orchestrator.set_mode("resume", resume_text, focus_mode, time_limit)
+    orchestrator.reset_conversation()
+
+    async def collect():
+        return "".join([chunk async for chunk in orchestrator.run_flow(RESUME_OPENING_PROMPT, [], trusted=True)])
+    return asyncio.run(collect())
+
+def test_restarted_resume_replays_opening():
+    cache = ResponseCache()
+    orchestrator = make_orchestrator(cache)
+
+    first = opening_turn(orchestrator)
+    state_after_first = orchestrator.resume_manager.state
+    # A restart of the same resume (even on another connection) is replayed
+    assert opening_turn(orchestrator) == first
+    assert opening_turn(make_orchestrator(cache)) == first
+    assert orchestrator.thinking_agent.calls == 1
+    assert orchestrator.resume_manager.state == state_after_first
+    assert len(orchestrator.resume_manager.history) == 2
+
+    # A different resume or focus is a different opening
+    opening_turn(orchestrator, resume_text=RESUME + " AWS certified.")
+    opening_turn(orchestrator, focus_mode="projects")
+    assert orchestrator.thinking_agent.calls == 3
+    assert cache.get_stats()["hits"] == 2
+
+def test_later_turns_are_not_cached():
+    cache = ResponseCache()
+    orchestrator = make_orchestrator(cache)
+    opening_turn(orchestrator)
+
+    async def answer():
+        return [chunk async for chunk in orchestrator.run_flow("I designed the ranking model.", [])]
+    asyncio.run(answer())
+    asyncio.run(answer())
+    assert orchestrator.thinking_agent.calls == 3 and cache.get_stats()["entries"] == 1
+
+    print("\nALL RESPONSE CACHE TESTS PASSED")
+
+if __name__ == "__main__":
+    test_lru_and_ttl_eviction()
+    test_restarted_resume_replays_opening()
+    test_later_turns_are_not_cached()
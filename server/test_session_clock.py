@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+from agents.session_clock import SessionClock
+from agents.conversation_manager import ConversationManager, ConversationState
+from agents.resume_manager import ResumeConversationManager, ResumeConversationState
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_clock():
+    fake = FakeTime()
+    clock = SessionClock(fake)
+    assert clock.remaining_secs() is None and not clock.expired()
+
+    clock.start(5)
+    fake.now += 120
+    assert clock.elapsed_secs() == 120
+    assert clock.remaining_secs() == 180
+    assert clock.affordable_exchanges(30) == 6
+    assert clock.snapshot() == {"time_elapsed_secs": 120, "time_remaining_secs": 180}
+    fake.now += 400
+    assert clock.expired() and clock.remaining_secs() == 0
+
+def test_project_follow_ups_shrink_then_stop():
+    fake = FakeTime()
+    cm = ConversationManager()
+    cm.clock = SessionClock(fake)
+    cm.setup_evaluation(30)
+    cm.apply_instruction(cm.get_state_instruction("that's all", False))
+    assert cm.state == ConversationState.EVALUATION
+    assert cm.follow_up_limit == 3
+
+    # 25 of 30 minutes gone with every question still ahead: no time for follow-ups
+    fake.now += 25 * 60
+    cm.apply_instruction(cm.get_state_instruction("it handles auth", False))
+    assert cm.follow_up_limit == 0
+    assert cm.templated_response == cm.questions[0]["questions"][0]
+
+    fake.now += 10 * 60
+    instruction = cm.get_state_instruction("and more", False)
+    cm.apply_instruction(instruction)
+    assert cm.state == ConversationState.COMPLETED
+    assert "time for this evaluation is up" in instruction.prompt
+    assert cm.get_progress_data()["time_remaining_secs"] == 0
+
+def test_resume_interview_hard_stop():
+    fake = FakeTime()
+    rm = ResumeConversationManager()
+    rm.clock = SessionClock(fake)
+    rm.setup_interview("resume", "general", 30)
+    assert rm.adaptive_questions_per_state() == rm.max_questions_per_state > 1
+
+    fake.now += 27 * 60
+    assert rm.adaptive_questions_per_state() == 1
+
+    fake.now += 5 * 60
+    instruction = rm.get_state_instruction("ok", False)
+    # Computed, not applied: the turn may still be rejected
+    assert instruction.state == ResumeConversationState.COMPLETED and rm.state != instruction.state
+    rm.apply_instruction(instruction)
+    assert rm.state == ResumeConversationState.COMPLETED
+    assert rm.get_progress_data()["time_elapsed_secs"] == 32 * 60
+
+RESET_CHILD = """
+import json
+import main
+from fastapi.testclient import TestClient
+
+def clock_after_reset(ws, **reset):
+    ws.send_text(json.dumps(dict(type="reset", **reset)))
+    while ws.receive_json()["type"] != "state_update":
+        pass
+    manager = main.orchestrator.active_manager
+    return {"running": manager.clock.running, "remaining": manager.clock.remaining_secs(), "state": manager.state.name}
+
+with TestClient(main.app).websocket_connect("/chatbot/ws") as ws:
+    print(json.dumps({
+        "project": clock_after_reset(ws, mode="project", time_limit=30),
+        "resume": clock_after_reset(ws, mode="resume", resume_text="", focus_mode="general", time_limit=5),
+    }))
+"""
+
+def test_clock_runs_after_websocket_reset():
+    # The /chatbot/ws reset handler, as the client starts every interview
+    server_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, GROQ_API_KEY="test", CHATBOT_API_KEY="test", SESSION_TIME_LIMITS="true")
+    result = subprocess.run([sys.executable, "-c", RESET_CHILD], cwd=server_dir, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    after = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert after["project"]["running"] and 29 * 60 < after["project"]["remaining"] <= 30 * 60
+    assert after["resume"]["running"] and 4 * 60 < after["resume"]["remaining"] <= 5 * 60
+    # Reset no longer undoes the entry state picked for the focus mode either
+    flow = ResumeConversationManager().flow
+    assert after["resume"]["state"] == flow.entry_state(flow.resolve_route("general")).name
+
+    print("\nALL SESSION CLOCK TESTS PASSED")
+
+if __name__ == "__main__":
+    test_clock()
+    test_project_follow_ups_shrink_then_stop()
+    test_resume_interview_hard_stop()
+    test_clock_runs_after_websocket_reset()
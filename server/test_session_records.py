@@ -0,0 +1,67 @@
+import asyncio
+import base64
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from agents.session_records import AI, HUMAN, AudioBuffer, Screenshot, Turn, to_messages
+from agents.turn_manager import TurnManager
+from agents.resume_manager import ResumeConversationManager
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+PNG_URI = "data:image/png;base64," + base64.b64encode(PNG).decode("ascii")
+
+def test_turns_become_messages_only_at_call_time():
+    manager = ResumeConversationManager()
+    manager.update_history("I led the backend.", "What did you own end to end?")
+    assert manager.history == [Turn(HUMAN, "I led the backend."), Turn(AI, "What did you own end to end?")]
+    assert not hasattr(manager.history[0], "__dict__")
+    assert manager.get_evaluation_target()["question"] == "What did you own end to end?"
+
+    system = SystemMessage(content="prompt")
+    messages = to_messages([system] + manager.history)
+    assert messages[0] is system
+    assert isinstance(messages[1], HumanMessage) and isinstance(messages[2], AIMessage)
+    assert messages[2].content == "What did you own end to end?"
+
+def test_screenshots_kept_as_bytes():
+    screenshot = Screenshot.from_data_uri(PNG_URI)
+    assert screenshot.mime == "image/png" and screenshot.data == PNG
+    assert screenshot.data_uri() == PNG_URI
+    assert Screenshot.from_data_uri(base64.b64encode(PNG).decode()).mime == "image/jpeg"
+    assert Screenshot.from_data_uri("data:image/png;base64,not base64!") is None
+
+class FakeOrchestrator:
+    async def run_flow(self, transcript, images, session_id=None, cancel_event=None, tenant="default", trusted=False):
+        self.images = images
+        yield "Thanks."
+
+def test_turn_manager_caps_and_reencodes_at_commit():
+    orchestrator = FakeOrchestrator()
+    turn_manager = TurnManager(orchestrator, stt_agent=None)
+
+    async def turn():
+        for _ in range(10):
+            await turn_manager.handle_image_input(PNG_URI)
+        await turn_manager.handle_image_input("data:image/png;base64,%%%")
+        return [message async for message in turn_manager.handle_commit()]
+    messages = asyncio.run(turn())
+
+    confirmation = next(m for m in messages if m["type"] == "commit_confirmation")
+    assert len(confirmation["payload"]["images"]) == 8 and confirmation["payload"]["images"][0] == PNG_URI
+    assert orchestrator.images[0] == base64.b64encode(PNG).decode("ascii")
+
+def test_audio_buffer_cap():
+    audio = AudioBuffer(max_bytes=10)
+    assert audio.extend(b"12345") and audio.extend(b"6789")
+    # A chunk that doesn't fit is dropped whole, never cut mid-frame
+    assert not audio.extend(b"ab")
+    assert len(audio) == 9 and audio.dropped_bytes == 2
+    snapshot = audio.snapshot()
+    assert audio.take() == bytearray(b"123456789") and snapshot == b"123456789"
+    assert len(audio) == 0 and audio.dropped_bytes == 0 and audio.extend(b"ab")
+
+    print("\nALL SESSION RECORDS TESTS PASSED")
+
+if __name__ == "__main__":
+    test_turns_become_messages_only_at_call_time()
+    test_screenshots_kept_as_bytes()
+    test_turn_manager_caps_and_reencodes_at_commit()
+    test_audio_buffer_cap()
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from agents.session_records import Turn, HUMAN, AI
+from agents.speculator import Speculator
+from agents.orchestrator import AgentOrchestrator, SPECULATIVE_PROMPT
+
+RESUME = "Jane Doe. Built a Django internship matching service; led a team of four; Python, Postgres, Redis."
+
+class FakeThinkingAgent:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def stream_critique(self, transcript, *args, endpoint="live_turn", **kwargs):
+        self.calls.append((endpoint, transcript))
+        await asyncio.sleep(self.delay)
+        for chunk in ("QUESTION: Tell me about ", "the Redis caching layer?"):
+            yield chunk
+
+async def no_memory_update(state_snapshot):
+    return None
+
+def make_orchestrator(delay=0.0):
+    orchestrator = AgentOrchestrator(groq_api_key="test", thinking_model="scout", memory_model="small", speculator=Speculator())
+    orchestrator.thinking_agent = FakeThinkingAgent(delay)
+    orchestrator.memory_agent.update_memory = no_memory_update
+    orchestrator.set_mode("resume", RESUME, "general", 15)
+    manager = orchestrator.resume_manager
+    # Just moved to a new section: the next question does not depend on the answer
+    manager.state = manager.flow.next_state(manager.route, manager.state)
+    manager.history = [Turn(HUMAN, "I led the backend."), Turn(AI, "What did you own end to end?")]
+    manager.questions_asked_in_current_state = 0
+    return orchestrator
+
+async def answer(orchestrator, transcript, images=None, wait=0.05):
+    orchestrator.prefetch("s1")
+    await asyncio.sleep(wait)  # the user is speaking
+    return [chunk async for chunk in orchestrator.run_flow(transcript, images or [], session_id="s1")]
+
+def test_draft_used_on_commit():
+    orchestrator = make_orchestrator()
+    chunks = asyncio.run(answer(orchestrator, "I designed the ranking model."))
+
+    assert chunks == ["Tell me about the Redis caching layer?"]
+    assert orchestrator.thinking_agent.calls == [("speculative", SPECULATIVE_PROMPT)]
+    stats = orchestrator.speculator.get_stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0 and stats["pending"] == 0
+    # The turn is recorded against the real answer
+    assert orchestrator.resume_manager.history[-2].content == "I designed the ranking model."
+
+def test_mismatched_or_late_drafts_are_discarded():
+    # An answer with a screenshot builds a different turn: the draft is stale
+    orchestrator = make_orchestrator()
+    chunks = asyncio.run(answer(orchestrator, "Here is the dashboard.", images=["aGk="]))
+    assert "".join(chunks) == "QUESTION: Tell me about the Redis caching layer?"
+    assert [endpoint for endpoint, _ in orchestrator.thinking_agent.calls] == ["speculative", "live_turn"]
+    assert orchestrator.speculator.stats["stale"] == 1
+
+    # Committed before the draft finished: generated fresh, the draft is cancelled
+    orchestrator = make_orchestrator(delay=0.2)
+    asyncio.run(answer(orchestrator, "I designed the ranking model.", wait=0.01))
+    stats = orchestrator.speculator.get_stats()
+    assert stats["late"] == 1 and stats["hits"] == 0 and stats["wasted_tokens_est"] > 0
+
+def test_only_answer_independent_turns_are_drafted():
+    orchestrator = make_orchestrator()
+    orchestrator.resume_manager.questions_asked_in_current_state = 1
+    asyncio.run(answer(orchestrator, "More detail."))
+    orchestrator.set_mode("project", time_limit_mins=15)
+    asyncio.run(answer(orchestrator, "It matches students to internships."))
+    assert orchestrator.speculator.stats["drafted"] == 0
+
+    speculator = Speculator(max_chars=40)
+    assert speculator.adapt("Interviewer: Why Redis?") == "Why Redis?"
+    assert speculator.adapt("Thanks for sharing.") is None
+    assert speculator.adapt("Why " + "really " * 10 + "Redis?") is None
+
+DISCONNECT_CHILD = """
+import asyncio, json, time
+import main
+from fastapi.testclient import TestClient
+
+class FakeThinkingAgent:
+    async def stream_critique(self, transcript, *args, endpoint="live_turn", **kwargs):
+        await asyncio.sleep(0.05 if endpoint == "speculative" else 0)
+        yield "Which project are you proudest of?"
+
+async def no_memory_update(state_snapshot):
+    return None
+
+main.orchestrator.thinking_agent = FakeThinkingAgent()
+main.orchestrator.memory_agent.update_memory = no_memory_update
+speculator = main.orchestrator.speculator
+
+def finish_turn(ws):
+    while ws.receive_json()["type"] != "commit_confirmation":
+        pass
+    while ws.receive_json()["type"] != "state_update":
+        pass
+
+with TestClient(main.app).websocket_connect("/chatbot/ws") as ws:
+    ws.send_text(json.dumps({"type": "reset", "mode": "resume", "resume_text": "Built a Django matching service.", "time_limit": 15}))
+    finish_turn(ws)
+    # Answering a new section: the next question is drafted, then used on commit
+    ws.send_text(json.dumps({"type": "text_input", "text": "I led the backend.", "mode": "replace"}))
+    time.sleep(0.2)
+    ws.send_text(json.dumps({"type": "commit"}))
+    finish_turn(ws)
+    # Leaves while the following draft is still generating
+    ws.send_text(json.dumps({"type": "text_input", "text": "Mostly Python.", "mode": "replace"}))
+    time.sleep(0.01)
+
+print(json.dumps({"drafts": len(speculator._drafts), "settled": len(speculator._settled), "hits": speculator.stats["hits"]}))
+"""
+
+def test_disconnect_forgets_the_session():
+    server_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, GROQ_API_KEY="test", CHATBOT_API_KEY="test", SPECULATIVE_PREFETCH="true", CHUNK_COALESCING="false")
+    result = subprocess.run([sys.executable, "-c", DISCONNECT_CHILD], cwd=server_dir, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    after = json.loads(result.stdout.strip().splitlines()[-1])
+    assert after == {"drafts": 0, "settled": 0, "hits": 1}
+
+    print("\nALL SPECULATOR TESTS PASSED")
+
+if __name__ == "__main__":
+    test_draft_used_on_commit()
+    test_mismatched_or_late_drafts_are_discarded()
+    test_only_answer_independent_turns_are_drafted()
+    test_disconnect_forgets_the_session()
@@ -0,0 +1,78 @@
+import asyncio
+from agents.state_sync import StateSync
+from agents.turn_manager import TurnManager
+from agents.resume_manager import ResumeConversationManager
+
+def apply(state, message):
+    """Minimal client: what a delta-aware frontend would do."""
+    if message["type"] == "state_update":
+        return dict(message["payload"])
+    state = dict(state)
+    state.update(message.get("set", {}))
+    for key, suffix in message.get("append", {}).items():
+        state[key] += suffix
+    return state
+
+def test_legacy_mode_suppresses_unchanged():
+    sync = StateSync()
+    snapshot = {"active": True, "typed_text": "hi", "time_remaining_secs": 600}
+    first = sync.update(snapshot)
+    assert first["type"] == "state_update" and first["version"] == 1
+    assert sync.update(dict(snapshot)) is None
+    # The clock ticking alone is not worth a frame
+    assert sync.update(dict(snapshot, time_remaining_secs=597)) is None
+    assert sync.update(dict(snapshot, time_remaining_secs=585))["payload"]["time_remaining_secs"] == 585
+
+def test_deltas_append_typed_text():
+    sync = StateSync(deltas=True)
+    client = {}
+    snapshot = {"active": False, "typed_text": "", "section": "Intro"}
+    client = apply(client, sync.update(snapshot))
+
+    sent_bytes = full_bytes = 0
+    text = ""
+    for word in ["the ", "service ", "caches ", "embeddings "] * 100:
+        text += word
+        message = sync.update(dict(snapshot, active=True, typed_text=text))
+        assert message["base_version"] == message["version"] - 1
+        sent_bytes += len(str(message))
+        full_bytes += len(text)
+        client = apply(client, message)
+
+    assert client["typed_text"] == text and client["active"] is True
+    # Linear in the keystrokes, not quadratic in the draft
+    assert sent_bytes * 10 < full_bytes
+
+def test_resync():
+    sync = StateSync(deltas=True)
+    sync.update({"section": "Intro", "typed_text": "abc"})
+    sync.update({"section": "Design", "typed_text": "abc"})
+    message = sync.full({"section": "Design", "typed_text": "abc"})
+    assert message["type"] == "state_update" and message["version"] == 3
+    assert message["payload"]["section"] == "Design"
+    assert sync.update({"section": "Design", "typed_text": "abc"}) is None
+
+
+class FakeOrchestrator:
+    active_manager = ResumeConversationManager()
+
+def test_source_changes_reach_the_client():
+    turn_manager = TurnManager(FakeOrchestrator(), stt_agent=None, state_deltas=True)
+    client = apply({}, turn_manager.state_message())
+    assert client["sources"]["text"] is False
+
+    async def type_text():
+        return [message async for message in turn_manager.process_text_input("We use Postgres", source="text")]
+    asyncio.run(type_text())
+    message = turn_manager.state_message()
+    assert message["set"]["sources"] == {"audio": False, "text": True, "image": False}
+    client = apply(client, message)
+    assert client["sources"]["text"] is True
+
+    print("\nALL STATE SYNC TESTS PASSED")
+
+if __name__ == "__main__":
+    test_legacy_mode_suppresses_unchanged()
+    test_deltas_append_typed_text()
+    test_resync()
+    test_source_changes_reach_the_client()
@@ -0,0 +1,113 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from agents.trace_recorder import TraceRecorder, read_trace
+from agents.trace_replay import turn_latencies
+
+SCREENSHOT = "data:image/png;base64," + "iVBORw0KGgo" * 1000
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.25
+        return self.now
+
+def test_round_trip_with_media_by_reference():
+    with tempfile.TemporaryDirectory() as trace_dir:
+        recorder = TraceRecorder(trace_dir, "s1", {"query": "framing=json"}, clock=FakeClock())
+        recorder.inbound({"type": "websocket.receive", "text": json.dumps({"type": "reset", "mode": "project"})})
+        for _ in range(3):
+            recorder.inbound({"type": "websocket.receive", "bytes": b"\x01\x02" * 2000})
+        for _ in range(2):
+            recorder.inbound({"type": "websocket.receive", "text": json.dumps({"type": "image_input", "image": SCREENSHOT})})
+        recorder.inbound({"type": "websocket.receive", "text": "not json"})
+        recorder.inbound({"type": "websocket.receive", "text": json.dumps({"type": "commit"})})
+        recorder.outbound({"type": "commit_confirmation", "payload": {"text": "It matches students.", "images": []}})
+        recorder.outbound({"type": "response_chunk", "payload": "Who are "})
+        recorder.outbound({"type": "response_chunk", "payload": "the users?"})
+        recorder.outbound({"type": "state_update", "payload": "INACTIVE"})
+        recorder.close()
+
+        events = list(read_trace(recorder.path))
+        # Identical audio frames and screenshots are stored once
+        assert os.path.getsize(os.path.join(trace_dir, "s1.blobs")) == 4000 + len(SCREENSHOT)
+        assert os.path.getsize(recorder.path) < 1000
+
+    assert [e.kind for e in events][:5] == ["meta", "in_text", "in_bytes", "in_bytes", "in_bytes"]
+    assert events[0].data["query"] == "framing=json" and events[0].data["session_id"] == "s1"
+    assert events[2].data == b"\x01\x02" * 2000
+    assert events[5].data["image"] == SCREENSHOT
+    assert events[7].kind == "in_raw_text" and events[7].data == "not json"
+    assert events[-1].kind == "close"
+    assert all(a.t < b.t for a, b in zip(events, events[1:]))
+
+    turn, = turn_latencies(events)
+    assert turn["text"] == "It matches students." and turn["response"] == "Who are the users?"
+    assert abs(turn["ttfc"] - 0.5) < 1e-9 and abs(turn["duration"] - 1.0) < 1e-9
+
+CHILD = """
+import asyncio, glob, json, sys, time
+import main
+from fastapi.testclient import TestClient
+from agents.trace_recorder import read_trace
+from agents.trace_replay import RecordedProviders, replay
+
+class FakeThinkingAgent:
+    async def stream_critique(self, transcript, *args, **kwargs):
+        for chunk in ("What problem ", "does it ", "solve?"):
+            yield chunk
+
+async def no_memory_update(state_snapshot):
+    return None
+
+main.orchestrator.thinking_agent = FakeThinkingAgent()
+main.orchestrator.memory_agent.update_memory = no_memory_update
+
+async def transcribe(audio_bytes, session_id=None):
+    return "It matches students to internships."
+main.stt_agent.transcribe_bytes = transcribe
+
+with TestClient(main.app).websocket_connect("/chatbot/ws") as ws:
+    ws.send_text(json.dumps({"type": "reset", "mode": "project", "time_limit": 15}))
+    for answer in ("We use Django.", "Postgres and Redis."):
+        ws.send_text(json.dumps({"type": "text_input", "text": answer, "mode": "replace"}))
+        ws.send_text(json.dumps({"type": "commit"}))
+        while ws.receive_json()["type"] != "commit_confirmation":
+            pass
+        while ws.receive_json()["type"] != "state_update":
+            pass
+
+trace, = glob.glob(sys.argv[1] + "/*.trace")
+# The connection closes (and the trace is finished) just after the client leaves
+for _ in range(100):
+    events = list(read_trace(trace))
+    if events[-1].kind == "close":
+        break
+    time.sleep(0.05)
+main.orchestrator.reset_conversation()
+RecordedProviders(events, latency=0).install(main.orchestrator, main.stt_agent)
+print(json.dumps(asyncio.run(replay(main.app, events, speed=0, settle_secs=0.2))))
+"""
+
+def test_recorded_session_replays_against_server():
+    server_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as trace_dir:
+        env = dict(os.environ, GROQ_API_KEY="test", CHATBOT_API_KEY="test", TRACE_RECORDING="true", TRACE_DIR=trace_dir,
+                   FAST_PATH_ENABLED="false", CHUNK_COALESCING="false")
+        result = subprocess.run([sys.executable, "-c", CHILD, trace_dir], cwd=server_dir, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert stats["recorded"]["turns"] == 2 and stats["replayed"]["turns"] == 2
+    assert stats["responses_match"], stats
+    assert stats["replayed"]["ttfc_p50_ms"] is not None
+
+    print("\nALL TRACE REPLAY TESTS PASSED")
+
+if __name__ == "__main__":
+    test_round_trip_with_media_by_reference()
+    test_recorded_session_replays_against_server()
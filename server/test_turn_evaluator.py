@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from agents.turn_evaluator import TurnEvaluator
+from agents.conversation_manager import ConversationManager, EVALUATION_QUESTIONS
+
+class FakeCompletions:
+    """Stands in for groq.chat.completions; later answers finish first."""
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, response_format, max_tokens):
+        self.calls += 1
+        prompt = messages[0]["content"]
+        answer = prompt.split("CANDIDATE ANSWER: ")[1].split("\n")[0]
+        time.sleep(0.05 if answer == "first" else 0.0)
+        content = json.dumps({
+            "candidate_answer_summary": answer, "score": 65, "star_method_used": False,
+            "completeness": "partial", "what_was_strong": "x", "what_was_missing": "y",
+            "model_answer_hint": "z", "structured_thinking_score": 50, "active_listening_score": 70,
+            "response_length_quality": "optimal", "consistent_points": [], "discrepancies": []
+        })
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def test_evaluation_target():
+    cm = ConversationManager()
+    assert cm.get_evaluation_target() is None  # passive listening is not scored
+
+    cm.apply_instruction(cm.get_state_instruction("that's it", False))
+    first_q = EVALUATION_QUESTIONS[0]["questions"][0]
+    cm.update_history("that's it", first_q)
+    target = cm.get_evaluation_target()
+    assert target["section"] == "Project Understanding"
+    assert target["question"] == first_q
+
+def test_records_keep_turn_order():
+    evaluator = TurnEvaluator(api_key="test", model_name="llama-3.1-8b-instant")
+    evaluator.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    target = {"section": "Skills", "question": "Tell me about Python.", "criteria": ""}
+
+    async def run():
+        evaluator.schedule("s1", target, "first")
+        evaluator.schedule("s1", target, "second")
+        return await evaluator.get_records("s1")
+
+    records = asyncio.run(run())
+    assert [r["candidate_answer_summary"] for r in records] == ["first", "second"]
+    assert [r["index"] for r in records] == [0, 1]
+    assert records[0]["section"] == "Skills"
+
+    evaluator.clear("s1")
+    assert asyncio.run(evaluator.get_records("s1")) == []
+
+def test_clear_drops_in_flight_evaluations():
+    evaluator = TurnEvaluator(api_key="test", model_name="llama-3.1-8b-instant")
+    evaluator.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    target = {"section": "Skills", "question": "Tell me about Python.", "criteria": ""}
+
+    async def run():
+        evaluator.schedule("s1", target, "first")
+        await asyncio.sleep(0.01)  # scoring is in flight
+        evaluator.clear("s1")      # interview reset
+        evaluator.schedule("s1", target, "second")
+        records = await evaluator.get_records("s1")
+        await asyncio.sleep(0.1)   # the old scoring call has returned by now
+        return records, await evaluator.get_records("s1")
+
+    records, later = asyncio.run(run())
+    assert [(r["candidate_answer_summary"], r["index"]) for r in records] == [("second", 0)]
+    assert later == records
+
+def test_closed_session_leaves_only_its_records():
+    evaluator = TurnEvaluator(api_key="test", model_name="llama-3.1-8b-instant")
+    evaluator.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    target = {"section": "Skills", "question": "Tell me about Python.", "criteria": ""}
+
+    async def run():
+        evaluator.schedule("s1", target, "first")
+        evaluator.close("s1")  # client disconnected mid-scoring
+        return await evaluator.get_records("s1")
+
+    # The report requested after the disconnect still gets the score
+    assert [r["candidate_answer_summary"] for r in asyncio.run(run())] == ["first"]
+    assert evaluator.pending == {} and evaluator.turn_counts == {}
+
+    print("\nALL TURN EVALUATOR TESTS PASSED")
+
+if __name__ == "__main__":
+    test_evaluation_target()
+    test_records_keep_turn_order()
+    test_clear_drops_in_flight_evaluations()
+    test_closed_session_leaves_only_its_records()
@@ -0,0 +1,52 @@
+import asyncio
+from contextlib import aclosing
+from agents.turn_manager import TurnManager
+from agents.chunk_coalescer import ChunkCoalescer
+
+class FakeOrchestrator:
+    current_mode = "project"
+
+    def __init__(self):
+        self.stream_closed = False
+
+    async def run_flow(self, transcript, images=None, session_id=None, cancel_event=None, tenant="default", trusted=False):
+        try:
+            for i in range(1000):
+                await asyncio.sleep(0.005)
+                yield f"w{i} "
+        finally:
+            self.stream_closed = True
+
+async def interrupt_mid_response():
+    orchestrator = FakeOrchestrator()
+    turn_manager = TurnManager(orchestrator, stt_agent=None)
+    turn_manager.context.active = True
+    turn_manager.context.typed_text = "hello"
+    received = []
+
+    async def forward():
+        async with aclosing(ChunkCoalescer().stream(turn_manager.handle_commit())) as responses:
+            async for response in responses:
+                received.append(response)
+
+    generation = asyncio.create_task(forward())
+    await asyncio.sleep(0.1)
+    assert turn_manager.is_responding
+
+    # Barge-in: the cleanup has run by the time the cancelled task is done
+    generation.cancel()
+    await asyncio.wait({generation})
+    return turn_manager, orchestrator, received
+
+def test_interrupt_cleans_up_immediately():
+    turn_manager, orchestrator, received = asyncio.run(interrupt_mid_response())
+    assert orchestrator.stream_closed
+    assert not turn_manager.is_responding
+    assert turn_manager.context.typed_text == "" and not turn_manager.context.active
+    chunks = [m for m in received if m["type"] == "response_chunk"]
+    assert chunks and len(chunks) < 1000
+
+    print("\nALL TURN INTERRUPT TESTS PASSED")
+
+if __name__ == "__main__":
+    test_interrupt_cleans_up_immediately()
@@ -0,0 +1,97 @@
+import asyncio
+from contextlib import aclosing
+from langchain_core.messages import AIMessageChunk
+from agents.usage_ledger import UsageLedger, usage_ledger
+from agents.thinking_agent import ThinkingAgent
+from agents.orchestrator import AgentOrchestrator, BUDGET_MESSAGE
+from agents.conversation_manager import ConversationState
+
+class FakeStreamingLLM:
+    """Streams like ChatGroq: content chunks, then usage on a final empty chunk."""
+    async def astream(self, messages, **overrides):
+        for word in ("What ", "problem ", "does ", "it ", "solve?"):
+            yield AIMessageChunk(content=word)
+        yield AIMessageChunk(content="", usage_metadata={"input_tokens": 120, "output_tokens": 6, "total_tokens": 126})
+
+async def stream_turn(agent, stop_after=None):
+    received = []
+    async with aclosing(agent.stream_critique("hi", usage_tags={"session_id": "s-usage", "state": "EVALUATION"})) as stream:
+        async for text in stream:
+            received.append(text)
+            if stop_after and len(received) == stop_after:
+                break
+    return received
+
+def test_stream_usage_recorded_per_session_and_state():
+    agent = ThinkingAgent(api_key="test", model_name="scout")
+    agent.llm = FakeStreamingLLM()
+    asyncio.run(stream_turn(agent))
+
+    usage = usage_ledger.session_usage("s-usage")
+    assert usage["totals"]["prompt_tokens"] == 120 and usage["totals"]["completion_tokens"] == 6
+    assert usage["by_state"]["EVALUATION"]["calls"] == 1
+
+    # Cut off before the usage chunk: estimated from characters instead of lost
+    asyncio.run(stream_turn(agent, stop_after=2))
+    usage = usage_ledger.session_usage("s-usage")
+    assert usage["totals"]["calls"] == 2 and usage["totals"]["prompt_tokens"] > 120
+
+def test_aggregation_cost_and_scope():
+    ledger = UsageLedger(session_token_budget=1000, prices={"big": {"prompt": 1.0, "completion": 2.0}, "whisper": {"audio_hour": 3.6}})
+    ledger.record("live_turn", "big", prompt_tokens=600, completion_tokens=100, session_id="a", state="INTRO")
+    ledger.record("stt", "whisper", audio_secs=10, session_id="a")
+
+    async def report():
+        with ledger.scope(session_id="a"):
+            # Tasks started inside the scope inherit its tags
+            await asyncio.gather(*(asyncio.to_thread(ledger.record, "report", "big", 100, 200) for _ in range(2)))
+    asyncio.run(report())
+
+    stats = ledger.get_stats()
+    assert list(stats["by_endpoint"]) == ["live_turn", "report", "stt"]
+    assert stats["by_state"]["INTRO"]["total_tokens"] == 700
+    assert stats["totals"]["audio_secs"] == 10.0
+    # 800 prompt * $1/M + 500 completion * $2/M + 10s * $3.6/h
+    assert abs(stats["totals"]["cost_usd"] - (0.0008 + 0.001 + 0.01)) < 1e-9
+    assert ledger.session_tokens("a") == 1300 and ledger.over_budget("a")
+    assert not ledger.over_budget("b")
+
+class CountingThinkingAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def stream_critique(self, *args, **kwargs):
+        self.calls += 1
+        yield "Next question?"
+
+async def no_memory_update(state_snapshot):
+    return None
+
+async def collect(orchestrator):
+    return [chunk async for chunk in orchestrator.run_flow("It matches students to internships.", [], session_id="s-budget")]
+
+def test_session_budget_enforced():
+    orchestrator = AgentOrchestrator(groq_api_key="test", thinking_model="scout", memory_model="small", fast_path=False)
+    orchestrator.thinking_agent = CountingThinkingAgent()
+    orchestrator.memory_agent.update_memory = no_memory_update
+    orchestrator.set_mode("project", time_limit_mins=15)
+    cm = orchestrator.conversation_manager
+    cm.state = ConversationState.EVALUATION
+    cm.section_index = 0
+
+    previous_budget = usage_ledger.session_token_budget
+    usage_ledger.session_token_budget = 500
+    try:
+        assert asyncio.run(collect(orchestrator)) == ["Next question?"]
+        usage_ledger.record("live_turn", "scout", prompt_tokens=450, completion_tokens=60, session_id="s-budget")
+        assert asyncio.run(collect(orchestrator)) == [BUDGET_MESSAGE]
+        assert orchestrator.thinking_agent.calls == 1
+    finally:
+        usage_ledger.session_token_budget = previous_budget
+
+    print("\nALL USAGE LEDGER TESTS PASSED")
+
+if __name__ == "__main__":
+    test_stream_usage_recorded_per_session_and_state()
+    test_aggregation_cost_and_scope()
+    test_session_budget_enforced()